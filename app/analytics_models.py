@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel
+
+
+class UpliftRanking(SQLModel):
+    nombre: str
+    colaboraciones: int
+    incremento_maximo: int
+    incremento_promedio: float
+
+
+class UpliftByType(SQLModel):
+    tipo_colaboracion: str
+    colaboraciones: int
+    incremento_promedio: float
+
+
+class UpliftByYear(SQLModel):
+    anio: int
+    colaboraciones: int
+    incremento_promedio: float
@@ -0,0 +1,79 @@
+from typing import List
+from sqlalchemy import extract, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.cosmetic_models import CosmeticColab
+from app.videogame_models import VideogameColab
+from app.analytics_models import UpliftByType, UpliftByYear, UpliftRanking
+from app.soft_delete import live
+from app.tables import COSMETICS, VIDEOGAMES
+
+# Para cada tabla: (columna por la que se agrupa el ranking, incremento numérico)
+UPLIFT_COLUMNS = {
+    COSMETICS: (CosmeticColab.marca_maquillaje, CosmeticColab.incremento_ventas_maquillaje_pct),
+    VIDEOGAMES: (VideogameColab.videojuego, VideogameColab.incremento_ventas_videojuego_pct),
+}
+MODELS = {
+    COSMETICS: CosmeticColab,
+    VIDEOGAMES: VideogameColab,
+}
+DATE_COLUMNS = {
+    COSMETICS: CosmeticColab.fecha_colaboracion,
+    VIDEOGAMES: VideogameColab.fecha_colaboracion,
+}
+
+
+class AnalyticsOperations:
+    """Agregados calculados por la base de datos sobre la columna numérica de incremento"""
+
+    @staticmethod
+    async def top_uplift(session: AsyncSession, tipo: str, limit: int) -> List[UpliftRanking]:
+        """Marcas (o videojuegos) con mayor incremento de ventas"""
+        group_column, uplift = UPLIFT_COLUMNS[tipo]
+        maximum = func.max(uplift)
+        result = await session.execute(
+            select(
+                group_column.label("nombre"),
+                func.count().label("colaboraciones"),
+                maximum.label("incremento_maximo"),
+                func.avg(uplift).label("incremento_promedio"),
+            )
+            .where(live(MODELS[tipo]))
+            .group_by(group_column)
+            .order_by(maximum.desc(), group_column)
+            .limit(limit)
+        )
+        return [UpliftRanking(**row) for row in result.mappings().all()]
+
+    @staticmethod
+    async def average_by_type(session: AsyncSession) -> List[UpliftByType]:
+        """Incremento promedio de ventas de maquillaje por tipo de colaboración"""
+        average = func.avg(CosmeticColab.incremento_ventas_maquillaje_pct)
+        result = await session.execute(
+            select(
+                CosmeticColab.tipo_colaboracion,
+                func.count().label("colaboraciones"),
+                average.label("incremento_promedio"),
+            )
+            .where(live(CosmeticColab))
+            .group_by(CosmeticColab.tipo_colaboracion)
+            .order_by(average.desc())
+        )
+        return [UpliftByType(**row) for row in result.mappings().all()]
+
+    @staticmethod
+    async def histogram_by_year(session: AsyncSession, tipo: str) -> List[UpliftByYear]:
+        """Número de colaboraciones e incremento promedio por año"""
+        _, uplift = UPLIFT_COLUMNS[tipo]
+        year = extract("year", DATE_COLUMNS[tipo])
+        result = await session.execute(
+            select(
+                year.label("anio"),
+                func.count().label("colaboraciones"),
+                func.avg(uplift).label("incremento_promedio"),
+            )
+            .where(live(MODELS[tipo]))
+            .group_by(year)
+            .order_by(year)
+        )
+        return [UpliftByYear(**row) for row in result.mappings().all()]
@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, column, update, values
+from sqlmodel import SQLModel, Field, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.soft_delete import live
+
+# Máximo de elementos por solicitud en los endpoints por lotes
+MAX_BATCH_SIZE = 1000
+
+
+def batch_changes(item: dict, model) -> dict:
+    """Campos del modelo que un elemento de actualización por lotes cambia (sin 'id' ni vacíos)"""
+    return {
+        key: value for key, value in item.items()
+        if key in model.__table__.columns and key != "id" and value not in (None, "")
+    }
+
+
+def group_batch_changes(items: List[dict], model) -> Dict[Tuple[str, ...], List[dict]]:
+    """
+    Agrupa los cambios por el conjunto de campos que modifican (un UPDATE por grupo).
+    Si un id se repite, sus cambios se combinan en orden: el último valor de cada campo gana.
+    """
+    merged: Dict[int, dict] = {}
+    for item in items:
+        changes = batch_changes(item, model)
+        if changes:
+            merged.setdefault(item["id"], {}).update(changes)
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for entry_id, changes in merged.items():
+        groups.setdefault(tuple(sorted(changes)), []).append({"id": entry_id, **changes})
+    return groups
+
+
+async def update_live_rows(session: AsyncSession, model, fields: Tuple[str, ...], rows: List[dict]) -> list:
+    """
+    Aplica a las filas activas los mismos campos con valores distintos y devuelve los registros
+    modificados. En PostgreSQL es un solo UPDATE ... FROM (VALUES ...) ... RETURNING; en otras
+    bases, un executemany con el mismo filtro y una consulta de las filas modificadas.
+    Un registro eliminado (también entre medias, en otra transacción) no se modifica.
+    """
+    table = model.__table__
+    if session.get_bind().dialect.name == "postgresql":
+        batch = values(
+            column("id", table.c.id.type), *[column(field, table.c[field].type) for field in fields], name="batch"
+        ).data([(row["id"], *[row[field] for field in fields]) for row in rows])
+        result = await session.execute(
+            update(model)
+            .where(model.id == batch.c.id, live(model))
+            .values({field: batch.c[field] for field in fields})
+            .returning(model)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalars().all()
+
+    await session.execute(
+        update(table)
+        .where(table.c.id == bindparam("_id"), table.c.deleted_at.is_(None))
+        .values({field: bindparam(f"_{field}") for field in fields}),
+        [{"_id": row["id"], **{f"_{field}": row[field] for field in fields}} for row in rows],
+    )
+    result = await session.execute(
+        select(model)
+        .where(model.id.in_([row["id"] for row in rows]), live(model))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
+def batch_status(item: dict, model, updated: Set[int]) -> str:
+    """'updated', 'unchanged' (no trae campos que cambiar) o 'not_found' (no existe o está eliminado)"""
+    if item["id"] in updated:
+        return "updated"
+    return "not_found" if batch_changes(item, model) else "unchanged"
+
+
+class BatchDeleteRequest(SQLModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchItemResult(SQLModel):
+    id: Optional[int] = None
+    status: str
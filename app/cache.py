@@ -0,0 +1,355 @@
+"""
+Caché de respuestas para las rutas de lectura.
+
+Las respuestas GET de las rutas marcadas con @cached(...) se guardan por ruta y parámetros de
+consulta. Cada tabla es un "espacio" con un número de versión que forma parte de la clave: al
+escribir, la versión sube y las entradas anteriores dejan de usarse (y expiran por TTL o LRU).
+
+Las versiones y la hora de la última escritura están en la tabla cache_versions y las suben
+triggers de la base de datos (migración 0006_cache_versions). Así cuentan las escrituras de
+cualquier worker, de los scripts (database.ingest, database.purge_deleted,
+bucket.backfill_variants) y del SQL manual, con cualquier backend. Leerlas es una consulta
+por clave primaria en cada petición cacheable, antes de abrir la sesión de la ruta.
+
+Backends de las respuestas: memoria del proceso (LRU + TTL) o Redis (CACHE_BACKEND=redis,
+CACHE_REDIS_URL), compartido entre workers.
+
+Las mismas versiones sirven de validador HTTP: las rutas cacheadas envían ETag y
+Last-Modified y responden 304 a If-None-Match / If-Modified-Since sin cargar filas ni
+renderizar plantillas. El ETag sale de las versiones (exacto); Last-Modified tiene resolución
+de segundos, por eso If-None-Match tiene prioridad.
+
+Con réplica de lectura, una respuesta leída de la réplica justo después de una escritura puede
+ser anterior a ella; si se guardara con la versión nueva se serviría hasta la siguiente
+escritura. Por eso esas respuestas no se guardan si la tabla se escribió hace menos de
+REPLICA_STICKY_SECONDS.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.routing import Match
+
+from app.read_replica import REPLICA_STICKY_SECONDS, read_from_replica
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Interfaz mínima (subconjunto de Redis) que usa la caché de respuestas"""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        raise NotImplementedError
+
+
+
+class MemoryBackend(CacheBackend):
+    """Caché en memoria del proceso con expulsión LRU y expiración por TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend(CacheBackend):
+    """Caché compartida entre procesos sobre un cliente compatible con redis.asyncio"""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis.asyncio as redis  # dependencia opcional
+        return cls(redis.from_url(url))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self.client.set(key, value, ex=ttl)
+
+
+
+class FakeRedis:
+    """Cliente Redis falso en memoria (get/set con ex) para pruebas y benchmarks locales"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value, ex: Optional[int] = None):
+        if isinstance(value, int):
+            value = str(value)
+        if isinstance(value, str):
+            value = value.encode()
+        self._data[key] = (time.monotonic() + ex if ex else None, value)
+
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+
+async def read_table_versions(namespaces: Tuple[str, ...]) -> Dict[str, Tuple[int, int]]:
+    """{espacio: (versión, última escritura en segundos)} de cache_versions, en el primario"""
+    from database.connection_db import database
+
+    async with database.engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT namespace, version, modified_at FROM cache_versions WHERE namespace IN :namespaces")
+            .bindparams(bindparam("namespaces", expanding=True)),
+            {"namespaces": list(namespaces)},
+        )
+        return {namespace: (version, modified_at) for namespace, version, modified_at in result}
+
+
+class ResponseCache:
+
+    def __init__(self, backend: CacheBackend, ttl: int = 60, enabled: bool = True, max_body_bytes: int = 2_000_000,
+                 replica_lag: float = REPLICA_STICKY_SECONDS, read_versions=read_table_versions):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+        self.enabled = enabled
+        self.max_body_bytes = max_body_bytes
+        self.read_versions = read_versions
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        kind = os.getenv("CACHE_BACKEND", "memory").lower()
+        ttl = int(os.getenv("CACHE_TTL", "60"))
+        if kind == "redis":
+            backend = RedisBackend.from_url(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+        else:
+            backend = MemoryBackend(int(os.getenv("CACHE_MAX_ENTRIES", "1024")))
+        # Con CACHE_BACKEND=none no se guardan respuestas, pero las versiones siguen funcionando
+        return cls(backend, ttl, enabled=kind != "none")
+
+    async def validators(self, namespaces: Tuple[str, ...]) -> Tuple[str, int]:
+        """
+        ('tabla=versión,...', última escritura en segundos) de las tablas indicadas; lanza
+        KeyError si falta alguna en cache_versions (base sin migrar)
+        """
+        versions = await self.read_versions(namespaces)
+        return (
+            ",".join(f"{namespace}={versions[namespace][0]}" for namespace in namespaces),
+            max(versions[namespace][1] for namespace in namespaces),
+        )
+
+    def recently_written(self, modified_at: int) -> bool:
+        """True si la última escritura es más reciente que replica_lag (la réplica puede no tenerla)"""
+        # modified_at tiene resolución de segundos: se cuenta el segundo completo
+        return time.time() - modified_at < self.replica_lag + 1
+
+    def etag_for(self, versions: str) -> str:
+        """ETag débil derivado de las versiones de las tablas"""
+        digest = hashlib.blake2b(versions.encode(), digest_size=8).hexdigest()
+        return f'W/"{digest}"'
+
+    def key_for(self, path: str, query_string: bytes, versions: str) -> str:
+        query = "&".join(sorted(query_string.decode("latin-1").split("&"))) if query_string else ""
+        return f"cache:response:{versions}:{path}?{query}"
+
+    async def get(self, key: str) -> Optional[Tuple[list, bytes]]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        header_line, _, body = value.partition(b"\n")
+        headers = [(name.encode("latin-1"), content.encode("latin-1")) for name, content in json.loads(header_line)]
+        return headers, body
+
+    async def set(self, key: str, headers: list, body: bytes):
+        header_line = json.dumps([(name.decode("latin-1"), content.decode("latin-1")) for name, content in headers])
+        await self.backend.set(key, header_line.encode() + b"\n" + body, self.ttl)
+        self.stats.stores += 1
+
+    def snapshot(self) -> dict:
+        stats = asdict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["backend"] = type(self.backend).__name__
+        stats["enabled"] = self.enabled
+        return stats
+
+
+response_cache = ResponseCache.from_env()
+
+
+def cached(*namespaces: str):
+    """Marca una ruta GET como cacheable; depende de las tablas indicadas (app/tables.py)"""
+    def decorator(endpoint):
+        endpoint.cache_namespaces = namespaces
+        return endpoint
+    return decorator
+
+
+# Cabeceras que se guardan junto al cuerpo (content-length se recalcula)
+STORED_HEADERS = {b"content-type"}
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def is_not_modified(scope, etag: str, last_modified: int) -> bool:
+    """Evalúa If-None-Match (prioritario) o If-Modified-Since contra los validadores actuales"""
+    if_none_match = _header(scope, b"if-none-match")
+    if if_none_match is not None:
+        # Comparación débil: se ignora el prefijo W/
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+    if_modified_since = _header(scope, b"if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI: responde desde la caché antes de llegar a la ruta (sin abrir sesión de BD)"""
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+
+    @staticmethod
+    def _namespaces_for(scope) -> Optional[Tuple[str, ...]]:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(getattr(route, "endpoint", None), "cache_namespaces", None)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        namespaces = self._namespaces_for(scope)
+        if not namespaces:
+            await self.app(scope, receive, send)
+            return
+
+        # Validadores HTTP: solo las versiones (una consulta por clave primaria), sin cargar filas
+        try:
+            versions, last_modified = await self.cache.validators(namespaces)
+        except (SQLAlchemyError, OSError, KeyError) as e:
+            # Sin versiones fiables (base sin migrar o sin conexión) la ruta responde sin caché
+            logger.warning("Sin versiones de caché para %s: %s", ",".join(namespaces), e)
+            await self.app(scope, receive, send)
+            return
+        etag = self.cache.etag_for(versions)
+        validators = [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(last_modified, usegmt=True).encode()),
+            (b"cache-control", b"no-cache"),
+        ]
+        if is_not_modified(scope, etag, last_modified):
+            await send({"type": "http.response.start", "status": 304, "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if not self.cache.enabled:
+            async def send_with_validators(message):
+                if message["type"] == "http.response.start" and message["status"] == 200:
+                    message = {**message, "headers": list(message.get("headers", [])) + validators}
+                await send(message)
+
+            await self.app(scope, receive, send_with_validators)
+            return
+
+        key = self.cache.key_for(scope["path"], scope["query_string"], versions)
+        hit = await self.cache.get(key)
+        if hit is not None:
+            headers, body = hit
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": headers + validators + [
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-cache", b"HIT"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        state = {"cacheable": False, "headers": [], "chunks": [], "size": 0}
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                state["cacheable"] = message["status"] == 200 and not any(
+                    name.lower() == b"set-cookie" for name, _ in headers
+                )
+                state["headers"] = [(name, value) for name, value in headers if name.lower() in STORED_HEADERS]
+                if message["status"] == 200:
+                    headers += validators
+                message = {**message, "headers": headers + [(b"x-cache", b"MISS")]}
+            elif message["type"] == "http.response.body" and state["cacheable"]:
+                body = message.get("body", b"")
+                state["chunks"].append(body)
+                state["size"] += len(body)
+                if state["size"] > self.cache.max_body_bytes:
+                    state["cacheable"] = False
+                    state["chunks"] = []
+                elif not message.get("more_body", False):
+                    # Lo leído de la réplica justo después de una escritura puede no incluirla
+                    if not (read_from_replica(scope) and self.cache.recently_written(last_modified)):
+                        await self.cache.set(key, state["headers"], b"".join(state["chunks"]))
+            await send(message)
+
+        # Las rutas anotan aquí si leyeron de la réplica
+        scope.setdefault("state", {})
+        await self.app(scope, receive, send_and_capture)
@@ -1,17 +1,35 @@
+from datetime import date, datetime
 from typing import Optional
+from sqlalchemy import Column, Computed, DateTime, Integer
 from sqlmodel import SQLModel, Field
 from pydantic import validator
+from app.soft_delete import soft_delete_indexes
+from app.percent_column import percent_as_integer
 
 class CosmeticColabBase(SQLModel):
     marca_maquillaje: str = Field(..., min_length=3, max_length=50)
     videojuego: str = Field(..., min_length=3, max_length=50)
-    fecha_colaboracion: str = Field(..., min_length=3, max_length=50)
+    fecha_colaboracion: date = Field(..., index=True)
     tipo_colaboracion: str = Field(..., min_length=3, max_length=100)
-    incremento_ventas_maquillaje: str = Field(..., regex=r'^\d+%$')
+    incremento_ventas_maquillaje: str = Field(..., schema_extra={'pattern': r'^\d+%$'})
     image_url: str = Field(..., min_length=3, max_length=500)
+    image_thumb_url: Optional[str] = Field(None, max_length=500)
+    image_medium_url: Optional[str] = Field(None, max_length=500)
 
 class CosmeticColab(CosmeticColabBase, table=True):
+    __table_args__ = soft_delete_indexes("cosmeticcolab")
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Borrado lógico: NULL mientras el registro está activo
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    # Incremento como entero ("35%" -> 35), calculado por la base de datos para agregaciones
+    incremento_ventas_maquillaje_pct: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            Integer,
+            Computed(percent_as_integer("incremento_ventas_maquillaje"), persisted=True),
+            index=True
+        )
+    )
 
 class CosmeticColabCreate(CosmeticColabBase):
     pass
@@ -22,10 +40,12 @@ class CosmeticColabRead(CosmeticColabBase):
 class CosmeticColabUpdate(SQLModel):
     marca_maquillaje: Optional[str] = Field(None, min_length=3, max_length=50)
     videojuego: Optional[str] = Field(None, min_length=3, max_length=50)
-    fecha_colaboracion: Optional[str] = Field(None, min_length=3, max_length=50)
+    fecha_colaboracion: Optional[date] = None
     tipo_colaboracion: Optional[str] = Field(None, min_length=3, max_length=100)
-    incremento_ventas_maquillaje: Optional[str] = Field(None, regex=r'^\d+%$')
+    incremento_ventas_maquillaje: Optional[str] = Field(None, schema_extra={'pattern': r'^\d+%$'})
     image_url: Optional[str] = Field(None, min_length=3, max_length=500)
+    image_thumb_url: Optional[str] = Field(None, max_length=500)
+    image_medium_url: Optional[str] = Field(None, max_length=500)
 
     @validator('*', pre=True)
     def skip_blank_strings(cls, v):
@@ -33,15 +53,22 @@ class CosmeticColabUpdate(SQLModel):
             return None
         return v
 
+class CosmeticColabBatchUpdate(CosmeticColabUpdate):
+    id: int
+
 class CosmeticColabResponse(SQLModel):
     id: int
     marca_maquillaje: str
     videojuego: str
-    fecha_colaboracion: str
+    fecha_colaboracion: date
     tipo_colaboracion: str
     incremento_ventas_maquillaje: str
     image_url: str
+    image_thumb_url: Optional[str] = None
+    image_medium_url: Optional[str] = None
 
 class DeletedCosmeticColab(CosmeticColabBase, table=True):
     __tablename__ = "deleted_cosmetic"
-    id: Optional[int] = Field(default=None, primary_key=True)
\ No newline at end of file
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Mismo id que tenía el registro activo; deleted_at es el momento del borrado (NULL en los archivados antes del borrado lógico)
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
\ No newline at end of file
@@ -1,22 +1,52 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Set
+from sqlalchemy import delete, func, insert, union_all, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from datetime import datetime
+from app.pagination import DEFAULT_PAGE_SIZE
+from app.batch_models import group_batch_changes, update_live_rows
+from app.search_index import contains_filter, search_indexes
+from app.fast_json import fetch_all, select_for
+from app.soft_delete import PURGE_BATCH_SIZE, live, tombstone, utcnow
+from datetime import date, datetime
 from app.cosmetic_models import *
 
 class CosmeticOperations:
 
     @staticmethod
-    async def get_all_cosmetics(session: AsyncSession) -> List[CosmeticColab]:
-        """Obtiene todos los registros de colaboraciones cosméticas"""
-        result = await session.execute(select(CosmeticColab))
+    async def get_all_cosmetics(
+            session: AsyncSession,
+            limit: int = DEFAULT_PAGE_SIZE,
+            after: Optional[int] = None
+    ) -> List[CosmeticColab]:
+        """Obtiene una página de registros de colaboraciones cosméticas ordenada por ID (paginación por cursor)"""
+        query = select(CosmeticColab).where(live(CosmeticColab)).order_by(CosmeticColab.id).limit(limit)
+        if after is not None:
+            query = query.where(CosmeticColab.id > after)
+        result = await session.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def stream_all_cosmetics(
+            session: AsyncSession,
+            after: Optional[int] = None,
+            batch_size: int = DEFAULT_PAGE_SIZE,
+            limit: Optional[int] = None
+    ) -> AsyncIterator[CosmeticColab]:
+        """Recorre los registros (todos o los primeros 'limit') con un cursor del servidor, sin cargar la tabla en memoria"""
+        query = select(CosmeticColab).where(live(CosmeticColab)).order_by(CosmeticColab.id).execution_options(yield_per=batch_size)
+        if after is not None:
+            query = query.where(CosmeticColab.id > after)
+        if limit is not None:
+            query = query.limit(limit)
+        result = await session.stream_scalars(query)
+        async for entry in result:
+            yield entry
+
     @staticmethod
     async def get_cosmetic_by_id(session: AsyncSession, entry_id: int) -> Optional[CosmeticColab]:
         """Obtiene un registro por su ID"""
         result = await session.execute(
-            select(CosmeticColab).where(CosmeticColab.id == entry_id)
+            select(CosmeticColab).where(CosmeticColab.id == entry_id, live(CosmeticColab))
         )
         return result.scalar_one_or_none()
 
@@ -27,77 +57,252 @@ class CosmeticOperations:
         session.add(new_entry)
         await session.commit()
         await session.refresh(new_entry)
+        search_indexes.index_entry(new_entry)
         return new_entry
 
     @staticmethod
     async def update_cosmetic(session: AsyncSession, entry_id: int, update_data: dict) -> Optional[CosmeticColab]:
-        """Modifica un registro existente, permitiendo cambios parciales o totales"""
-        entry = await session.get(CosmeticColab, entry_id)
-        if not entry:
-            return None
-
-        for key, value in update_data.items():
-            if hasattr(entry, key):
-                # Solo actualiza si el valor no es None ni una cadena vacía
-                if value not in (None, ""):
-                    setattr(entry, key, value)
+        """
+        Modifica un registro existente, permitiendo cambios parciales o totales, con un solo
+        UPDATE ... SET <campos enviados> ... RETURNING (None si no existe o está eliminado)
+        """
+        # Solo los campos del modelo con valor (ni None ni cadena vacía)
+        changes = {
+            key: value for key, value in update_data.items()
+            if key in CosmeticColab.__table__.columns and key != "id" and value not in (None, "")
+        }
+        if not changes:
+            return await CosmeticOperations.get_cosmetic_by_id(session, entry_id)
 
+        result = await session.execute(
+            update(CosmeticColab)
+            .where(CosmeticColab.id == entry_id, live(CosmeticColab))
+            .values(**changes)
+            .returning(CosmeticColab)
+        )
+        entry = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(entry)
+        if entry is None:
+            return None
+        search_indexes.index_entry(entry)
         return entry
 
     @staticmethod
     async def delete_cosmetic(session: AsyncSession, entry_id: int) -> Optional[CosmeticColab]:
-        """Elimina un registro por ID y lo guarda en deleted_cosmetic"""
-        entry = await session.get(CosmeticColab, entry_id)
-        if not entry:
+        """Marca un registro como eliminado (un solo UPDATE por la clave primaria); se puede restaurar"""
+        result = await session.execute(
+            update(CosmeticColab)
+            .where(CosmeticColab.id == entry_id, live(CosmeticColab))
+            .values(deleted_at=utcnow())
+            .returning(CosmeticColab)
+        )
+        entry = result.scalar_one_or_none()
+        await session.commit()
+        if entry is None:
             return None
+        search_indexes.discard_entries(CosmeticColab, [entry_id])
+        return entry
 
-        # Validar los datos antes de crear la copia
-        try:
-            deleted_entry = DeletedCosmeticColab(**entry.dict())
-        except ValueError as e:
-            # Manejar errores de validación
-            raise ValueError(f"Error al validar los datos para la tabla de eliminados: {e}")
-
-        session.add(deleted_entry)
-        await session.delete(entry)
+    @staticmethod
+    async def restore_cosmetic(session: AsyncSession, entry_id: int) -> Optional[CosmeticColab]:
+        """Restaura un registro eliminado que todavía no se purgó"""
+        result = await session.execute(
+            update(CosmeticColab)
+            .where(CosmeticColab.id == entry_id, tombstone(CosmeticColab))
+            .values(deleted_at=None)
+            .returning(CosmeticColab)
+        )
+        entry = result.scalar_one_or_none()
         await session.commit()
+        if entry is None:
+            return None
+        search_indexes.index_entry(entry)
         return entry
 
     @staticmethod
-    async def get_deleted_cosmetics(session: AsyncSession) -> List[DeletedCosmeticColab]:
-        """Obtiene todos los registros eliminados de cosméticos"""
-        result = await session.execute(select(DeletedCosmeticColab))
-        return result.scalars().all()
+    async def create_cosmetics_batch(session: AsyncSession, items: List[dict]) -> List[CosmeticColab]:
+        """Crea varios registros en una sola transacción (un INSERT ... RETURNING)"""
+        result = await session.scalars(
+            insert(CosmeticColab).returning(CosmeticColab, sort_by_parameter_order=True), items
+        )
+        entries = result.all()
+        await session.commit()
+        for entry in entries:
+            search_indexes.index_entry(entry)
+        return entries
 
     @staticmethod
-    async def search_cosmetics_by_brand(session: AsyncSession, brand_name: str) -> List[CosmeticColab]:
-        """Busca registros por marca de maquillaje"""
+    async def update_cosmetics_batch(session: AsyncSession, items: List[dict]) -> Set[int]:
+        """
+        Aplica cambios parciales a varios registros en una sola transacción: un UPDATE por
+        conjunto de campos modificados (no uno por elemento), solo sobre registros no eliminados.
+        Devuelve los IDs que se modificaron (los elementos sin cambios no se escriben).
+        """
+        entries = {}
+        for fields, rows in group_batch_changes(items, CosmeticColab).items():
+            for entry in await update_live_rows(session, CosmeticColab, fields, rows):
+                entries[entry.id] = entry
+        await session.commit()
+        for entry in entries.values():
+            search_indexes.index_entry(entry)
+        return set(entries)
+
+    @staticmethod
+    async def delete_cosmetics_batch(session: AsyncSession, ids: List[int]) -> Set[int]:
+        """
+        Marca varios registros como eliminados con un solo UPDATE ... RETURNING.
+        Devuelve los IDs eliminados.
+        """
         result = await session.execute(
-            select(CosmeticColab).where(CosmeticColab.marca_maquillaje.ilike(f"%{brand_name}%"))
+            update(CosmeticColab)
+            .where(CosmeticColab.id.in_(ids), live(CosmeticColab))
+            .values(deleted_at=utcnow())
+            .returning(CosmeticColab.id)
         )
-        return result.scalars().all()
+        deleted = set(result.scalars().all())
+        await session.commit()
+        search_indexes.discard_entries(CosmeticColab, deleted)
+        return deleted
 
     @staticmethod
-    async def filter_by_recent_date(session: AsyncSession) -> List[CosmeticColab]:
-        """Filtra y ordena por fecha más reciente primero"""
-        result = await session.execute(
-            select(CosmeticColab).order_by(CosmeticColab.fecha_colaboracion.desc())
+    async def purge_deleted_cosmetics(
+            session: AsyncSession,
+            older_than: datetime,
+            batch_size: int = PURGE_BATCH_SIZE
+    ) -> int:
+        """
+        Mueve a deleted_cosmetic los registros eliminados antes de 'older_than', por lotes y con una
+        transacción por lote. Devuelve cuántos movió.
+        """
+        columns = [column.name for column in DeletedCosmeticColab.__table__.columns]
+        source = CosmeticColab.__table__
+        archive = DeletedCosmeticColab.__table__
+        fused = session.get_bind().dialect.name == "postgresql"
+        moved = 0
+        while True:
+            # Usa el índice parcial de deleted_at; otros procesos que purgan a la vez saltan las filas bloqueadas
+            batch = (
+                select(source.c.id)
+                .where(source.c.deleted_at < older_than)
+                .order_by(source.c.deleted_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            if fused:
+                # Un solo viaje por lote: WITH moved AS (DELETE ... RETURNING) INSERT INTO archivo SELECT ... FROM moved
+                removed = delete(source).where(source.c.id.in_(batch.scalar_subquery())).returning(
+                    *[source.c[name] for name in columns]
+                ).cte("moved")
+                result = await session.execute(
+                    insert(archive)
+                    .from_select(columns, select(*[removed.c[name] for name in columns]))
+                    .add_cte(removed)
+                    .returning(archive.c.id)
+                )
+                ids = result.scalars().all()
+            else:
+                # SQLite no admite sentencias de escritura dentro de un WITH
+                ids = (await session.execute(batch)).scalars().all()
+                if ids:
+                    await session.execute(
+                        insert(archive).from_select(columns, select(*[source.c[name] for name in columns]).where(source.c.id.in_(ids)))
+                    )
+                    await session.execute(delete(source).where(source.c.id.in_(ids)))
+            await session.commit()
+            if not ids:
+                break
+            moved += len(ids)
+        return moved
+
+    @staticmethod
+    def deleted_query(columns: List[str]):
+        """Eliminados pendientes de purga (índice parcial de deleted_at) y ya archivados, por id"""
+        recent = select(*[getattr(CosmeticColab, column) for column in columns]).where(tombstone(CosmeticColab))
+        archived = select(*[getattr(DeletedCosmeticColab, column) for column in columns])
+        deleted = union_all(recent, archived).subquery()
+        return select(deleted).order_by(deleted.c.id)
+
+    @staticmethod
+    async def get_deleted_cosmetics(session: AsyncSession, as_rows: bool = False) -> List:
+        """Obtiene todos los registros eliminados de cosméticos, restaurables y archivados (como diccionarios si as_rows)"""
+        result = await session.execute(CosmeticOperations.deleted_query(list(DeletedCosmeticColab.model_fields)))
+        if as_rows:
+            return [dict(row) for row in result.mappings()]
+        return result.all()
+
+    @staticmethod
+    async def stream_export_batches(
+            session: AsyncSession,
+            columns: List[str],
+            batch_size: int = DEFAULT_PAGE_SIZE,
+            deleted: bool = False
+    ) -> AsyncIterator[list]:
+        """Lotes de filas (tuplas con 'columns') de los registros activos o de los eliminados, con un cursor del servidor"""
+        if deleted:
+            query = CosmeticOperations.deleted_query(columns)
+        else:
+            query = select(*[getattr(CosmeticColab, column) for column in columns]).where(live(CosmeticColab)).order_by(CosmeticColab.id)
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+    @staticmethod
+    async def count_deleted_cosmetics(session: AsyncSession) -> int:
+        """Cuenta los registros eliminados"""
+        deleted = CosmeticOperations.deleted_query(["id"]).subquery()
+        result = await session.execute(select(func.count()).select_from(deleted))
+        return result.scalar_one()
+
+    @staticmethod
+    async def stream_deleted_cosmetics(
+            session: AsyncSession,
+            batch_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncIterator:
+        """Recorre los registros eliminados (restaurables y archivados) con un cursor del servidor"""
+        query = CosmeticOperations.deleted_query(list(DeletedCosmeticColab.model_fields))
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+    @staticmethod
+    async def search_cosmetics_by_brand(session: AsyncSession, brand_name: str, as_rows: bool = False) -> List[CosmeticColab]:
+        """Busca registros por marca de maquillaje"""
+        query = select(*select_for(CosmeticColab, CosmeticColabResponse, as_rows)).where(
+            live(CosmeticColab),
+            await contains_filter(session, CosmeticColab.marca_maquillaje, brand_name)
         )
-        return result.scalars().all()
+        return await fetch_all(session, query, as_rows)
+
+    @staticmethod
+    async def filter_by_recent_date(
+            session: AsyncSession,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            as_rows: bool = False
+    ) -> List[CosmeticColab]:
+        """Filtra por rango de fechas y ordena por fecha más reciente primero (usa el índice de la fecha)"""
+        query = select(*select_for(CosmeticColab, CosmeticColabResponse, as_rows)).where(live(CosmeticColab)).order_by(CosmeticColab.fecha_colaboracion.desc(), CosmeticColab.id.desc())
+        if date_from is not None:
+            query = query.where(CosmeticColab.fecha_colaboracion >= date_from)
+        if date_to is not None:
+            query = query.where(CosmeticColab.fecha_colaboracion <= date_to)
+        return await fetch_all(session, query.limit(limit), as_rows)
 
     @staticmethod
-    async def search_cosmetic_by_field(session: AsyncSession, field: str, value: str) -> List[CosmeticColab]:
+    async def search_cosmetic_by_field(
+            session: AsyncSession,
+            field: str,
+            value: str,
+            as_rows: bool = False
+    ) -> List[CosmeticColab]:
         """Busca registros por cualquier campo especificado"""
-        if not hasattr(CosmeticColab, field):
+        if field not in CosmeticColab.__table__.columns:
             return []
         
         # Obtener el atributo del modelo
         model_field = getattr(CosmeticColab, field)
         
         # Realizar la búsqueda
-        result = await session.execute(
-            select(CosmeticColab).where(model_field.ilike(f"%{value}%"))
-        )
-        return result.scalars().all()
\ No newline at end of file
+        query = select(*select_for(CosmeticColab, CosmeticColabResponse, as_rows)).where(live(CosmeticColab), await contains_filter(session, model_field, value))
+        return await fetch_all(session, query, as_rows)
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Exportación completa de las tablas en streaming.
+
+Las filas se leen por lotes con un cursor del servidor y cada lote se escribe y se envía antes de
+leer el siguiente, así que la memoria no depende del tamaño de la tabla. Formatos:
+
+    csv      mismas columnas que cargan database/*_to_db.py (se puede volver a importar)
+    ndjson   un objeto JSON por línea
+    parquet  un grupo de filas por lote (requiere pyarrow, dependencia opcional)
+"""
+import asyncio
+import csv
+import io
+import os
+from typing import AsyncIterator, Callable, List, Type
+
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Date, DateTime, Integer
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection_db import async_session
+from database.ingest import load_columns
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+FORMAT_PATTERN = f"^({'|'.join(MEDIA_TYPES)})$"
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # dependencia opcional
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def export_columns(model: Type[SQLModel], deleted: bool = False) -> List[str]:
+    """
+    Columnas exportadas: las mismas que acepta la carga desde CSV (sin las calculadas), con el id
+    primero; los eliminados llevan además deleted_at
+    """
+    columns = ["id", *(column for column in load_columns(model) if column != "id")]
+    return columns + ["deleted_at"] if deleted else columns
+
+
+async def csv_chunks(columns: List[str], batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def ndjson_chunks(columns: List[str], batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in batch)
+
+
+class _Drain:
+    """Destino de ParquetWriter que guarda lo escrito hasta que se envía al cliente"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_type(pa, column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def _arrow_schema(pa, model: Type[SQLModel], columns: List[str]):
+    return pa.schema([(name, _arrow_type(pa, model.__table__.columns[name])) for name in columns])
+
+
+async def parquet_chunks(model: Type[SQLModel], columns: List[str], batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    pa = _pyarrow()
+    schema = _arrow_schema(pa, model, columns)
+    sink = _Drain()
+    writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            table = pa.Table.from_pylist([dict(zip(columns, row)) for row in batch], schema=schema)
+            # La compresión del grupo de filas se hace fuera del event loop
+            await asyncio.to_thread(writer.write_table, table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_response(
+        model: Type[SQLModel],
+        filename: str,
+        fmt: str,
+        stream_batches: Callable[..., AsyncIterator[list]],
+        deleted: bool = False,
+        session_factory: Callable[[], AsyncSession] = async_session
+) -> StreamingResponse:
+    """
+    Respuesta en streaming con la tabla completa. stream_batches(session, columns, batch_size)
+    entrega listas de tuplas; la sesión (de session_factory) es propia de la respuesta, como en
+    las páginas en streaming.
+    """
+    if fmt == "parquet" and _pyarrow() is None:
+        raise HTTPException(status_code=501, detail="La exportación a Parquet requiere instalar pyarrow")
+    columns = export_columns(model, deleted)
+
+    async def body():
+        async with session_factory() as session:
+            batches = stream_batches(session, columns, EXPORT_BATCH_SIZE)
+            if fmt == "csv":
+                chunks = csv_chunks(columns, batches)
+            elif fmt == "ndjson":
+                chunks = ndjson_chunks(columns, batches)
+            else:
+                chunks = parquet_chunks(model, columns, batches)
+            async for chunk in chunks:
+                if chunk:
+                    yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"content-disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
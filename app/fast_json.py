@@ -0,0 +1,36 @@
+"""
+Camino rápido para las respuestas JSON de listas.
+
+Con as_rows=True las operaciones hacen un select() solo de las columnas del modelo de respuesta y
+devuelven diccionarios en lugar de entidades ORM. La ruta los envía en un ORJSONResponse: FastAPI
+no vuelve a validar una respuesta devuelta directamente, y response_model sigue documentando la
+ruta en OpenAPI. Solo para datos que vienen de la propia base de datos.
+"""
+from typing import List, Type
+
+from fastapi.responses import ORJSONResponse
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def response_columns(model: Type[SQLModel], schema: Type[SQLModel]) -> list:
+    """Columnas de la tabla que aparecen en el modelo de respuesta, en el mismo orden"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def select_for(model: Type[SQLModel], schema: Type[SQLModel], as_rows: bool = False) -> tuple:
+    """Lo que se pasa a select(): la entidad completa o solo las columnas de la respuesta"""
+    return tuple(response_columns(model, schema)) if as_rows else (model,)
+
+
+async def fetch_all(session: AsyncSession, query, as_rows: bool = False) -> List:
+    """Entidades ORM, o diccionarios columna -> valor si as_rows"""
+    result = await session.execute(query)
+    if as_rows:
+        return [dict(row) for row in result.mappings()]
+    return result.scalars().all()
+
+
+def rows_response(rows: List[dict]) -> ORJSONResponse:
+    """Respuesta JSON serializada con orjson, sin pasar por response_model"""
+    return ORJSONResponse(rows)
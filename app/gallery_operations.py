@@ -0,0 +1,113 @@
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import String, cast, literal_column, null, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.cosmetic_models import CosmeticColab
+from app.videogame_models import VideogameColab
+from app.pagination import DEFAULT_PAGE_SIZE
+from app.soft_delete import live
+
+COSMETIC = "cosmetic"
+VIDEOGAME = "videogame"
+
+
+class GalleryOperations:
+
+    @staticmethod
+    def parse_cursor(after: Optional[str]) -> Optional[Tuple[int, str]]:
+        """Convierte un cursor 'tipo:id' en la tupla (id, tipo)"""
+        if not after:
+            return None
+        kind, _, entry_id = after.partition(":")
+        return int(entry_id), kind
+
+    @staticmethod
+    def next_cursor(rows: Sequence, limit: int) -> Optional[str]:
+        """Devuelve el cursor 'tipo:id' de la siguiente página, o None si no hay más"""
+        if len(rows) < limit:
+            return None
+        return f"{rows[-1].kind}:{rows[-1].id}"
+
+    @staticmethod
+    def gallery_query(limit: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None, detailed: bool = False):
+        """
+        Consulta (UNION ALL) de una página combinada de cosméticos y videojuegos.
+        Solo se seleccionan las columnas que usan las plantillas; con detailed=True se añaden
+        las columnas de las tablas de registros. El orden es (id, tipo).
+        """
+        cosmetic_columns = [
+            literal_column(f"'{COSMETIC}'", String).label("kind"),
+            CosmeticColab.id.label("id"),
+            CosmeticColab.marca_maquillaje.label("marca_maquillaje"),
+            CosmeticColab.videojuego.label("videojuego"),
+            CosmeticColab.fecha_colaboracion.label("fecha_colaboracion"),
+            CosmeticColab.image_url.label("image_url"),
+            CosmeticColab.image_thumb_url.label("image_thumb_url"),
+            CosmeticColab.image_medium_url.label("image_medium_url"),
+        ]
+        videogame_columns = [
+            literal_column(f"'{VIDEOGAME}'", String).label("kind"),
+            VideogameColab.id.label("id"),
+            VideogameColab.marca_maquillaje.label("marca_maquillaje"),
+            VideogameColab.videojuego.label("videojuego"),
+            VideogameColab.fecha_colaboracion.label("fecha_colaboracion"),
+            VideogameColab.image_url.label("image_url"),
+            VideogameColab.image_thumb_url.label("image_thumb_url"),
+            VideogameColab.image_medium_url.label("image_medium_url"),
+        ]
+        if detailed:
+            cosmetic_columns += [
+                CosmeticColab.tipo_colaboracion.label("tipo_colaboracion"),
+                CosmeticColab.incremento_ventas_maquillaje.label("incremento_ventas_maquillaje"),
+                cast(null(), String).label("incremento_ventas_videojuego"),
+            ]
+            videogame_columns += [
+                cast(null(), String).label("tipo_colaboracion"),
+                cast(null(), String).label("incremento_ventas_maquillaje"),
+                VideogameColab.incremento_ventas_videojuego.label("incremento_ventas_videojuego"),
+            ]
+
+        cosmetics = select(*cosmetic_columns).where(live(CosmeticColab))
+        games = select(*videogame_columns).where(live(VideogameColab))
+
+        # El cursor se aplica dentro de cada rama para que use el índice de la clave primaria
+        cursor = GalleryOperations.parse_cursor(after)
+        if cursor is not None:
+            entry_id, kind = cursor
+            cosmetics = cosmetics.where(CosmeticColab.id > entry_id)
+            if kind == COSMETIC:
+                games = games.where(VideogameColab.id >= entry_id)
+            else:
+                games = games.where(VideogameColab.id > entry_id)
+
+        # Cada rama aporta como máximo 'limit' filas antes de combinar
+        cosmetics = select(cosmetics.order_by(CosmeticColab.id).limit(limit).subquery())
+        games = select(games.order_by(VideogameColab.id).limit(limit).subquery())
+
+        feed = union_all(cosmetics, games).subquery()
+        return select(feed).order_by(feed.c.id, feed.c.kind).limit(limit)
+
+    @staticmethod
+    async def get_gallery_feed(
+            session: AsyncSession,
+            limit: int = DEFAULT_PAGE_SIZE,
+            after: Optional[str] = None,
+            detailed: bool = False
+    ) -> List:
+        """Obtiene en una sola consulta una página combinada de cosméticos y videojuegos"""
+        result = await session.execute(GalleryOperations.gallery_query(limit, after, detailed))
+        return result.all()
+
+    @staticmethod
+    async def stream_gallery_feed(
+            session: AsyncSession,
+            limit: int = DEFAULT_PAGE_SIZE,
+            after: Optional[str] = None,
+            detailed: bool = False,
+            batch_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncIterator:
+        """Igual que get_gallery_feed, pero entrega las filas a medida que llegan de la base de datos"""
+        query = GalleryOperations.gallery_query(limit, after, detailed).execution_options(yield_per=batch_size)
+        result = await session.stream(query)
+        async for row in result:
+            yield row
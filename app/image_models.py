@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class ImageBlob(SQLModel, table=True):
+    """Imagen guardada, identificada por el SHA-256 de su contenido"""
+    __tablename__ = "image_blobs"
+    sha256: str = Field(primary_key=True, min_length=64, max_length=64)
+    size: int
+    content_type: str = Field(..., max_length=100)
+    image_url: str = Field(..., max_length=500)
+    image_thumb_url: Optional[str] = Field(None, max_length=500)
+    image_medium_url: Optional[str] = Field(None, max_length=500)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.image_models import ImageBlob
+
+
+class ImageBlobOperations:
+
+    @staticmethod
+    async def get_blob(session: AsyncSession, sha256: str) -> Optional[ImageBlob]:
+        """Busca una imagen ya guardada por el hash de su contenido"""
+        return await session.get(ImageBlob, sha256)
+
+    @staticmethod
+    async def register_blob(session: AsyncSession, data: dict) -> ImageBlob:
+        """Registra una imagen nueva; si otra subida la registró antes, devuelve esa"""
+        blob = ImageBlob(**data)
+        session.add(blob)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Dos subidas simultáneas del mismo contenido: gana la primera
+            await session.rollback()
+            return await session.get(ImageBlob, data["sha256"])
+        return blob
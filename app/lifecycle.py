@@ -0,0 +1,140 @@
+"""
+Arranque y apagado de la aplicación (lifespan de FastAPI).
+
+Importar app.main no abre conexiones (de app/.env solo lee dónde se sirve /uploads): los engines,
+el almacenamiento de imágenes y el pool de procesos de variantes se crean con el primer uso. El lifespan hace explícito el resto
+y mide cada fase (GET /health/startup y app_startup_phase_seconds en /metrics):
+
+    schema      crea las tablas que faltan y aplica migraciones (DB_INIT_ON_STARTUP, activo por defecto)
+    db_warmup   abre DB_WARMUP_CONNECTIONS conexiones por engine antes de la primera petición
+    templates   compila las plantillas y prerenderiza las páginas estáticas
+    static      genera las variantes .gz/.br de los estáticos en STATIC_COMPRESSED_DIR (opcional:
+                sin ese directorio no se escribe nada y los estáticos se sirven sin comprimir)
+    purge       arranca la purga periódica de eliminados (SOFT_DELETE_PURGE_INTERVAL)
+
+Un fallo en schema impide arrancar; en db_warmup o static solo se registra (el proceso arranca sin base
+de datos, p. ej. sin red, y /health/db lo indica). Al apagar se detiene la purga y se cierran el
+almacenamiento, el pool de procesos de variantes y los pools de la base de datos.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from fastapi import FastAPI
+from starlette.routing import Mount
+
+from app.metrics import METRICS_ENABLED, Gauge, install_query_metrics, registry
+from app.rendering import renderer
+from app.static_files import CachedStaticFiles
+from app.soft_delete import PURGE_INTERVAL
+from bucket.image_variants import shutdown_executor
+from bucket.storage import close_storage
+from database.connection_db import database, init_db
+from database.purge_deleted import purge_loop
+
+logger = logging.getLogger(__name__)
+
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+DB_WARMUP_CONNECTIONS = int(os.getenv("DB_WARMUP_CONNECTIONS", "1"))
+STATIC_COMPRESSED_DIR = os.getenv("STATIC_COMPRESSED_DIR")
+
+
+@dataclass
+class StartupReport:
+    """Duración de cada fase del arranque (segundos) y errores de las fases no obligatorias"""
+    phases: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    ready: bool = False
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+            "total_ms": round(sum(self.phases.values()) * 1000, 2),
+            "errors": self.errors,
+        }
+
+
+startup_report = StartupReport()
+registry.register(Gauge(
+    "app_startup_phase_seconds", "Duración de cada fase del arranque del proceso",
+    lambda: [((name,), seconds) for name, seconds in startup_report.phases.items()], ("phase",),
+))
+
+# Tareas en segundo plano del proceso (se cancelan al apagar)
+_background: List[asyncio.Task] = []
+
+
+async def run_phase(name: str, action: Callable, required: bool = True):
+    """Ejecuta y mide una fase; si no es obligatoria, un error se registra y el arranque sigue"""
+    started = time.perf_counter()
+    try:
+        result = action()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        if required:
+            raise
+        logger.warning("Fase de arranque '%s' falló: %s", name, e)
+        startup_report.errors[name] = str(e)
+    finally:
+        startup_report.phases[name] = time.perf_counter() - started
+
+
+def _precompile_templates():
+    renderer.precompile()
+    renderer.prerender()
+
+
+def _precompress_static(app: FastAPI, directory: str):
+    for route in app.routes:
+        if isinstance(route, Mount) and isinstance(route.app, CachedStaticFiles):
+            route.app.prepare(os.path.join(directory, route.name))
+
+
+def _start_purge():
+    _background.append(asyncio.create_task(purge_loop()))
+
+
+async def startup(app: FastAPI):
+    # Consultas por petición y estado del pool en /metrics (antes de que se creen los engines)
+    if METRICS_ENABLED:
+        database.add_engine_hook(install_query_metrics)
+    if DB_INIT_ON_STARTUP:
+        await run_phase("schema", init_db)
+    if DB_WARMUP_CONNECTIONS > 0:
+        await run_phase("db_warmup", lambda: database.warmup(DB_WARMUP_CONNECTIONS), required=False)
+    await run_phase("templates", _precompile_templates)
+    if STATIC_COMPRESSED_DIR:
+        await run_phase("static", lambda: _precompress_static(app, STATIC_COMPRESSED_DIR), required=False)
+    # Archivo periódico de los registros eliminados (borrado lógico)
+    if PURGE_INTERVAL > 0:
+        await run_phase("purge", _start_purge)
+    startup_report.ready = True
+    logger.info("Aplicación lista: %s", startup_report.snapshot())
+
+
+async def shutdown():
+    startup_report.ready = False
+    while _background:
+        task = _background.pop()
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_storage()
+    shutdown_executor()
+    await database.dispose()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup(app)
+    try:
+        yield
+    finally:
+        await shutdown()
@@ -1,133 +1,238 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, Form, UploadFile
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Depends, Request, Form, UploadFile, Query, Body
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from datetime import date
+from typing import List, Optional
 from sqlmodel.ext.asyncio.session import AsyncSession
-from database.connection_db import get_session
-from fastapi.templating import Jinja2Templates
+from database.connection_db import database, db_health, get_write_session
+from pydantic import ValidationError
 import os
+from functools import partial
 
-from app.cosmetic_models import CosmeticColab, CosmeticColabBase, CosmeticColabResponse, CosmeticColabCreate,CosmeticColabUpdate, CosmeticColabRead, DeletedCosmeticColab
-from bucket.upload_images import save_file
-from app.videogame_models import VideogameColab, VideogameColabBase, VideogameColabResponse, VideogameColabCreate, VideogameColabUpdate, VideogameColabRead, DeletedVideogameColab
+from app.cosmetic_models import CosmeticColab, CosmeticColabBase, CosmeticColabResponse, CosmeticColabCreate,CosmeticColabUpdate, CosmeticColabRead, DeletedCosmeticColab, CosmeticColabBatchUpdate
+from bucket.upload_images import UploadBodyLimitMiddleware, save_file
+from bucket.storage import local_storage_config
+from app.videogame_models import VideogameColab, VideogameColabBase, VideogameColabResponse, VideogameColabCreate, VideogameColabUpdate, VideogameColabRead, DeletedVideogameColab, VideogameColabBatchUpdate
 from app.cosmetic_operations import CosmeticOperations
 from app.videogame_operations import VideogameOperations
+from app.gallery_operations import GalleryOperations, COSMETIC, VIDEOGAME
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.fast_json import rows_response
+from app.export import FORMAT_PATTERN, export_response
+from app.search_models import SearchResult
+from app.search_operations import SearchOperations
+from app.analytics_models import UpliftByType, UpliftByYear, UpliftRanking
+from app.analytics_operations import AnalyticsOperations
+from app.batch_models import BatchDeleteRequest, BatchItemResult, MAX_BATCH_SIZE, batch_status
+from app.cache import ResponseCacheMiddleware, cached, response_cache
+from app.tables import COSMETICS, VIDEOGAMES
+from app.static_files import CachedStaticFiles
+from app.rendering import STATIC_DIR, RowStream, renderer, templates
+from app.read_replica import ReadYourWritesMiddleware, get_read_session, read_session_factory
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, registry as metrics_registry, track_render
+from app.lifecycle import lifespan, startup_report
+
 
 app = FastAPI(
     title="Colaboraciones Maquillaje y Videojuegos",
     description="API para gestionar colaboraciones entre marcas de 👄 **maquillaje** 💄 y 🕹️ **videojuegos** 🎮.",
-    version="La mejor"
+    version="La mejor",
+    lifespan=lifespan
 )
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "..", "templates"))
+# Las lecturas cacheadas se responden antes de abrir una sesión de base de datos
+app.add_middleware(ResponseCacheMiddleware)
+
+# Con réplica de lectura: después de escribir, el cliente vuelve a leer del primario un momento
+app.add_middleware(ReadYourWritesMiddleware, enabled=lambda: database.replica_engine is not None)
+
+# Formularios con imagen: el cuerpo se limita antes de que Starlette lo guarde
+app.add_middleware(UploadBodyLimitMiddleware)
+
+# Latencia por ruta, consultas por petición y Server-Timing (mide también las respuestas de la caché)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# CSS/JS de las plantillas (con variantes .br/.gz) e imágenes guardadas con STORAGE_BACKEND=local
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR, compress=True), name="static")
+# La misma configuración (entorno o app/.env) que usa LocalStorage para guardar y generar las URL
+UPLOADS_ROOT, UPLOADS_URL = local_storage_config()
+app.mount(UPLOADS_URL, CachedStaticFiles(directory=UPLOADS_ROOT, check_dir=False, immutable=True), name="uploads")
+
+GALLERY_CURSOR_PATTERN = rf"^({COSMETIC}|{VIDEOGAME}):\d+$"
 
 # Página de inicio
 @app.get("/", response_class=HTMLResponse, tags=["Página Principal"])
+@cached(COSMETICS, VIDEOGAMES)
 async def root(
         request: Request,
-        session: AsyncSession = Depends(get_session)
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, pattern=GALLERY_CURSOR_PATTERN),
+        session: AsyncSession = Depends(get_read_session)
 ):
-    # Obtener todos los registros de cosméticos
-    cosmetics = await CosmeticOperations.get_all_cosmetics(session)
-    # Obtener todos los registros de videojuegos
-    games = await VideogameOperations.get_all_videogames(session)
-
-    # Combinar las dos listas
-    all_images = list(cosmetics) + list(games)
-
-    return templates.TemplateResponse(
-        "home.html",
-        {
-            "request": request,
-            "all_images": all_images
-        }
-    )
+    # Una sola consulta para las imágenes de cosméticos y videojuegos
+    all_images = await GalleryOperations.get_gallery_feed(session, limit, after)
+
+    with track_render("home.html"):
+        return templates.TemplateResponse(
+            "home.html",
+            {
+                "request": request,
+                "all_images": all_images,
+                "limit": limit,
+                "next_after": GalleryOperations.next_cursor(all_images, limit)
+            }
+        )
 
 # --------------- ELIMINADOS -----------
 @app.get("/cosmetics/deleted", response_model=List[DeletedCosmeticColab], tags=["Eliminados"])
-async def get_deleted_cosmetics(session: AsyncSession = Depends(get_session)):
+@cached(COSMETICS)
+async def get_deleted_cosmetics(session: AsyncSession = Depends(get_read_session)):
     """Obtiene todos los cosméticos eliminados"""
-    return await CosmeticOperations.get_deleted_cosmetics(session)
+    return rows_response(await CosmeticOperations.get_deleted_cosmetics(session, as_rows=True))
 
 
 @app.get("/videogames/deleted", response_model=List[DeletedVideogameColab], tags=["Eliminados"])
-async def get_deleted_videogames(session: AsyncSession = Depends(get_session)):
+@cached(VIDEOGAMES)
+async def get_deleted_videogames(session: AsyncSession = Depends(get_read_session)):
     """Obtiene todos los videojuegos eliminados"""
-    return await VideogameOperations.get_deleted_videogames(session)
+    return rows_response(await VideogameOperations.get_deleted_videogames(session, as_rows=True))
 
 
 @app.get("/deleted", response_class=HTMLResponse, tags=["Eliminados"])
-async def view_deleted(request: Request, session: AsyncSession = Depends(get_session)):
-    deleted_cosmetics = await CosmeticOperations.get_deleted_cosmetics(session)
-    deleted_videogames = await VideogameOperations.get_deleted_videogames(session)
+@cached(COSMETICS, VIDEOGAMES)
+async def view_deleted(request: Request):
+    # Las dos tablas se recorren una tras otra con la misma sesión
+    return renderer.stream_page("deleted.html", lambda session: {
+        "request": request,
+        "deleted_cosmetics": RowStream(CosmeticOperations.stream_deleted_cosmetics(session)),
+        "deleted_videogames": RowStream(VideogameOperations.stream_deleted_videogames(session)),
+        # La plantilla las llama (y Jinja espera la consulta) al escribir los contadores de las pestañas
+        "count_deleted_cosmetics": partial(CosmeticOperations.count_deleted_cosmetics, session),
+        "count_deleted_videogames": partial(VideogameOperations.count_deleted_videogames, session)
+    }, read_session_factory(request))
+
+@app.post("/cosmetics/restore", response_model=CosmeticColabResponse, tags=["Eliminados"])
+async def restore_cosmetic(id: int = Form(...), session: AsyncSession = Depends(get_write_session)):
+    """Restaura un cosmético eliminado que todavía no se movió al archivo"""
+    entry = await CosmeticOperations.restore_cosmetic(session, id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="No hay un cosmético eliminado restaurable con ese ID")
+    return entry
+
+
+@app.post("/videogames/restore", response_model=VideogameColabResponse, tags=["Eliminados"])
+async def restore_videogame(id: int = Form(...), session: AsyncSession = Depends(get_write_session)):
+    """Restaura un videojuego eliminado que todavía no se movió al archivo"""
+    entry = await VideogameOperations.restore_videogame(session, id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="No hay un videojuego eliminado restaurable con ese ID")
+    return entry
+
+# --------------- EXPORTACIÓN -----------
+@app.get("/cosmetics/export", tags=["Exportación"])
+async def export_cosmetics(
+        request: Request,
+        fmt: str = Query("csv", alias="format", pattern=FORMAT_PATTERN),
+        deleted: bool = Query(False, description="Exporta los registros eliminados (restaurables y archivados)")
+):
+    """Todas las colaboraciones cosméticas en CSV, NDJSON o Parquet, enviadas por lotes"""
+    return export_response(
+        CosmeticColab,
+        "deleted_cosmetics" if deleted else "cosmetics",
+        fmt,
+        partial(CosmeticOperations.stream_export_batches, deleted=deleted),
+        deleted,
+        read_session_factory(request)
+    )
 
-    return templates.TemplateResponse(
-        "deleted.html",
-        {
-            "request": request,
-            "deleted_cosmetics": deleted_cosmetics,
-            "deleted_videogames": deleted_videogames
-        }
+@app.get("/videogames/export", tags=["Exportación"])
+async def export_videogames(
+        request: Request,
+        fmt: str = Query("csv", alias="format", pattern=FORMAT_PATTERN),
+        deleted: bool = Query(False, description="Exporta los registros eliminados (restaurables y archivados)")
+):
+    """Todas las colaboraciones de videojuegos en CSV, NDJSON o Parquet, enviadas por lotes"""
+    return export_response(
+        VideogameColab,
+        "deleted_videogames" if deleted else "videogames",
+        fmt,
+        partial(VideogameOperations.stream_export_batches, deleted=deleted),
+        deleted,
+        read_session_factory(request)
     )
 
 @app.get("/delete", response_class=HTMLResponse, tags=["Eliminación"])
 async def delete_page(request: Request):
     """Página para eliminar registros"""
-    return templates.TemplateResponse("delete.html", {"request": request})
+    return renderer.static_page(request, "delete.html")
 
 # -------------------- COSMETICS --------------------
 
 @app.get("/cosmetics", response_class=HTMLResponse, tags=["Maquillaje"])
-async def get_cosmetics(request: Request, session: AsyncSession = Depends(get_session)):
-    records = await CosmeticOperations.get_all_cosmetics(session)
-    return templates.TemplateResponse(
-        "records.html",
-        {
-            "request": request,
-            "records": records,
-            "tipo": "cosmetics"
-        }
-    )
+@cached(COSMETICS)
+async def get_cosmetics(
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[int] = Query(None, ge=0)
+):
+    # La cabecera se envía de inmediato y las filas a medida que llegan de la base de datos
+    return renderer.stream_page("records.html", lambda session: {
+        "request": request,
+        "records": RowStream(CosmeticOperations.stream_all_cosmetics(session, after, limit=limit), limit),
+        "tipo": "cosmetics",
+        "limit": limit,
+        "after": after
+    }, read_session_factory(request))
 
 @app.get("/cosmetics/search_by_brand", response_model=List[CosmeticColabResponse], tags=["Maquillaje"])
-async def search_by_brand(marca_maquillaje: str, session: AsyncSession = Depends(get_session)):
-    results = await CosmeticOperations.search_cosmetics_by_brand(session, marca_maquillaje)
+@cached(COSMETICS)
+async def search_by_brand(marca_maquillaje: str, session: AsyncSession = Depends(get_read_session)):
+    results = await CosmeticOperations.search_cosmetics_by_brand(session, marca_maquillaje, as_rows=True)
     if not results:
         raise HTTPException(status_code=404, detail="No se encontraron colaboraciones con esa marca")
-    return results
+    return rows_response(results)
 
 @app.get("/cosmetics/search_by_field", response_model=List[CosmeticColabResponse], tags=["Maquillaje"])
+@cached(COSMETICS)
 async def search_cosmetic_by_field(
     field: str,
     value: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Busca colaboraciones cosméticas por cualquier campo especificado.
     Campos disponibles: marca_maquillaje, videojuego, fecha_colaboracion, tipo_colaboracion, incremento_ventas_maquillaje, image_url
     """
-    results = await CosmeticOperations.search_cosmetic_by_field(session, field, value)
+    results = await CosmeticOperations.search_cosmetic_by_field(session, field, value, as_rows=True)
     if not results:
         raise HTTPException(
             status_code=404,
             detail=f"No se encontraron colaboraciones con {field} que contenga '{value}'"
         )
-    return results
+    return rows_response(results)
 
 @app.get("/cosmetics/by_date", response_model=List[CosmeticColabResponse], tags=["Maquillaje"])
-async def get_cosmetics_by_recent_date(session: AsyncSession = Depends(get_session)):
-    return await CosmeticOperations.filter_by_recent_date(session)
+@cached(COSMETICS)
+async def get_cosmetics_by_recent_date(
+        date_from: Optional[date] = Query(None, alias="from"),
+        date_to: Optional[date] = Query(None, alias="to"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        session: AsyncSession = Depends(get_read_session)
+):
+    """Colaboraciones entre las fechas 'from' y 'to' (incluidas), las más recientes primero"""
+    return rows_response(await CosmeticOperations.filter_by_recent_date(session, date_from, date_to, limit, as_rows=True))
 
 @app.get("/cosmetics/{cosmetic_id}", response_model=CosmeticColabResponse, tags=["Maquillaje"])
-async def get_cosmetic(cosmetic_id: int, session: AsyncSession = Depends(get_session)):
+@cached(COSMETICS)
+async def get_cosmetic(cosmetic_id: int, session: AsyncSession = Depends(get_read_session)):
     cosmetic = await CosmeticOperations.get_cosmetic_by_id(session, cosmetic_id)
     if not cosmetic:
         raise HTTPException(status_code=404, detail="Colaboración de maquillaje no encontrada")
     return cosmetic
 
 @app.post("/cosmetics", response_model=CosmeticColabResponse, tags=["Maquillaje"])
-async def create_cosmetic_endpoint(cosmetic: CosmeticColabCreate, session: AsyncSession = Depends(get_session)):
+async def create_cosmetic_endpoint(cosmetic: CosmeticColabCreate, session: AsyncSession = Depends(get_write_session)):
     return await CosmeticOperations.create_cosmetic(session, cosmetic.model_dump())
 
 
@@ -140,7 +245,7 @@ async def update_cosmetic_endpoint(
         tipo_colaboracion: str = Form(None),
         incremento_ventas_maquillaje: str = Form(None),
         image_file: UploadFile = None,
-        session: AsyncSession = Depends(get_session)
+        session: AsyncSession = Depends(get_write_session)
 ):
     """
     Actualiza un registro de colaboración de maquillaje.
@@ -155,12 +260,19 @@ async def update_cosmetic_endpoint(
     if tipo_colaboracion: update_data["tipo_colaboracion"] = tipo_colaboracion
     if incremento_ventas_maquillaje: update_data["incremento_ventas_maquillaje"] = incremento_ventas_maquillaje
 
+    # Validar con el esquema de actualización (formato de fecha e incremento)
+    try:
+        update_data = CosmeticColabUpdate(**update_data).model_dump(exclude_none=True)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
     # Si hay una nueva imagen, procesarla
     if image_file and image_file.filename:
-        image_url = await save_file(image_file)
-        if isinstance(image_url, dict) and "error" in image_url:
-            raise HTTPException(status_code=400, detail=image_url["error"])
-        update_data["image_url"] = image_url
+        images = await save_file(image_file, session=session)
+        if "error" in images:
+            raise HTTPException(status_code=400, detail=images["error"])
+        images.pop("dedup")
+        update_data.update(images)
 
     updated = await CosmeticOperations.update_cosmetic(session, cosmetic_id, update_data)
     if not updated:
@@ -172,15 +284,16 @@ async def update_cosmetic_endpoint(
 async def create_cosmetic_with_image(
     marca_maquillaje: str = Form(...),
     videojuego: str = Form(...),
-    fecha_colaboracion: str = Form(...),
+    fecha_colaboracion: date = Form(...),
     tipo_colaboracion: str = Form(...),
-    incremento_ventas_maquillaje: str = Form(...),
+    incremento_ventas_maquillaje: str = Form(..., pattern=r'^\d+%$'),
     image_file: UploadFile = Form(...),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
-    image_url = await save_file(image_file)
-    if isinstance(image_url, dict) and "error" in image_url:
-        raise HTTPException(status_code=400, detail=image_url["error"])
+    images = await save_file(image_file, session=session)
+    if "error" in images:
+        raise HTTPException(status_code=400, detail=images["error"])
+    dedup = images.pop("dedup")
 
     new_data = CosmeticColabCreate(
         marca_maquillaje=marca_maquillaje,
@@ -188,21 +301,18 @@ async def create_cosmetic_with_image(
         fecha_colaboracion=fecha_colaboracion,
         tipo_colaboracion=tipo_colaboracion,
         incremento_ventas_maquillaje=incremento_ventas_maquillaje,
-        image_url=image_url
+        **images
     )
 
-    new_colab = CosmeticColab.from_orm(new_data)
-    session.add(new_colab)
-    await session.commit()
-    await session.refresh(new_colab)
+    new_colab = await CosmeticOperations.create_cosmetic(session, new_data.model_dump())
 
-    return {"id": new_colab.id}
+    return {"id": new_colab.id, "dedup": dedup}
 
 @app.post("/cosmetics/delete", tags=["Maquillaje"])
 async def delete_cosmetic_by_id(
     request: Request,
     id: int = Form(...),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     deleted = await CosmeticOperations.delete_cosmetic(session, id)
     if not deleted:
@@ -213,58 +323,105 @@ async def delete_cosmetic_by_id(
     return {"message": "Registro de cosmético eliminado con éxito"}
 
 
+# --- Lotes ---
+@app.post("/cosmetics/batch", response_model=List[BatchItemResult], tags=["Maquillaje"])
+async def create_cosmetics_batch(
+        items: List[CosmeticColabCreate] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+        session: AsyncSession = Depends(get_write_session)
+):
+    """Crea varios registros de maquillaje en una sola transacción"""
+    entries = await CosmeticOperations.create_cosmetics_batch(session, [item.model_dump() for item in items])
+    return [BatchItemResult(id=entry.id, status="created") for entry in entries]
+
+@app.patch("/cosmetics/batch", response_model=List[BatchItemResult], tags=["Maquillaje"])
+async def update_cosmetics_batch(
+        items: List[CosmeticColabBatchUpdate] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+        session: AsyncSession = Depends(get_write_session)
+):
+    """Actualiza parcialmente varios registros de maquillaje en una sola transacción"""
+    rows = [item.model_dump() for item in items]
+    updated = await CosmeticOperations.update_cosmetics_batch(session, rows)
+    return [
+        BatchItemResult(id=row["id"], status=batch_status(row, CosmeticColab, updated))
+        for row in rows
+    ]
+
+@app.post("/cosmetics/delete/batch", response_model=List[BatchItemResult], tags=["Eliminación"])
+async def delete_cosmetics_batch(payload: BatchDeleteRequest, session: AsyncSession = Depends(get_write_session)):
+    """Elimina varios registros de maquillaje en una sola transacción"""
+    deleted = await CosmeticOperations.delete_cosmetics_batch(session, payload.ids)
+    return [
+        BatchItemResult(id=entry_id, status="deleted" if entry_id in deleted else "not_found")
+        for entry_id in payload.ids
+    ]
+
+
 # -------------------- VIDEOGAMES --------------------
 
 @app.get("/videogames", response_class=HTMLResponse, tags=["Videojuegos"])
-async def get_videogames(request: Request, session: AsyncSession = Depends(get_session)):
-    records = await VideogameOperations.get_all_videogames(session)
-    return templates.TemplateResponse(
-        "records.html",
-        {
-            "request": request,
-            "records": records,
-            "tipo": "videogames"
-        }
-    )
+@cached(VIDEOGAMES)
+async def get_videogames(
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[int] = Query(None, ge=0)
+):
+    # La cabecera se envía de inmediato y las filas a medida que llegan de la base de datos
+    return renderer.stream_page("records.html", lambda session: {
+        "request": request,
+        "records": RowStream(VideogameOperations.stream_all_videogames(session, after, limit=limit), limit),
+        "tipo": "videogames",
+        "limit": limit,
+        "after": after
+    }, read_session_factory(request))
 
 @app.get("/videogames/search_by_name", response_model=List[VideogameColabResponse], tags=["Videojuegos"])
-async def search_by_name(nombre_videojuego: str, session: AsyncSession = Depends(get_session)):
-    results = await VideogameOperations.search_videogames_by_name(session, nombre_videojuego)
+@cached(VIDEOGAMES)
+async def search_by_name(nombre_videojuego: str, session: AsyncSession = Depends(get_read_session)):
+    results = await VideogameOperations.search_videogames_by_name(session, nombre_videojuego, as_rows=True)
     if not results:
         raise HTTPException(status_code=404, detail="No se encontraron colaboraciones con ese videojuego")
-    return results
+    return rows_response(results)
 
 @app.get("/videogames/search_by_field", response_model=List[VideogameColabResponse], tags=["Videojuegos"])
+@cached(VIDEOGAMES)
 async def search_videogame_by_field(
     field: str,
     value: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Busca colaboraciones de videojuegos por cualquier campo especificado.
     Campos disponibles: videojuego, marca_maquillaje, fecha_colaboracion, incremento_ventas_videojuego, image_url
     """
-    results = await VideogameOperations.search_videogame_by_field(session, field, value)
+    results = await VideogameOperations.search_videogame_by_field(session, field, value, as_rows=True)
     if not results:
         raise HTTPException(
             status_code=404,
             detail=f"No se encontraron colaboraciones con {field} que contenga '{value}'"
         )
-    return results
+    return rows_response(results)
 
 @app.get("/videogames/by_date", response_model=List[VideogameColabResponse], tags=["Videojuegos"])
-async def get_videogames_by_recent_date(session: AsyncSession = Depends(get_session)):
-    return await VideogameOperations.filter_by_recent_date(session)
+@cached(VIDEOGAMES)
+async def get_videogames_by_recent_date(
+        date_from: Optional[date] = Query(None, alias="from"),
+        date_to: Optional[date] = Query(None, alias="to"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        session: AsyncSession = Depends(get_read_session)
+):
+    """Colaboraciones entre las fechas 'from' y 'to' (incluidas), las más recientes primero"""
+    return rows_response(await VideogameOperations.filter_by_recent_date(session, date_from, date_to, limit, as_rows=True))
 
 @app.get("/videogames/{videogame_id}", response_model=VideogameColabResponse, tags=["Videojuegos"])
-async def get_videogame(videogame_id: int, session: AsyncSession = Depends(get_session)):
+@cached(VIDEOGAMES)
+async def get_videogame(videogame_id: int, session: AsyncSession = Depends(get_read_session)):
     videogame = await VideogameOperations.get_videogame_by_id(session, videogame_id)
     if not videogame:
         raise HTTPException(status_code=404, detail="Colaboración de videojuego no encontrada")
     return videogame
 
 @app.post("/videogames", response_model=VideogameColabResponse, tags=["Videojuegos"])
-async def create_videogame_endpoint(videogame: VideogameColabCreate, session: AsyncSession = Depends(get_session)):
+async def create_videogame_endpoint(videogame: VideogameColabCreate, session: AsyncSession = Depends(get_write_session)):
     return await VideogameOperations.create_videogame(session, videogame.model_dump())
 
 @app.put("/videogames/{videogame_id}", response_model=VideogameColabResponse, tags=["Videojuegos"])
@@ -275,7 +432,7 @@ async def update_videogame_endpoint(
         fecha_colaboracion: str = Form(None),
         incremento_ventas_videojuego: str = Form(None),
         image_file: UploadFile = None,
-        session: AsyncSession = Depends(get_session)
+        session: AsyncSession = Depends(get_write_session)
 ):
     """
     Actualiza un registro de colaboración de videojuegos.
@@ -289,12 +446,19 @@ async def update_videogame_endpoint(
     if fecha_colaboracion: update_data["fecha_colaboracion"] = fecha_colaboracion
     if incremento_ventas_videojuego: update_data["incremento_ventas_videojuego"] = incremento_ventas_videojuego
 
+    # Validar con el esquema de actualización (formato de fecha e incremento)
+    try:
+        update_data = VideogameColabUpdate(**update_data).model_dump(exclude_none=True)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
     # Si hay una nueva imagen, procesarla
     if image_file and image_file.filename:
-        image_url = await save_file(image_file)
-        if isinstance(image_url, dict) and "error" in image_url:
-            raise HTTPException(status_code=400, detail=image_url["error"])
-        update_data["image_url"] = image_url
+        images = await save_file(image_file, session=session)
+        if "error" in images:
+            raise HTTPException(status_code=400, detail=images["error"])
+        images.pop("dedup")
+        update_data.update(images)
 
     updated = await VideogameOperations.update_videogame(session, videogame_id, update_data)
     if not updated:
@@ -306,36 +470,34 @@ async def update_videogame_endpoint(
 async def create_videogame_with_image(
     videojuego: str = Form(...),
     marca_maquillaje: str = Form(...),
-    fecha_colaboracion: str = Form(...),
-    incremento_ventas_videojuego: str = Form(...),
+    fecha_colaboracion: date = Form(...),
+    incremento_ventas_videojuego: str = Form(..., pattern=r'^\d+%$'),
     image_file: UploadFile = Form(...),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
-    image_url = await save_file(image_file)
-    if isinstance(image_url, dict) and "error" in image_url:
-        raise HTTPException(status_code=400, detail=image_url["error"])
+    images = await save_file(image_file, session=session)
+    if "error" in images:
+        raise HTTPException(status_code=400, detail=images["error"])
+    dedup = images.pop("dedup")
 
     new_data = VideogameColabCreate(
         videojuego=videojuego,
         marca_maquillaje=marca_maquillaje,
         fecha_colaboracion=fecha_colaboracion,
         incremento_ventas_videojuego=incremento_ventas_videojuego,
-        image_url=image_url
+        **images
     )
 
-    new_colab = VideogameColab.from_orm(new_data)
-    session.add(new_colab)
-    await session.commit()
-    await session.refresh(new_colab)
+    new_colab = await VideogameOperations.create_videogame(session, new_data.model_dump())
 
-    return {"id": new_colab.id}
+    return {"id": new_colab.id, "dedup": dedup}
 
 
 @app.post("/videogames/delete", tags=["Eliminación"])
 async def delete_videogame_by_id(
     request: Request,
     id: int = Form(...),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     deleted = await VideogameOperations.delete_videogame(session, id)
     if not deleted:
@@ -345,56 +507,163 @@ async def delete_videogame_by_id(
         )
     return {"message": "Registro de videojuego eliminado con éxito"}
 
+# --- Lotes ---
+@app.post("/videogames/batch", response_model=List[BatchItemResult], tags=["Videojuegos"])
+async def create_videogames_batch(
+        items: List[VideogameColabCreate] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+        session: AsyncSession = Depends(get_write_session)
+):
+    """Crea varios registros de videojuegos en una sola transacción"""
+    entries = await VideogameOperations.create_videogames_batch(session, [item.model_dump() for item in items])
+    return [BatchItemResult(id=entry.id, status="created") for entry in entries]
+
+@app.patch("/videogames/batch", response_model=List[BatchItemResult], tags=["Videojuegos"])
+async def update_videogames_batch(
+        items: List[VideogameColabBatchUpdate] = Body(..., min_length=1, max_length=MAX_BATCH_SIZE),
+        session: AsyncSession = Depends(get_write_session)
+):
+    """Actualiza parcialmente varios registros de videojuegos en una sola transacción"""
+    rows = [item.model_dump() for item in items]
+    updated = await VideogameOperations.update_videogames_batch(session, rows)
+    return [
+        BatchItemResult(id=row["id"], status=batch_status(row, VideogameColab, updated))
+        for row in rows
+    ]
+
+@app.post("/videogames/delete/batch", response_model=List[BatchItemResult], tags=["Eliminación"])
+async def delete_videogames_batch(payload: BatchDeleteRequest, session: AsyncSession = Depends(get_write_session)):
+    """Elimina varios registros de videojuegos en una sola transacción"""
+    deleted = await VideogameOperations.delete_videogames_batch(session, payload.ids)
+    return [
+        BatchItemResult(id=entry_id, status="deleted" if entry_id in deleted else "not_found")
+        for entry_id in payload.ids
+    ]
+
 # -------------- MOSTRAR REGISTROS ----------------
 @app.get("/show", response_class=HTMLResponse, tags=["Registros"])
+@cached(COSMETICS, VIDEOGAMES)
 async def show_records(
         request: Request,
-        session: AsyncSession = Depends(get_session)
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, pattern=GALLERY_CURSOR_PATTERN)
 ):
-    cosmetics = await CosmeticOperations.get_all_cosmetics(session)
-    games = await VideogameOperations.get_all_videogames(session)
-
-    return templates.TemplateResponse(
-        "show.html",
-        {
+    def context(session):
+        # Una sola consulta; la tabla de cosméticos se llena primero y los videojuegos de la
+        # página esperan su tabla en memoria
+        feed = RowStream(
+            GalleryOperations.stream_gallery_feed(session, limit, after, detailed=True),
+            limit,
+            cursor=lambda row: f"{row.kind}:{row.id}"
+        )
+        return {
             "request": request,
-            "cosmetics": cosmetics,
-            "games": games
+            "feed": feed,
+            "cosmetics": feed.of_kind(COSMETIC),
+            "games": feed.of_kind(VIDEOGAME),
+            "limit": limit
         }
-    )
+
+    return renderer.stream_page("show.html", context, read_session_factory(request))
+
+# --------------- BÚSQUEDA -----------
+@app.get("/search", response_model=List[SearchResult], tags=["Consultas"])
+@cached(COSMETICS, VIDEOGAMES)
+async def search_all(
+        q: str = Query(..., min_length=2, max_length=100),
+        limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+        session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Busca en cosméticos y videojuegos a la vez, ordenando por relevancia.
+    Compara con marca de maquillaje, videojuego y tipo de colaboración.
+    """
+    return await SearchOperations.search_all(session, q, limit)
+
+# --------------- ANALÍTICA -----------
+@app.get("/analytics/top_uplift", response_model=List[UpliftRanking], tags=["Analítica"])
+@cached(COSMETICS, VIDEOGAMES)
+async def top_uplift(
+        tipo: str = Query("cosmetics", pattern="^(cosmetics|videogames)$"),
+        limit: int = Query(10, ge=1, le=100),
+        session: AsyncSession = Depends(get_read_session)
+):
+    """Marcas (tipo=cosmetics) o videojuegos (tipo=videogames) con mayor incremento de ventas"""
+    return await AnalyticsOperations.top_uplift(session, tipo, limit)
+
+@app.get("/analytics/uplift_by_type", response_model=List[UpliftByType], tags=["Analítica"])
+@cached(COSMETICS)
+async def uplift_by_type(session: AsyncSession = Depends(get_read_session)):
+    """Incremento promedio de ventas de maquillaje por tipo de colaboración"""
+    return await AnalyticsOperations.average_by_type(session)
+
+@app.get("/analytics/by_year", response_model=List[UpliftByYear], tags=["Analítica"])
+@cached(COSMETICS, VIDEOGAMES)
+async def uplift_by_year(
+        tipo: str = Query("cosmetics", pattern="^(cosmetics|videogames)$"),
+        session: AsyncSession = Depends(get_read_session)
+):
+    """Colaboraciones e incremento promedio por año"""
+    return await AnalyticsOperations.histogram_by_year(session, tipo)
+
+# --------------- CACHÉ -----------
+@app.get("/cache/stats", tags=["Caché"])
+async def cache_stats():
+    """Aciertos, fallos e invalidaciones de la caché de respuestas"""
+    return response_cache.snapshot()
+
+# --------------- MÉTRICAS -----------
+@app.get("/metrics", response_class=Response, tags=["Métricas"], include_in_schema=METRICS_ENABLED)
+async def metrics():
+    """Métricas en formato de texto de Prometheus (latencias, consultas, renderizado, subidas y pool)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Las métricas están desactivadas (METRICS_ENABLED)")
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+# --------------- SALUD -----------
+@app.get("/health/db", tags=["Salud"])
+async def health_db():
+    """Conexiones del pool en uso/libres y latencia de la base de datos"""
+    health = await db_health()
+    return JSONResponse(health, status_code=200 if health["status"] == "ok" else 503)
+
+@app.get("/health/startup", tags=["Salud"])
+async def health_startup():
+    """Duración de cada fase del arranque; 503 mientras el proceso no está listo"""
+    report = startup_report.snapshot()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
 
 # -------------------- CREACIÓN --------------------
 @app.get("/create", response_class=HTMLResponse, tags=["Creación"])
 async def create_page(request: Request):
     """Página para crear nuevos registros"""
-    return templates.TemplateResponse("create.html", {"request": request})
+    return renderer.static_page(request, "create.html")
 
 # --------------- ACTUALIZACIÓN -----------
 @app.get("/update", response_class=HTMLResponse, tags=["Actualización"])
 async def update_page(request: Request):
-    return templates.TemplateResponse("update.html", {"request": request})
+    return renderer.static_page(request, "update.html")
 
 # --------------- CONSULTAS -----------
 @app.get("/query", response_class=HTMLResponse, tags=["Consultas"])
 async def query_page(request: Request):
-    return templates.TemplateResponse("query.html", {"request": request})
+    return renderer.static_page(request, "query.html")
 
 # --------------- DESARROLLADOR -----------
 @app.get("/developer", response_class=HTMLResponse, tags=["Info Desarrollador"])
 async def developer_info(request: Request):
-    return templates.TemplateResponse("developer.html", {"request": request})
+    return renderer.static_page(request, "developer.html")
 
 # --------------- PROYECTO ----------------
 @app.get("/goal", response_class=HTMLResponse, tags=["Info Proyecto"])
 async def objetivo_proyecto(request: Request):
-    return templates.TemplateResponse("goal.html", {"request": request})
+    return renderer.static_page(request, "goal.html")
 
 # --------------- PLANEACIÓN ----------------
 @app.get("/planning", response_class=HTMLResponse, tags=["Planeación"])
 async def planeacion_proyecto(request: Request):
-    return templates.TemplateResponse("planning.html", {"request":request})
+    return renderer.static_page(request, "planning.html")
 
 # --------------- DISEÑO ----------------
 @app.get("/design", response_class=HTMLResponse, tags=["Diseño"])
 async def diseno_proyecto(request: Request):
-    return templates.TemplateResponse("design.html", {"request":request})
+    return renderer.static_page(request, "design.html")
@@ -0,0 +1,349 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus (GET /metrics).
+
+- MetricsMiddleware mide la latencia de cada petición por ruta (la plantilla de la ruta, no la
+  URL, para no multiplicar las series) y, al terminar, cuántas consultas hizo y cuánto tardaron.
+- install_query_metrics(engine) engancha los eventos de cursor de SQLAlchemy: cada consulta se
+  suma a la petición en curso (ContextVar) y al histograma global por tipo de sentencia.
+- track_render() / track_upload() miden el renderizado de plantillas y las subidas al
+  almacenamiento.
+- El estado del pool (tamaño, en uso, libres, desbordamiento) se lee en cada scrape.
+
+Con la cabecera de petición X-Debug-Timing (o METRICS_SERVER_TIMING=true) la respuesta lleva una
+cabecera Server-Timing con el desglose db / render / upload / total. En las páginas en streaming
+la cabecera sale antes del cuerpo, así que solo cuenta lo ocurrido hasta ese momento.
+"""
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.routing import Match
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Envía Server-Timing en todas las respuestas, no solo cuando se pide con X-Debug-Timing
+SERVER_TIMING_ALWAYS = os.getenv("METRICS_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UPLOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tipos de sentencia que se distinguen en las métricas de consultas
+STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+# Ruta de las peticiones que no coinciden con ninguna (evita una serie por URL desconocida)
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por serie: conteo de cada cubeta (no acumulado), suma y total
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self):
+        label_names = self.labels + ("le",)
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(label_names, key + (_format_value(bound),)), cumulative
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Gauge(Metric):
+    """Valor leído en cada scrape: collect() devuelve [(valores de las etiquetas, valor)]"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Iterable[Tuple[LabelValues, float]]], labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def samples(self):
+        for key, value in self.collect():
+            if value is not None:
+                yield self.name, _format_labels(self.labels, key), value
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP hasta el último byte",
+    ("method", "route", "status"), REQUEST_BUCKETS,
+))
+REQUEST_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "Consultas a la base de datos por petición",
+    ("route",), QUERY_COUNT_BUCKETS,
+))
+REQUEST_DB_TIME = registry.register(Histogram(
+    "http_request_db_seconds", "Tiempo total de base de datos por petición",
+    ("route",), REQUEST_BUCKETS,
+))
+QUERY_DURATION = registry.register(Histogram(
+    "db_query_duration_seconds", "Duración de cada consulta por engine y tipo de sentencia",
+    ("engine", "statement"), QUERY_BUCKETS,
+))
+RENDER_DURATION = registry.register(Histogram(
+    "template_render_seconds", "Tiempo de renderizado de plantillas",
+    ("template",), QUERY_BUCKETS,
+))
+UPLOAD_BYTES = registry.register(Counter(
+    "storage_upload_bytes_total", "Bytes subidos al almacenamiento de imágenes", ("backend",),
+))
+UPLOAD_DURATION = registry.register(Histogram(
+    "storage_upload_duration_seconds", "Duración de cada subida al almacenamiento de imágenes",
+    ("backend",), UPLOAD_BUCKETS,
+))
+
+
+@dataclass
+class RequestTimings:
+    """Lo que consumió una petición; los eventos de SQLAlchemy y los renderizados lo van sumando"""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    render_seconds: float = 0.0
+    upload_bytes: int = 0
+    upload_seconds: float = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return ", ".join([
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} consultas"',
+            f"render;dur={self.render_seconds * 1000:.1f}",
+            f'upload;dur={self.upload_seconds * 1000:.1f};desc="{self.upload_bytes} bytes"',
+            f"total;dur={total_seconds * 1000:.1f}",
+        ])
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Tiempos de la petición en curso (None fuera de una petición)"""
+    return _current_timings.get()
+
+
+@contextmanager
+def track_render(template: str):
+    """Mide un renderizado de plantilla"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_render(template, time.perf_counter() - started)
+
+
+def record_render(template: str, seconds: float):
+    RENDER_DURATION.observe(seconds, template=template)
+    timings = current_timings()
+    if timings is not None:
+        timings.render_seconds += seconds
+
+
+@contextmanager
+def track_upload(backend: str, size: int):
+    """Mide una subida de 'size' bytes al almacenamiento"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        UPLOAD_BYTES.inc(size, backend=backend)
+        UPLOAD_DURATION.observe(elapsed, backend=backend)
+        timings = current_timings()
+        if timings is not None:
+            timings.upload_bytes += size
+            timings.upload_seconds += elapsed
+
+
+def _statement_kind(statement: str) -> str:
+    kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return kind if kind in STATEMENT_KINDS else "OTHER"
+
+
+# Pools de los engines instrumentados (primario y réplica), leídos en cada scrape
+_pools: Dict[str, object] = {}
+
+
+def _pool_values(attribute: str):
+    for name, pool in _pools.items():
+        method = getattr(pool, attribute, None)
+        if method is not None:
+            yield (name,), method()
+
+
+for _metric_name, _attribute, _documentation in (
+    ("db_pool_size", "size", "Conexiones permanentes del pool"),
+    ("db_pool_checked_out", "checkedout", "Conexiones del pool en uso"),
+    ("db_pool_idle", "checkedin", "Conexiones del pool libres"),
+    ("db_pool_overflow", "overflow", "Conexiones abiertas por encima del tamaño del pool"),
+):
+    registry.register(Gauge(_metric_name, _documentation, lambda attribute=_attribute: _pool_values(attribute), ("engine",)))
+
+
+def install_query_metrics(engine, name: str = "primary"):
+    """Cuenta y mide las consultas del engine; registra también el estado de su pool"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        QUERY_DURATION.observe(elapsed, engine=name, statement=_statement_kind(statement))
+        timings = current_timings()
+        if timings is not None:
+            timings.db_queries += 1
+            timings.db_seconds += elapsed
+
+    _pools[name] = engine.pool
+
+
+def route_label(scope) -> str:
+    """Plantilla de la ruta de la petición ('/cosmetics/{entry_id}'), no la URL concreta"""
+    route = scope.get("route")
+    if route is None:
+        # Respuestas servidas antes del enrutado (caché) y montajes de archivos estáticos
+        for candidate in scope["app"].router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _wants_server_timing(scope) -> bool:
+    if SERVER_TIMING_ALWAYS:
+        return True
+    return any(name == b"x-debug-timing" for name, _ in scope["headers"])
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latencia por ruta, consultas por petición y cabecera Server-Timing opcional"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        server_timing = _wants_server_timing(scope)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if server_timing:
+                    value = timings.server_timing(time.perf_counter() - started)
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", value.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+            route = route_label(scope)
+            REQUEST_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=route, status=str(status))
+            REQUEST_QUERIES.observe(timings.db_queries, route=route)
+            REQUEST_DB_TIME.observe(timings.db_seconds, route=route)
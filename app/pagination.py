@@ -0,0 +1,3 @@
+# Tamaño de página por defecto y máximo permitido en los listados
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
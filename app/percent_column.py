@@ -0,0 +1,42 @@
+"""
+Incremento de ventas como entero ("35%" -> 35) para las columnas generadas *_pct.
+
+Un valor sin el formato ^[0-9]+%$ (datos heredados o cargados fuera de la API) deja la columna en
+NULL en lugar de hacer fallar el INSERT, el UPDATE o la migración que la crea.
+"""
+from sqlalchemy import Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+
+
+class percent_as_integer(ColumnElement):
+    """Expresión de Computed(): percent_as_integer("incremento_ventas_maquillaje")"""
+
+    inherit_cache = True
+    type = Integer()
+
+    def __init__(self, column: str):
+        self.column = column
+
+
+@compiles(percent_as_integer)
+def _compile_default(element, compiler, **kw):
+    return f"CAST(REPLACE({element.column}, '%', '') AS INTEGER)"
+
+
+@compiles(percent_as_integer, "postgresql")
+def _compile_postgresql(element, compiler, **kw):
+    return (
+        f"CASE WHEN {element.column} ~ '^[0-9]+%$' "
+        f"THEN CAST(REPLACE({element.column}, '%', '') AS INTEGER) END"
+    )
+
+
+@compiles(percent_as_integer, "sqlite")
+def _compile_sqlite(element, compiler, **kw):
+    # Sin expresiones regulares: empieza por dígito, termina en % y no hay otro carácter entre medias
+    return (
+        f"CASE WHEN {element.column} GLOB '[0-9]*%' "
+        f"AND substr({element.column}, 1, length({element.column}) - 1) NOT GLOB '*[^0-9]*' "
+        f"THEN CAST(REPLACE({element.column}, '%', '') AS INTEGER) END"
+    )
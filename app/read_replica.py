@@ -0,0 +1,95 @@
+"""
+Lecturas desde la réplica con garantía de "leer lo que uno escribió".
+
+Con DATABASE_REPLICA_URL configurada, las rutas GET leen de la réplica y las escrituras van al
+primario. Como la réplica puede ir unos instantes por detrás, después de una escritura las
+lecturas de ese cliente vuelven al primario durante REPLICA_STICKY_SECONDS, con una cookie que
+guarda hasta cuándo (vale en cualquier worker). Los demás clientes siguen leyendo de la réplica.
+
+Un cliente sin cookies (scripts, API) puede pedir el primario con la cabecera X-Read-Primary.
+
+Las lecturas que salen de la réplica quedan marcadas en la petición (read_from_replica): la caché
+de respuestas no guarda las de tablas escritas hace menos de REPLICA_STICKY_SECONDS, que podrían
+ser anteriores a la escritura y quedarían guardadas con la versión nueva (ver app/cache.py).
+"""
+import math
+import os
+import time
+from typing import Callable
+
+from fastapi import Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection_db import async_read_session, async_session, database
+
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+STICKY_COOKIE = os.getenv("REPLICA_STICKY_COOKIE", "read_primary_until")
+READ_PRIMARY_HEADER = "x-read-primary"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Clave en scope["state"] de las peticiones que leyeron de la réplica
+REPLICA_READ_STATE = "read_from_replica"
+
+
+def _cookie_until(request: Request) -> float:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+def reads_from_primary(request: Request) -> bool:
+    """True si este cliente tiene que ver sus escrituras recientes (ir al primario)"""
+    if request.headers.get(READ_PRIMARY_HEADER):
+        return True
+    return _cookie_until(request) > time.time()
+
+
+def mark_replica_read(request: Request):
+    setattr(request.state, REPLICA_READ_STATE, True)
+
+
+def read_from_replica(scope) -> bool:
+    return scope.get("state", {}).get(REPLICA_READ_STATE, False)
+
+
+def read_session_factory(request: Request) -> Callable[[], AsyncSession]:
+    """Sesiones de la réplica, o del primario si no hay réplica o el cliente escribió hace poco"""
+    if database.replica_engine is None or reads_from_primary(request):
+        return async_session
+    mark_replica_read(request)
+    return async_read_session
+
+
+async def get_read_session(request: Request):
+    """Sesión para las rutas GET"""
+    async with read_session_factory(request)() as session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """
+    Middleware ASGI: cada escritura que termina bien (estado < 400) deja en el cliente la cookie
+    que lleva sus lecturas al primario durante REPLICA_STICKY_SECONDS
+    """
+
+    def __init__(self, app, enabled: Callable[[], bool], sticky_seconds: float = REPLICA_STICKY_SECONDS):
+        self.app = app
+        # Solo hace falta con réplica; se consulta en cada escritura porque el engine se crea tarde
+        self.enabled = enabled
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or not self.enabled():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.sticky_seconds
+                cookie = f"{STICKY_COOKIE}={until:.3f}; Max-Age={max(1, math.ceil(self.sticky_seconds))}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
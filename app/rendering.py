@@ -0,0 +1,233 @@
+"""
+Capa de renderizado de las plantillas.
+
+- Las plantillas se compilan al arrancar (sin volver a comprobar los archivos si
+  TEMPLATES_AUTO_RELOAD no está activo).
+- Las páginas sin datos (/goal, /planning, ...) se renderizan una vez y se sirven desde
+  memoria como bytes, con ETag.
+- Las filas de las tablas de registros se cachean por (tipo, id) junto con los valores de las
+  columnas que muestra la plantilla (ROW_COLUMNS); si alguno cambia, la fila se vuelve a
+  renderizar, así que una fila modificada nunca reutiliza HTML anterior.
+- Las páginas con tablas se envían en streaming: la cabecera sale antes de consultar la base de
+  datos y las filas se renderizan a medida que llegan del cursor.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict, defaultdict, deque
+from operator import attrgetter
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.metrics import current_timings, record_render, track_render
+from app.static_files import make_static_url
+from database.connection_db import async_session
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(BASE_DIR, "..", "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "..", "static")
+
+# Páginas que no dependen de la base de datos ni de la petición
+STATIC_PAGES = (
+    "goal.html", "planning.html", "design.html", "developer.html",
+    "create.html", "update.html", "query.html", "delete.html",
+)
+
+# Tipo de fila -> plantilla parcial
+ROW_TEMPLATES = {
+    "cosmetic": "includes/cosmetic_row.html",
+    "videogame": "includes/videogame_row.html",
+}
+
+# Tipo de fila -> columnas que usa su plantilla (las únicas que se comparan en la caché de filas:
+# la misma fila consultada por /show, /cosmetics o /deleted con más o menos columnas reutiliza el HTML)
+ROW_COLUMNS = {
+    "cosmetic": (
+        "id", "marca_maquillaje", "videojuego", "fecha_colaboracion", "tipo_colaboracion",
+        "incremento_ventas_maquillaje", "image_url", "image_thumb_url", "image_medium_url",
+    ),
+    "videogame": (
+        "id", "videojuego", "marca_maquillaje", "fecha_colaboracion",
+        "incremento_ventas_videojuego", "image_url", "image_thumb_url", "image_medium_url",
+    ),
+}
+
+
+# Tamaño mínimo de cada bloque de filas enviado al cliente en las páginas en streaming
+STREAM_CHUNK_BYTES = int(os.getenv("RENDER_STREAM_CHUNK_BYTES", "4096"))
+
+# Salida de {{ flush() }}: en las páginas en streaming envía ya lo renderizado (la cabecera, antes
+# de la primera consulta) aunque no llegue a STREAM_CHUNK_BYTES; no aparece en el HTML
+FLUSH_MARKER = "\x00flush\x00"
+
+
+class RowStream:
+    """
+    Filas de una consulta en streaming para usar en un {% for %} de las plantillas.
+    Cuenta las filas para calcular el cursor de la siguiente página cuando ya se recorrieron.
+    """
+
+    def __init__(self, rows: AsyncIterator, limit: Optional[int] = None, cursor: Callable = attrgetter("id")):
+        self._rows = rows
+        self.limit = limit
+        self._cursor = cursor
+        self._pending = defaultdict(deque)
+        self.count = 0
+        self.last = None
+
+    async def _pull(self):
+        """Siguiente fila de la consulta, o None si se terminó"""
+        try:
+            row = await self._rows.__anext__()
+        except StopAsyncIteration:
+            return None
+        self.count += 1
+        self.last = row
+        return row
+
+    async def __aiter__(self):
+        while (row := await self._pull()) is not None:
+            yield row
+
+    async def of_kind(self, kind: str):
+        """Solo las filas de un tipo; las de otros tipos esperan en memoria (como máximo una página)"""
+        pending = self._pending[kind]
+        while pending:
+            yield pending.popleft()
+        while (row := await self._pull()) is not None:
+            if row.kind == kind:
+                yield row
+            else:
+                self._pending[row.kind].append(row)
+
+    @property
+    def next_after(self):
+        """Cursor de la siguiente página, o None si no hay más (válido después de recorrer las filas)"""
+        if self.limit is None or self.count < self.limit:
+            return None
+        return self._cursor(self.last)
+
+
+def _row_values(kind: str, record) -> Tuple:
+    """Valores de las columnas que muestra la plantilla (modelo SQLModel o Row de SQLAlchemy)"""
+    return tuple(getattr(record, column, None) for column in ROW_COLUMNS[kind])
+
+
+class TemplateRenderer:
+
+    def __init__(self, templates: Jinja2Templates, fragment_cache_size: int = 5000):
+        self.templates = templates
+        self.env = templates.env
+        self.fragment_cache_size = fragment_cache_size
+        # (tipo, id) -> (valores de la fila con los que se renderizó, HTML)
+        self._fragments: "OrderedDict[tuple, Tuple[tuple, Markup]]" = OrderedDict()
+        self._pages: Dict[str, Tuple[bytes, str]] = {}
+        self.env.globals["render_row"] = self.render_row
+        self.env.globals["flush"] = lambda: Markup(FLUSH_MARKER)
+        # Mismo cargador y globales, pero con soporte para recorrer iteradores asíncronos
+        self.async_env = self.env.overlay(enable_async=True)
+
+    def precompile(self) -> int:
+        """Compila todas las plantillas HTML y las deja en la caché de los entornos de Jinja"""
+        names = self.env.list_templates(extensions=["html"])
+        for name in names:
+            self.env.get_template(name)
+            self.async_env.get_template(name)
+        return len(names)
+
+    def prerender(self, names: Iterable[str] = STATIC_PAGES):
+        for name in names:
+            self._render_page(name)
+
+    def _render_page(self, name: str) -> Tuple[bytes, str]:
+        with track_render(name):
+            body = self.env.get_template(name).render().encode("utf-8")
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self._pages[name] = (body, etag)
+        return body, etag
+
+    def static_page(self, request: Request, name: str) -> Response:
+        """Página prerenderizada; responde 304 si el cliente ya la tiene"""
+        body, etag = self._pages.get(name) or self._render_page(name)
+        headers = {"etag": etag, "cache-control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="text/html", headers=headers)
+
+    def stream_page(
+            self,
+            name: str,
+            build_context: Callable[..., dict],
+            session_factory: Callable[[], AsyncSession] = async_session
+    ) -> StreamingResponse:
+        """
+        Renderiza la plantilla en streaming. build_context(session) devuelve el contexto con
+        iteradores asíncronos (RowStream). Lo renderizado hasta {{ flush() }} (la cabecera) se
+        envía enseguida; las filas, en bloques de STREAM_CHUNK_BYTES. La sesión (de
+        session_factory, p. ej. la réplica) es propia de la respuesta porque la de Depends(...)
+        se cierra antes de enviar el cuerpo.
+        """
+        template = self.async_env.get_template(name)
+
+        async def body():
+            async with session_factory() as session:
+                buffer = []
+                size = 0
+                # Tiempo de renderizado: sin la espera del cliente entre bloques ni las consultas
+                # que se intercalan con las filas
+                timings = current_timings()
+                db_before = timings.db_seconds if timings else 0.0
+                elapsed = 0.0
+                started = time.perf_counter()
+                async for chunk in template.generate_async(build_context(session)):
+                    flush = chunk == FLUSH_MARKER
+                    if not flush:
+                        buffer.append(chunk)
+                        size += len(chunk)
+                    if buffer and (flush or size >= STREAM_CHUNK_BYTES):
+                        elapsed += time.perf_counter() - started
+                        yield "".join(buffer).encode("utf-8")
+                        started = time.perf_counter()
+                        buffer = []
+                        size = 0
+                elapsed += time.perf_counter() - started
+                if buffer:
+                    yield "".join(buffer).encode("utf-8")
+                db_seconds = timings.db_seconds - db_before if timings else 0.0
+                record_render(name, max(elapsed - db_seconds, 0.0))
+
+        return StreamingResponse(body(), media_type="text/html")
+
+    def render_row(self, kind: str, record) -> Markup:
+        """HTML de una fila de registros, reutilizado mientras la fila no cambie"""
+        values = _row_values(kind, record)
+        key = (kind, record.id)
+        cached = self._fragments.get(key)
+        # Se comparan los valores (no un hash): una fila modificada nunca recibe el HTML anterior
+        if cached is not None and cached[0] == values:
+            self._fragments.move_to_end(key)
+            return cached[1]
+
+        fragment = Markup(self.env.get_template(ROW_TEMPLATES[kind]).render(record=record))
+        self._fragments[key] = (values, fragment)
+        self._fragments.move_to_end(key)
+        while len(self._fragments) > self.fragment_cache_size:
+            self._fragments.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        self._fragments.clear()
+        self._pages.clear()
+
+
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+templates.env.globals["static_url"] = make_static_url(STATIC_DIR)
+# En producción las plantillas no cambian: no se comprueba su fecha en cada render
+templates.env.auto_reload = os.getenv("TEMPLATES_AUTO_RELOAD", "false").lower() in ("1", "true", "yes")
+
+renderer = TemplateRenderer(templates, int(os.getenv("RENDER_FRAGMENT_CACHE_SIZE", "5000")))
@@ -0,0 +1,177 @@
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlalchemy import String, cast
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Similitud mínima para considerar un resultado (mismo valor por defecto que pg_trgm)
+SIMILARITY_THRESHOLD = 0.3
+
+
+def normalize(value) -> str:
+    """Pasa el texto a minúsculas y sin tildes para comparar"""
+    value = unicodedata.normalize("NFKD", str(value)).encode("ascii", "ignore").decode("ascii")
+    return value.lower()
+
+
+class NGramIndex:
+    """
+    Índice invertido de n-gramas en memoria.
+    Es el respaldo de las búsquedas cuando la base no es PostgreSQL (SQLite / pruebas):
+    cada consulta solo revisa los documentos que comparten n-gramas con el texto buscado.
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._values: Dict[int, str] = {}
+
+    def _grams(self, text: str) -> Set[str]:
+        if len(text) < self.n:
+            return set()
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, doc_id: int, value):
+        """Indexa (o reindexa) un documento"""
+        self.remove(doc_id)
+        text = normalize(value)
+        self._values[doc_id] = text
+        for gram in self._grams(text):
+            self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id: int):
+        """Quita un documento del índice"""
+        text = self._values.pop(doc_id, None)
+        if text is None:
+            return
+        for gram in self._grams(text):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def contains(self, query: str) -> Set[int]:
+        """IDs cuyo valor contiene el texto (equivalente a ILIKE '%texto%')"""
+        query = normalize(query)
+        grams = self._grams(query)
+        if not grams:
+            # Consultas más cortas que un n-grama: se revisan todos los valores
+            return {doc_id for doc_id, text in self._values.items() if query in text}
+
+        # Intersección empezando por la lista de posteo más corta
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return set()
+        return {doc_id for doc_id in candidates if query in self._values[doc_id]}
+
+    def search(self, query: str, limit: int, min_score: float = SIMILARITY_THRESHOLD) -> List[Tuple[int, float]]:
+        """Documentos ordenados por similitud de n-gramas con el texto (tipo pg_trgm)"""
+        query = normalize(query)
+        grams = self._grams(query)
+        if not grams:
+            return [(doc_id, 1.0) for doc_id in sorted(self.contains(query))][:limit]
+
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for doc_id in self._postings.get(gram, ()):
+                shared[doc_id] += 1
+
+        scored = []
+        for doc_id, count in shared.items():
+            # Similitud por palabra: proporción de n-gramas de la consulta presentes en el valor
+            score = count / len(grams)
+            if query in self._values[doc_id]:
+                score = 1.0
+            if score >= min_score:
+                scored.append((doc_id, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+
+class SearchIndexRegistry:
+    """Índices de n-gramas por (tabla, campo), construidos la primera vez que se consultan"""
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, str], NGramIndex] = {}
+
+    async def get(self, session: AsyncSession, model, field: str) -> NGramIndex:
+        key = (model.__tablename__, field)
+        index = self._indexes.get(key)
+        if index is None:
+            index = NGramIndex()
+            query = select(model.id, getattr(model, field))
+            if "deleted_at" in model.__table__.columns:
+                # Los registros eliminados (borrado lógico) no se indexan
+                query = query.where(model.deleted_at.is_(None))
+            result = await session.execute(query)
+            for doc_id, value in result.all():
+                if value is not None:
+                    index.add(doc_id, value)
+            self._indexes[key] = index
+        return index
+
+    def index_entry(self, entry):
+        """Actualiza los índices ya construidos con un registro creado o modificado"""
+        for (table, field), index in self._indexes.items():
+            if table == entry.__tablename__:
+                value = getattr(entry, field)
+                if value is None:
+                    index.remove(entry.id)
+                else:
+                    index.add(entry.id, value)
+
+    def discard_entries(self, model, entry_ids: Iterable[int]):
+        """Quita registros eliminados de los índices ya construidos"""
+        entry_ids = list(entry_ids)
+        for (table, _), index in self._indexes.items():
+            if table == model.__tablename__:
+                for entry_id in entry_ids:
+                    index.remove(entry_id)
+
+    def invalidate(self, model):
+        """Descarta los índices de una tabla; se reconstruyen en la siguiente búsqueda"""
+        for key in [key for key in self._indexes if key[0] == model.__tablename__]:
+            del self._indexes[key]
+
+    def clear(self):
+        self._indexes.clear()
+
+
+search_indexes = SearchIndexRegistry()
+
+
+def uses_trigram_index(session: AsyncSession) -> bool:
+    """PostgreSQL resuelve las búsquedas con índices GIN pg_trgm; el resto usa el índice en memoria"""
+    return session.get_bind().dialect.name == "postgresql"
+
+
+async def contains_filter(session: AsyncSession, column, value: str):
+    """
+    Condición WHERE para 'columna contiene valor'.
+    En PostgreSQL es un ILIKE (acelerado por el índice GIN pg_trgm);
+    en otros motores se resuelve con el índice de n-gramas en memoria.
+    """
+    if uses_trigram_index(session):
+        if not isinstance(column.type, String):
+            # Fechas y números se comparan por su representación en texto
+            return cast(column, String).ilike(f"%{value}%")
+        return column.ilike(f"%{value}%")
+    model = column.class_
+    index = await search_indexes.get(session, model, column.key)
+    return model.id.in_(sorted(index.contains(value)))
+
+
+async def ranked_ids(session: AsyncSession, model, fields: Iterable[str], query: str, limit: int) -> Dict[int, float]:
+    """Puntuación máxima por ID sobre varios campos usando el índice en memoria"""
+    scores: Dict[int, float] = {}
+    for field in fields:
+        index = await search_indexes.get(session, model, field)
+        for doc_id, score in index.search(query, limit):
+            if score > scores.get(doc_id, 0.0):
+                scores[doc_id] = score
+    return scores
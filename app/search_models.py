@@ -0,0 +1,12 @@
+from datetime import date
+from sqlmodel import SQLModel
+
+
+class SearchResult(SQLModel):
+    kind: str
+    id: int
+    marca_maquillaje: str
+    videojuego: str
+    fecha_colaboracion: date
+    image_url: str
+    score: float
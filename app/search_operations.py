@@ -0,0 +1,77 @@
+from typing import List
+from sqlalchemy import String, func, literal_column, or_, union_all
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.cosmetic_models import CosmeticColab
+from app.videogame_models import VideogameColab
+from app.gallery_operations import COSMETIC, VIDEOGAME
+from app.search_index import ranked_ids, uses_trigram_index
+from app.search_models import SearchResult
+from app.soft_delete import live
+
+# Campos de texto en los que busca el buscador general (todos con índice pg_trgm)
+SEARCH_FIELDS = {
+    COSMETIC: (CosmeticColab, ("marca_maquillaje", "videojuego", "tipo_colaboracion")),
+    VIDEOGAME: (VideogameColab, ("videojuego", "marca_maquillaje")),
+}
+
+
+class SearchOperations:
+
+    @staticmethod
+    def _result_columns(model, kind: str):
+        return [
+            literal_column(f"'{kind}'", String).label("kind"),
+            model.id.label("id"),
+            model.marca_maquillaje.label("marca_maquillaje"),
+            model.videojuego.label("videojuego"),
+            model.fecha_colaboracion.label("fecha_colaboracion"),
+            model.image_url.label("image_url"),
+        ]
+
+    @staticmethod
+    async def search_all(session: AsyncSession, query: str, limit: int) -> List[SearchResult]:
+        """Búsqueda ordenada por relevancia en las dos tablas de colaboraciones"""
+        if uses_trigram_index(session):
+            return await SearchOperations._search_trigram(session, query, limit)
+        return await SearchOperations._search_in_memory(session, query, limit)
+
+    @staticmethod
+    async def _search_trigram(session: AsyncSession, query: str, limit: int) -> List[SearchResult]:
+        """Ranking con word_similarity de pg_trgm; los filtros usan los índices GIN"""
+        branches = []
+        for kind, (model, fields) in SEARCH_FIELDS.items():
+            columns = [getattr(model, field) for field in fields]
+            score = func.greatest(*[func.word_similarity(query, column) for column in columns])
+            match = or_(
+                *[column.ilike(f"%{query}%") for column in columns],
+                *[column.op("%>")(query) for column in columns],
+            )
+            branches.append(
+                select(*SearchOperations._result_columns(model, kind), score.label("score")).where(match, live(model))
+            )
+
+        ranked = union_all(*branches).subquery()
+        result = await session.execute(
+            select(ranked)
+            .order_by(ranked.c.score.desc(), ranked.c.kind, ranked.c.id)
+            .limit(limit)
+        )
+        return [SearchResult(**row) for row in result.mappings().all()]
+
+    @staticmethod
+    async def _search_in_memory(session: AsyncSession, query: str, limit: int) -> List[SearchResult]:
+        """Ranking con el índice de n-gramas en memoria (SQLite / pruebas)"""
+        results = []
+        for kind, (model, fields) in SEARCH_FIELDS.items():
+            scores = await ranked_ids(session, model, fields, query, limit)
+            if not scores:
+                continue
+            result = await session.execute(
+                select(*SearchOperations._result_columns(model, kind)).where(model.id.in_(list(scores)), live(model))
+            )
+            for row in result.mappings().all():
+                results.append(SearchResult(**row, score=scores[row["id"]]))
+
+        results.sort(key=lambda item: (-item.score, item.kind, item.id))
+        return results[:limit]
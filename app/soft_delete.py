@@ -0,0 +1,55 @@
+"""
+Borrado lógico de colaboraciones.
+
+Eliminar un registro solo llena su columna deleted_at (un UPDATE por la clave primaria); las
+consultas de registros activos filtran deleted_at IS NULL y usan índices parciales sobre esas
+filas. Los registros eliminados se pueden restaurar hasta que la purga (database/purge_deleted.py)
+los mueve por lotes a las tablas deleted_* cuando superan SOFT_DELETE_RETENTION_DAYS.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Index, text
+
+SOFT_DELETE_RETENTION_DAYS = float(os.getenv("SOFT_DELETE_RETENTION_DAYS", "30"))
+PURGE_BATCH_SIZE = int(os.getenv("SOFT_DELETE_PURGE_BATCH_SIZE", "500"))
+# Segundos entre purgas automáticas en segundo plano (0 = desactivada)
+PURGE_INTERVAL = float(os.getenv("SOFT_DELETE_PURGE_INTERVAL", "3600"))
+
+LIVE = "deleted_at IS NULL"
+TOMBSTONE = "deleted_at IS NOT NULL"
+
+
+def soft_delete_indexes(table: str) -> tuple:
+    """Índices parciales: id y fecha de las filas activas, deleted_at de las eliminadas"""
+    def partial(name, column, condition):
+        return Index(
+            f"ix_{table}_{name}", column,
+            postgresql_where=text(condition),
+            sqlite_where=text(condition),
+        )
+
+    return (
+        partial("live_id", "id", LIVE),
+        partial("live_fecha_colaboracion", "fecha_colaboracion", LIVE),
+        partial("deleted_at", "deleted_at", TOMBSTONE),
+    )
+
+
+def live(model):
+    """Condición WHERE de los registros activos"""
+    return model.deleted_at.is_(None)
+
+
+def tombstone(model):
+    """Condición WHERE de los registros eliminados que aún no se purgaron"""
+    return model.deleted_at.is_not(None)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def purge_cutoff(retention_days: float = SOFT_DELETE_RETENTION_DAYS) -> datetime:
+    """Los registros eliminados antes de este momento se mueven al archivo"""
+    return utcnow() - timedelta(days=retention_days)
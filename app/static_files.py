@@ -0,0 +1,204 @@
+"""
+Archivos estáticos (static/) e imágenes locales (uploads/) servidos por la propia aplicación.
+
+Sobre StaticFiles de Starlette (ETag, Last-Modified, 304 y Range) se añaden:
+- Cache-Control: inmutable para URLs versionadas (?v=...) y para uploads, cuyos nombres son
+  el hash del contenido.
+- Variantes precomprimidas .br/.gz, elegidas según Accept-Encoding. Se generan al arrancar en un
+  directorio aparte (STATIC_COMPRESSED_DIR), nunca junto a los originales; sin él se sirven sin
+  comprimir.
+- Envío sin copia (http.response.pathsend) cuando el servidor ASGI lo soporta.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+SHORT_LIVED = "public, max-age=3600"
+
+# Tipos que vale la pena comprimir (las imágenes ya están comprimidas)
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+MIN_COMPRESS_BYTES = 512
+
+# Por debajo de este tamaño no compensa delegar el envío al servidor
+PATHSEND_MIN_BYTES = 64 * 1024
+
+
+def _brotli():
+    try:
+        import brotli  # dependencia opcional
+    except ImportError:
+        return None
+    return brotli
+
+
+def precompress(directory: str, target_dir: str) -> int:
+    """
+    Genera (o regenera si el original cambió) en target_dir las variantes .gz y .br de los
+    archivos de directory, con la misma estructura de carpetas; devuelve cuántas escribió.
+    """
+    brotli = _brotli()
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            variant = os.path.join(target_dir, os.path.relpath(path, directory))
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS or os.path.getsize(path) < MIN_COMPRESS_BYTES:
+                continue
+            encoders = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                encoders[".br"] = lambda data: brotli.compress(data, quality=11)
+            source_mtime = os.path.getmtime(path)
+            data = None
+            for suffix, encode in encoders.items():
+                target = variant + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as f:
+                    f.write(encode(data))
+                written += 1
+    return written
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding como {codificación: q}: 'br;q=0, gzip' -> {'br': 0.0, 'gzip': 1.0}"""
+    encodings = {}
+    for item in header.split(","):
+        token, *params = [part.strip() for part in item.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[token.lower()] = q
+    return encodings
+
+
+def accepts_encoding(encodings: Dict[str, float], encoding: str) -> bool:
+    """La codificación se acepta si aparece con q > 0, o si no aparece y '*' tiene q > 0"""
+    return encodings.get(encoding, encodings.get("*", 0.0)) > 0
+
+
+class StaticFileResponse(FileResponse):
+    """FileResponse con bloques más grandes y envío sin copia si el servidor lo anuncia"""
+
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope, receive, send):
+        use_pathsend = (
+            "http.response.pathsend" in scope.get("extensions", {})
+            and scope["method"] != "HEAD"
+            and "range" not in Headers(scope=scope)
+            and self.stat_result is not None
+            and self.stat_result.st_size >= PATHSEND_MIN_BYTES
+        )
+        if not use_pathsend:
+            await super().__call__(scope, receive, send)
+            return
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+
+
+class CachedStaticFiles(StaticFiles):
+
+    # Sufijo de la variante precomprimida -> Content-Encoding (en orden de preferencia)
+    ENCODINGS = ((".br", "br"), (".gz", "gzip"))
+
+    def __init__(self, *args, immutable: bool = False, compress: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+        self.compress = compress
+        # Directorio de las variantes .gz/.br; None hasta que prepare() las genera
+        self.compressed_dir = None
+
+    def prepare(self, compressed_dir: str) -> int:
+        """Genera las variantes .gz/.br en compressed_dir (se llama al arrancar, no al importar)"""
+        if not self.compress or self.directory is None or not os.path.isdir(self.directory):
+            return 0
+        written = precompress(self.directory, compressed_dir)
+        self.compressed_dir = compressed_dir
+        return written
+
+    def _cache_control(self, scope) -> str:
+        # Solo las URL con huella (?v=<hash>, ver make_static_url) se pueden cachear para siempre
+        if self.immutable or parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v"):
+            return IMMUTABLE
+        return SHORT_LIVED
+
+    def _precompressed(self, full_path, scope):
+        """Variante .br/.gz aceptada por el cliente, o None (las peticiones Range usan el original)"""
+        request_headers = Headers(scope=scope)
+        if self.compressed_dir is None or os.path.splitext(full_path)[1] not in COMPRESSIBLE_EXTENSIONS or "range" in request_headers:
+            return None
+        variant = os.path.join(self.compressed_dir, os.path.relpath(full_path, self.directory))
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        # Mayor q primero; a igual q, el orden de ENCODINGS
+        candidates = sorted(self.ENCODINGS, key=lambda item: -accepted.get(item[1], accepted.get("*", 0.0)))
+        for suffix, encoding in candidates:
+            if not accepts_encoding(accepted, encoding):
+                continue
+            try:
+                stat_result = os.stat(f"{variant}{suffix}")
+            except OSError:
+                continue
+            return f"{variant}{suffix}", stat_result, encoding
+        return None
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        media_type = None
+        encoding = None
+
+        full_path = os.fspath(full_path)
+        precompressed = self._precompressed(full_path, scope)
+        if precompressed is not None:
+            # El tipo se deduce del original (style.css), no de style.css.br
+            media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+            full_path, stat_result, encoding = precompressed
+
+        response = StaticFileResponse(full_path, status_code=status_code, stat_result=stat_result, media_type=media_type)
+        response.headers["cache-control"] = self._cache_control(scope)
+        if encoding or os.path.splitext(full_path)[1] in COMPRESSIBLE_EXTENSIONS:
+            response.headers["vary"] = "Accept-Encoding"
+        if encoding:
+            response.headers["content-encoding"] = encoding
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+_asset_versions: Dict[str, str] = {}
+
+
+def make_static_url(directory: str, prefix: str = "/static"):
+    """Función para las plantillas: static_url('css/base.css') -> '/static/css/base.css?v=<hash>'"""
+
+    def static_url(path: str) -> str:
+        version = _asset_versions.get(path)
+        if version is None:
+            try:
+                with open(os.path.join(directory, path), "rb") as f:
+                    version = hashlib.blake2b(f.read(), digest_size=4).hexdigest()
+            except OSError:
+                version = ""
+            _asset_versions[path] = version
+        return f"{prefix}/{path}?v={version}" if version else f"{prefix}/{path}"
+
+    return static_url
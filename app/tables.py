@@ -0,0 +1,7 @@
+"""
+Nombres de las dos colecciones de colaboraciones. Son el parámetro "tipo" de las rutas de
+analítica y los espacios de la caché de respuestas (la tabla cache_versions de
+database/migrations.py usa los mismos nombres).
+"""
+COSMETICS = "cosmetics"
+VIDEOGAMES = "videogames"
@@ -1,16 +1,34 @@
+from datetime import date, datetime
 from typing import Optional
+from sqlalchemy import Column, Computed, DateTime, Integer
 from sqlmodel import SQLModel, Field
 from pydantic import validator
+from app.soft_delete import soft_delete_indexes
+from app.percent_column import percent_as_integer
 
 class VideogameColabBase(SQLModel):
     videojuego: str = Field(..., min_length=3, max_length=50)
     marca_maquillaje: str = Field(..., min_length=3, max_length=50)
-    fecha_colaboracion: str = Field(..., min_length=3, max_length=50)
-    incremento_ventas_videojuego: str = Field(..., regex=r'^\d+%$')
+    fecha_colaboracion: date = Field(..., index=True)
+    incremento_ventas_videojuego: str = Field(..., schema_extra={'pattern': r'^\d+%$'})
     image_url: str = Field(..., min_length=3, max_length=500)
+    image_thumb_url: Optional[str] = Field(None, max_length=500)
+    image_medium_url: Optional[str] = Field(None, max_length=500)
 
 class VideogameColab(VideogameColabBase, table=True):
+    __table_args__ = soft_delete_indexes("videogamecolab")
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Borrado lógico: NULL mientras el registro está activo
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    # Incremento como entero ("35%" -> 35), calculado por la base de datos para agregaciones
+    incremento_ventas_videojuego_pct: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            Integer,
+            Computed(percent_as_integer("incremento_ventas_videojuego"), persisted=True),
+            index=True
+        )
+    )
 
 class VideogameColabCreate(VideogameColabBase):
     pass
@@ -21,9 +39,11 @@ class VideogameColabRead(VideogameColabBase):
 class VideogameColabUpdate(SQLModel):
     videojuego: Optional[str] = Field(None, min_length=3, max_length=50)
     marca_maquillaje: Optional[str] = Field(None, min_length=3, max_length=50)
-    fecha_colaboracion: Optional[str] = Field(None, min_length=3, max_length=50)
-    incremento_ventas_videojuego: Optional[str] = Field(None, regex=r'^\d+%$')
+    fecha_colaboracion: Optional[date] = None
+    incremento_ventas_videojuego: Optional[str] = Field(None, schema_extra={'pattern': r'^\d+%$'})
     image_url: Optional[str] = Field(None, min_length=3, max_length=500)
+    image_thumb_url: Optional[str] = Field(None, max_length=500)
+    image_medium_url: Optional[str] = Field(None, max_length=500)
 
     @validator('*', pre=True)
     def skip_blank_strings(cls, v):
@@ -31,14 +51,21 @@ class VideogameColabUpdate(SQLModel):
             return None
         return v
 
+class VideogameColabBatchUpdate(VideogameColabUpdate):
+    id: int
+
 class VideogameColabResponse(SQLModel):
     id: int
     videojuego: str
     marca_maquillaje: str
-    fecha_colaboracion: str
+    fecha_colaboracion: date
     incremento_ventas_videojuego: str
     image_url: str
+    image_thumb_url: Optional[str] = None
+    image_medium_url: Optional[str] = None
 
 class DeletedVideogameColab(VideogameColabBase, table=True):
     __tablename__ = "deleted_videogame"  # Añade esto
-    id: Optional[int] = Field(default=None, primary_key=True)
\ No newline at end of file
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Mismo id que tenía el registro activo; deleted_at es el momento del borrado (NULL en los archivados antes del borrado lógico)
+    deleted_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
\ No newline at end of file
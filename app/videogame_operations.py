@@ -1,21 +1,52 @@
-from typing import List, Optional
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Set
+from sqlalchemy import delete, func, insert, union_all, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from app.pagination import DEFAULT_PAGE_SIZE
+from app.batch_models import group_batch_changes, update_live_rows
+from app.search_index import contains_filter, search_indexes
+from app.fast_json import fetch_all, select_for
+from app.soft_delete import PURGE_BATCH_SIZE, live, tombstone, utcnow
 from app.videogame_models import *
 
 class VideogameOperations:
 
     @staticmethod
-    async def get_all_videogames(session: AsyncSession) -> List[VideogameColab]:
-        """Obtiene todos los registros de colaboraciones de videojuegos"""
-        result = await session.execute(select(VideogameColab))
+    async def get_all_videogames(
+            session: AsyncSession,
+            limit: int = DEFAULT_PAGE_SIZE,
+            after: Optional[int] = None
+    ) -> List[VideogameColab]:
+        """Obtiene una página de registros de colaboraciones de videojuegos ordenada por ID (paginación por cursor)"""
+        query = select(VideogameColab).where(live(VideogameColab)).order_by(VideogameColab.id).limit(limit)
+        if after is not None:
+            query = query.where(VideogameColab.id > after)
+        result = await session.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    async def stream_all_videogames(
+            session: AsyncSession,
+            after: Optional[int] = None,
+            batch_size: int = DEFAULT_PAGE_SIZE,
+            limit: Optional[int] = None
+    ) -> AsyncIterator[VideogameColab]:
+        """Recorre los registros (todos o los primeros 'limit') con un cursor del servidor, sin cargar la tabla en memoria"""
+        query = select(VideogameColab).where(live(VideogameColab)).order_by(VideogameColab.id).execution_options(yield_per=batch_size)
+        if after is not None:
+            query = query.where(VideogameColab.id > after)
+        if limit is not None:
+            query = query.limit(limit)
+        result = await session.stream_scalars(query)
+        async for entry in result:
+            yield entry
+
     @staticmethod
     async def get_videogame_by_id(session: AsyncSession, entry_id: int) -> Optional[VideogameColab]:
         """Obtiene un registro por su ID"""
         result = await session.execute(
-            select(VideogameColab).where(VideogameColab.id == entry_id)
+            select(VideogameColab).where(VideogameColab.id == entry_id, live(VideogameColab))
         )
         return result.scalar_one_or_none()
 
@@ -26,78 +57,252 @@ class VideogameOperations:
         session.add(new_entry)
         await session.commit()
         await session.refresh(new_entry)
+        search_indexes.index_entry(new_entry)
         return new_entry
 
     @staticmethod
     async def update_videogame(session: AsyncSession, entry_id: int, update_data: dict) -> Optional[VideogameColab]:
-        """Modifica un registro existente, permitiendo cambios parciales o totales"""
-        entry = await session.get(VideogameColab, entry_id)
-        if not entry:
-            return None
-
-        for key, value in update_data.items():
-            if hasattr(entry, key):
-                # Solo actualiza si el valor no es None ni una cadena vacía
-                if value not in (None, ""):
-                    setattr(entry, key, value)
+        """
+        Modifica un registro existente, permitiendo cambios parciales o totales, con un solo
+        UPDATE ... SET <campos enviados> ... RETURNING (None si no existe o está eliminado)
+        """
+        # Solo los campos del modelo con valor (ni None ni cadena vacía)
+        changes = {
+            key: value for key, value in update_data.items()
+            if key in VideogameColab.__table__.columns and key != "id" and value not in (None, "")
+        }
+        if not changes:
+            return await VideogameOperations.get_videogame_by_id(session, entry_id)
 
+        result = await session.execute(
+            update(VideogameColab)
+            .where(VideogameColab.id == entry_id, live(VideogameColab))
+            .values(**changes)
+            .returning(VideogameColab)
+        )
+        entry = result.scalar_one_or_none()
         await session.commit()
-        await session.refresh(entry)
+        if entry is None:
+            return None
+        search_indexes.index_entry(entry)
         return entry
 
     @staticmethod
     async def delete_videogame(session: AsyncSession, entry_id: int) -> Optional[VideogameColab]:
-        """Elimina un registro por ID y lo guarda en deleted_videogame"""
-        entry = await session.get(VideogameColab, entry_id)
-        if not entry:
+        """Marca un registro como eliminado (un solo UPDATE por la clave primaria); se puede restaurar"""
+        result = await session.execute(
+            update(VideogameColab)
+            .where(VideogameColab.id == entry_id, live(VideogameColab))
+            .values(deleted_at=utcnow())
+            .returning(VideogameColab)
+        )
+        entry = result.scalar_one_or_none()
+        await session.commit()
+        if entry is None:
             return None
+        search_indexes.discard_entries(VideogameColab, [entry_id])
+        return entry
 
-        # Validar los datos antes de crear la copia
-        try:
-            deleted_entry = DeletedVideogameColab(**entry.dict())
-        except ValueError as e:
-            # Manejar errores de validación
-            raise ValueError(f"Error al validar los datos para la tabla de eliminados: {e}")
-
-        session.add(deleted_entry)
-        await session.delete(entry)
+    @staticmethod
+    async def restore_videogame(session: AsyncSession, entry_id: int) -> Optional[VideogameColab]:
+        """Restaura un registro eliminado que todavía no se purgó"""
+        result = await session.execute(
+            update(VideogameColab)
+            .where(VideogameColab.id == entry_id, tombstone(VideogameColab))
+            .values(deleted_at=None)
+            .returning(VideogameColab)
+        )
+        entry = result.scalar_one_or_none()
         await session.commit()
+        if entry is None:
+            return None
+        search_indexes.index_entry(entry)
         return entry
 
     @staticmethod
-    async def get_deleted_videogames(session: AsyncSession) -> List[DeletedVideogameColab]:
-        """Obtiene todos los registros eliminados de videojuegos"""
-        result = await session.execute(select(DeletedVideogameColab))
-        return result.scalars().all()
+    async def create_videogames_batch(session: AsyncSession, items: List[dict]) -> List[VideogameColab]:
+        """Crea varios registros en una sola transacción (un INSERT ... RETURNING)"""
+        result = await session.scalars(
+            insert(VideogameColab).returning(VideogameColab, sort_by_parameter_order=True), items
+        )
+        entries = result.all()
+        await session.commit()
+        for entry in entries:
+            search_indexes.index_entry(entry)
+        return entries
 
     @staticmethod
-    async def search_videogames_by_name(session: AsyncSession, nombre_videojuego: str) -> List[VideogameColab]:
-        """Busca registros por nombre de videojuego"""
+    async def update_videogames_batch(session: AsyncSession, items: List[dict]) -> Set[int]:
+        """
+        Aplica cambios parciales a varios registros en una sola transacción: un UPDATE por
+        conjunto de campos modificados (no uno por elemento), solo sobre registros no eliminados.
+        Devuelve los IDs que se modificaron (los elementos sin cambios no se escriben).
+        """
+        entries = {}
+        for fields, rows in group_batch_changes(items, VideogameColab).items():
+            for entry in await update_live_rows(session, VideogameColab, fields, rows):
+                entries[entry.id] = entry
+        await session.commit()
+        for entry in entries.values():
+            search_indexes.index_entry(entry)
+        return set(entries)
+
+    @staticmethod
+    async def delete_videogames_batch(session: AsyncSession, ids: List[int]) -> Set[int]:
+        """
+        Marca varios registros como eliminados con un solo UPDATE ... RETURNING.
+        Devuelve los IDs eliminados.
+        """
         result = await session.execute(
-            select(VideogameColab).where(VideogameColab.videojuego.ilike(f"%{nombre_videojuego}%"))
+            update(VideogameColab)
+            .where(VideogameColab.id.in_(ids), live(VideogameColab))
+            .values(deleted_at=utcnow())
+            .returning(VideogameColab.id)
         )
-        return result.scalars().all()
+        deleted = set(result.scalars().all())
+        await session.commit()
+        search_indexes.discard_entries(VideogameColab, deleted)
+        return deleted
+
+    @staticmethod
+    async def purge_deleted_videogames(
+            session: AsyncSession,
+            older_than: datetime,
+            batch_size: int = PURGE_BATCH_SIZE
+    ) -> int:
+        """
+        Mueve a deleted_videogame los registros eliminados antes de 'older_than', por lotes y con una
+        transacción por lote. Devuelve cuántos movió.
+        """
+        columns = [column.name for column in DeletedVideogameColab.__table__.columns]
+        source = VideogameColab.__table__
+        archive = DeletedVideogameColab.__table__
+        fused = session.get_bind().dialect.name == "postgresql"
+        moved = 0
+        while True:
+            # Usa el índice parcial de deleted_at; otros procesos que purgan a la vez saltan las filas bloqueadas
+            batch = (
+                select(source.c.id)
+                .where(source.c.deleted_at < older_than)
+                .order_by(source.c.deleted_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            if fused:
+                # Un solo viaje por lote: WITH moved AS (DELETE ... RETURNING) INSERT INTO archivo SELECT ... FROM moved
+                removed = delete(source).where(source.c.id.in_(batch.scalar_subquery())).returning(
+                    *[source.c[name] for name in columns]
+                ).cte("moved")
+                result = await session.execute(
+                    insert(archive)
+                    .from_select(columns, select(*[removed.c[name] for name in columns]))
+                    .add_cte(removed)
+                    .returning(archive.c.id)
+                )
+                ids = result.scalars().all()
+            else:
+                # SQLite no admite sentencias de escritura dentro de un WITH
+                ids = (await session.execute(batch)).scalars().all()
+                if ids:
+                    await session.execute(
+                        insert(archive).from_select(columns, select(*[source.c[name] for name in columns]).where(source.c.id.in_(ids)))
+                    )
+                    await session.execute(delete(source).where(source.c.id.in_(ids)))
+            await session.commit()
+            if not ids:
+                break
+            moved += len(ids)
+        return moved
 
     @staticmethod
-    async def filter_by_recent_date(session: AsyncSession) -> List[VideogameColab]:
-        """Filtra y ordena por fecha más reciente primero (solo como strings)"""
-        result = await session.execute(select(VideogameColab))
-        all_entries = result.scalars().all()
+    def deleted_query(columns: List[str]):
+        """Eliminados pendientes de purga (índice parcial de deleted_at) y ya archivados, por id"""
+        recent = select(*[getattr(VideogameColab, column) for column in columns]).where(tombstone(VideogameColab))
+        archived = select(*[getattr(DeletedVideogameColab, column) for column in columns])
+        deleted = union_all(recent, archived).subquery()
+        return select(deleted).order_by(deleted.c.id)
 
-        # Ordenar por string de fecha (formato YYYY-MM-DD)
-        return sorted(all_entries, key=lambda x: x.fecha_colaboracion, reverse=True)
+    @staticmethod
+    async def get_deleted_videogames(session: AsyncSession, as_rows: bool = False) -> List:
+        """Obtiene todos los registros eliminados de videojuegos, restaurables y archivados (como diccionarios si as_rows)"""
+        result = await session.execute(VideogameOperations.deleted_query(list(DeletedVideogameColab.model_fields)))
+        if as_rows:
+            return [dict(row) for row in result.mappings()]
+        return result.all()
+
+    @staticmethod
+    async def stream_export_batches(
+            session: AsyncSession,
+            columns: List[str],
+            batch_size: int = DEFAULT_PAGE_SIZE,
+            deleted: bool = False
+    ) -> AsyncIterator[list]:
+        """Lotes de filas (tuplas con 'columns') de los registros activos o de los eliminados, con un cursor del servidor"""
+        if deleted:
+            query = VideogameOperations.deleted_query(columns)
+        else:
+            query = select(*[getattr(VideogameColab, column) for column in columns]).where(live(VideogameColab)).order_by(VideogameColab.id)
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.partitions():
+            yield batch
+
+    @staticmethod
+    async def count_deleted_videogames(session: AsyncSession) -> int:
+        """Cuenta los registros eliminados"""
+        deleted = VideogameOperations.deleted_query(["id"]).subquery()
+        result = await session.execute(select(func.count()).select_from(deleted))
+        return result.scalar_one()
 
     @staticmethod
-    async def search_videogame_by_field(session: AsyncSession, field: str, value: str) -> List[VideogameColab]:
+    async def stream_deleted_videogames(
+            session: AsyncSession,
+            batch_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncIterator:
+        """Recorre los registros eliminados (restaurables y archivados) con un cursor del servidor"""
+        query = VideogameOperations.deleted_query(list(DeletedVideogameColab.model_fields))
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+    @staticmethod
+    async def search_videogames_by_name(session: AsyncSession, nombre_videojuego: str, as_rows: bool = False) -> List[VideogameColab]:
+        """Busca registros por nombre de videojuego"""
+        query = select(*select_for(VideogameColab, VideogameColabResponse, as_rows)).where(
+            live(VideogameColab),
+            await contains_filter(session, VideogameColab.videojuego, nombre_videojuego)
+        )
+        return await fetch_all(session, query, as_rows)
+
+    @staticmethod
+    async def filter_by_recent_date(
+            session: AsyncSession,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            as_rows: bool = False
+    ) -> List[VideogameColab]:
+        """Filtra por rango de fechas y ordena por fecha más reciente primero (usa el índice de la fecha)"""
+        query = select(*select_for(VideogameColab, VideogameColabResponse, as_rows)).where(live(VideogameColab)).order_by(VideogameColab.fecha_colaboracion.desc(), VideogameColab.id.desc())
+        if date_from is not None:
+            query = query.where(VideogameColab.fecha_colaboracion >= date_from)
+        if date_to is not None:
+            query = query.where(VideogameColab.fecha_colaboracion <= date_to)
+        return await fetch_all(session, query.limit(limit), as_rows)
+
+    @staticmethod
+    async def search_videogame_by_field(
+            session: AsyncSession,
+            field: str,
+            value: str,
+            as_rows: bool = False
+    ) -> List[VideogameColab]:
         """Busca registros por cualquier campo especificado"""
-        if not hasattr(VideogameColab, field):
+        if field not in VideogameColab.__table__.columns:
             return []
         
         # Obtener el atributo del modelo
         model_field = getattr(VideogameColab, field)
         
         # Realizar la búsqueda
-        result = await session.execute(
-            select(VideogameColab).where(model_field.ilike(f"%{value}%"))
-        )
-        return result.scalars().all()
\ No newline at end of file
+        query = select(*select_for(VideogameColab, VideogameColabResponse, as_rows)).where(live(VideogameColab), await contains_filter(session, model_field, value))
+        return await fetch_all(session, query, as_rows)
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Compara dos resultados de benchmarks/run.py (por ejemplo, el commit base y el actual):
+
+    python -m benchmarks.compare benchmarks/results/abc1234-sqlite-100k.json benchmarks/results/def5678-sqlite-100k.json
+
+Para cada escenario muestra p50/p95/p99 y peticiones por segundo de los dos archivos con la
+variación en porcentaje (negativa = menos latencia o menos rendimiento).
+"""
+import argparse
+import json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "     -"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+def compare(base: dict, head: dict):
+    print(f"base {base.get('commit')} ({base['database']}, {base['rows']} filas)  ->  "
+          f"actual {head.get('commit')} ({head['database']}, {head['rows']} filas)")
+    if (base["database"], base["rows"], base.get("concurrency")) != (head["database"], head["rows"], head.get("concurrency")):
+        print("aviso: los resultados usan otra base de datos, tamaño o concurrencia")
+
+    print(f"{'escenario':<16}" + "".join(f"{metric:>30}" for metric in METRICS))
+    for name, after in head["scenarios"].items():
+        before = base["scenarios"].get(name)
+        if before is None:
+            continue
+        cells = [f"{before[metric]:10.2f} -> {after[metric]:10.2f} {change(before[metric], after[metric])}" for metric in METRICS]
+        print(f"{name:<16}" + "".join(f"{cell:>30}" for cell in cells))
+    print(f"{'RSS máx. (MB)':<16}{base['peak_rss_mb']:10.1f} -> {head['peak_rss_mb']:10.1f} {change(base['peak_rss_mb'], head['peak_rss_mb'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos archivos de resultados de benchmarks/run.py")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+    compare(load(args.base), load(args.head))
@@ -0,0 +1,148 @@
+"""
+Datos sintéticos reproducibles para los benchmarks: colaboraciones de maquillaje y de
+videojuegos con la misma forma que los CSV de database/ (marcas, videojuegos y tipos que se
+repiten, fechas de 10 años, incrementos "NN%").
+
+    python -m benchmarks.datagen --size 100k --database-url postgresql+asyncpg://.../bench
+    python -m benchmarks.datagen --size 1k                  # SQLite en ./bench.db
+
+La misma semilla genera siempre las mismas filas, así que dos ejecuciones (o dos commits)
+miden sobre los mismos datos. Las filas se generan e insertan por lotes: 1M de filas no se
+materializan en memoria.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SEED_BATCH_SIZE = 5_000
+
+BRANDS = (
+    "MAC", "Maybelline", "NYX", "L'Oréal", "Fenty Beauty", "Urban Decay", "Sephora",
+    "Benefit", "Too Faced", "ColourPop", "Revolution", "Rare Beauty", "Glossier",
+    "Huda Beauty", "Clinique", "Lancôme", "Dior", "Charlotte Tilbury", "e.l.f.", "Essence",
+)
+GAMES = (
+    "League of Legends", "Final Fantasy", "The Sims 4", "Overwatch", "Animal Crossing",
+    "Street Fighter", "Pokémon", "Fortnite", "Genshin Impact", "Valorant", "Zelda",
+    "Cyberpunk 2077", "Resident Evil", "Mortal Kombat", "Tomb Raider", "Sonic",
+)
+COLLABORATION_TYPES = (
+    "Edición limitada", "Colección cápsula", "Paleta temática", "Skin del juego",
+    "Lanzamiento conjunto", "Evento en el juego",
+)
+FIRST_DATE = date(2015, 1, 1)
+DATE_SPAN_DAYS = 3650
+
+
+def _name(rng: random.Random, names: tuple) -> str:
+    # Cada nombre tiene variantes numeradas para que las búsquedas no devuelvan media tabla
+    return f"{rng.choice(names)} {rng.randint(1, 200)}"
+
+
+def _image_urls(kind: str, index: int) -> dict:
+    base = f"https://example.com/images/{kind}/{index:07d}"
+    return {
+        "image_url": f"{base}.png",
+        "image_thumb_url": f"{base}_thumb.webp",
+        "image_medium_url": f"{base}_medium.webp",
+    }
+
+
+def cosmetic_rows(count: int, seed: int = 42) -> Iterator[dict]:
+    rng = random.Random(f"cosmetics:{seed}")
+    for index in range(count):
+        yield {
+            "marca_maquillaje": _name(rng, BRANDS),
+            "videojuego": _name(rng, GAMES),
+            "fecha_colaboracion": FIRST_DATE + timedelta(days=rng.randrange(DATE_SPAN_DAYS)),
+            "tipo_colaboracion": rng.choice(COLLABORATION_TYPES),
+            "incremento_ventas_maquillaje": f"{rng.randint(1, 95)}%",
+            **_image_urls("cosmetic", index),
+        }
+
+
+def videogame_rows(count: int, seed: int = 42) -> Iterator[dict]:
+    rng = random.Random(f"videogames:{seed}")
+    for index in range(count):
+        yield {
+            "videojuego": _name(rng, GAMES),
+            "marca_maquillaje": _name(rng, BRANDS),
+            "fecha_colaboracion": FIRST_DATE + timedelta(days=rng.randrange(DATE_SPAN_DAYS)),
+            "incremento_ventas_videojuego": f"{rng.randint(1, 95)}%",
+            **_image_urls("videogame", index),
+        }
+
+
+def batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_size(value: str) -> int:
+    """'1k' / '100k' / '1m' o un número de filas"""
+    return SIZES.get(value.lower()) or int(value)
+
+
+async def reset_tables(engine):
+    """Vacía las tablas de colaboraciones (activas, archivadas e imágenes) antes de sembrar"""
+    from sqlalchemy import delete, text
+    from sqlmodel import SQLModel
+
+    tables = [SQLModel.metadata.tables[name] for name in (
+        "cosmeticcolab", "videogamecolab", "deleted_cosmetic", "deleted_videogame", "image_blobs",
+    )]
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(f"TRUNCATE {', '.join(table.name for table in tables)} RESTART IDENTITY"))
+        else:
+            for table in tables:
+                await conn.execute(delete(table))
+
+
+async def seed(engine, rows: int, seed: int = 42, batch_size: int = SEED_BATCH_SIZE) -> Dict[str, float]:
+    """Inserta 'rows' filas en cada tabla; devuelve los segundos que tardó cada una"""
+    from sqlalchemy import insert
+    from app.cosmetic_models import CosmeticColab
+    from app.videogame_models import VideogameColab
+
+    await reset_tables(engine)
+    timings = {}
+    for model, generate in ((CosmeticColab, cosmetic_rows), (VideogameColab, videogame_rows)):
+        started = time.perf_counter()
+        for batch in batched(generate(rows, seed), batch_size):
+            async with engine.begin() as conn:
+                await conn.execute(insert(model.__table__), batch)
+        timings[model.__tablename__] = time.perf_counter() - started
+    return timings
+
+
+async def main(rows: int, seed_value: int):
+    # La URL tiene que estar en el entorno antes del primer uso de la base de datos
+    from database.connection_db import database, init_db
+
+    await init_db()
+    timings = await seed(database.engine, rows, seed_value)
+    await database.dispose()
+    for table_name, seconds in timings.items():
+        print(f"{table_name}: {rows} filas en {seconds:.1f} s ({rows / seconds:,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera colaboraciones sintéticas en la base de datos de benchmarks")
+    parser.add_argument("--size", default="1k", help="1k, 100k, 1m o un número de filas por tabla")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///bench.db")
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    asyncio.run(main(parse_size(args.size), args.seed))
@@ -0,0 +1,117 @@
+"""
+Compara las dos formas de responder una lista JSON grande (por defecto 10 000 filas):
+
+    orm      entidades ORM -> validación con response_model -> JSONResponse (json)
+    rows     select() de columnas -> diccionarios -> ORJSONResponse
+
+    python -m benchmarks.json_serialization --rows 10000 --repeat 20
+
+Usa una base SQLite temporal (aiosqlite) y las mismas operaciones que las rutas
+(CosmeticOperations.filter_by_recent_date); mide por separado la consulta y la serialización.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cosmetic_models import CosmeticColab, CosmeticColabResponse
+from app.cosmetic_operations import CosmeticOperations
+from app.fast_json import rows_response
+
+
+async def seed(session_factory, rows: int):
+    start = date(2015, 1, 1)
+    values = [
+        {
+            "marca_maquillaje": f"Marca {i % 500}",
+            "videojuego": f"Videojuego {i % 300}",
+            "fecha_colaboracion": start + timedelta(days=i % 3650),
+            "tipo_colaboracion": "Edición limitada",
+            "incremento_ventas_maquillaje": f"{i % 90}%",
+            "image_url": f"https://example.com/images/{i:06d}.png",
+            "image_thumb_url": f"https://example.com/images/{i:06d}_thumb.webp",
+            "image_medium_url": f"https://example.com/images/{i:06d}_medium.webp",
+        }
+        for i in range(rows)
+    ]
+    async with session_factory() as session:
+        await session.execute(insert(CosmeticColab), values)
+        await session.commit()
+
+
+async def run_orm(session_factory, rows: int, field) -> tuple:
+    async with session_factory() as session:
+        started = time.perf_counter()
+        entries = await CosmeticOperations.filter_by_recent_date(session, limit=rows)
+        fetched = time.perf_counter()
+        content = await serialize_response(field=field, response_content=entries)
+        body = JSONResponse(content).body
+        done = time.perf_counter()
+    return fetched - started, done - fetched, len(body)
+
+
+async def run_rows(session_factory, rows: int) -> tuple:
+    async with session_factory() as session:
+        started = time.perf_counter()
+        entries = await CosmeticOperations.filter_by_recent_date(session, limit=rows, as_rows=True)
+        fetched = time.perf_counter()
+        body = rows_response(entries).body
+        done = time.perf_counter()
+    return fetched - started, done - fetched, len(body)
+
+
+def report(name: str, samples: List[tuple], rows: int):
+    fetch = statistics.median(sample[0] for sample in samples)
+    serialize = statistics.median(sample[1] for sample in samples)
+    total = fetch + serialize
+    print(
+        f"{name:<6} consulta {fetch * 1000:8.1f} ms  serialización {serialize * 1000:8.1f} ms  "
+        f"total {total * 1000:8.1f} ms  {rows / total:10.0f} filas/s  {samples[0][2] / 1024:8.0f} KB"
+    )
+    return total
+
+
+async def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all, tables=[CosmeticColab.__table__])
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await seed(session_factory, rows)
+
+        # El mismo campo de respuesta que FastAPI crea para response_model=List[CosmeticColabResponse]
+        field = create_model_field(name="Response", type_=List[CosmeticColabResponse], mode="serialization")
+
+        # Una vuelta de calentamiento de cada camino
+        await run_orm(session_factory, rows, field)
+        await run_rows(session_factory, rows)
+
+        orm = [await run_orm(session_factory, rows, field) for _ in range(repeat)]
+        fast = [await run_rows(session_factory, rows) for _ in range(repeat)]
+        await engine.dispose()
+
+    print(f"{rows} filas, mediana de {repeat} repeticiones")
+    orm_total = report("orm", orm, rows)
+    rows_total = report("rows", fast, rows)
+    print(f"rows es {orm_total / rows_total:.1f}x más rápido")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ORM + response_model frente a filas + orjson")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,141 @@
+"""
+Presupuesto de arranque: falla (código de salida 1) si importar la aplicación, ejecutar su
+lifespan o responder la primera petición tarda más de lo permitido.
+
+    python -m benchmarks.startup_budget
+    python -m benchmarks.startup_budget --runs 5 --import-budget 1500 --ready-budget 2500
+    python -m benchmarks.startup_budget --output benchmarks/results/startup.json
+
+Cada ejecución es un proceso nuevo (sin módulos ya importados ni plantillas compiladas) con una
+base SQLite temporal y se toma la mediana de --runs ejecuciones. Se miden tres tiempos:
+
+    import         python importa app.main (no debe abrir conexiones ni compilar plantillas)
+    startup        el lifespan: esquema, conexiones del pool, plantillas y estáticos
+    first_request  la primera petición a la página principal ya con la aplicación lista
+
+El presupuesto "ready" es la suma de los tres (lo que espera el primer usuario de un proceso
+nuevo). Los límites también se pueden fijar con STARTUP_BUDGET_IMPORT_MS y
+STARTUP_BUDGET_READY_MS, p. ej. en CI con máquinas más lentas.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.run import git_commit
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_IMPORT_MS", "2000"))
+READY_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_READY_MS", "3000"))
+FIRST_REQUEST_PATH = "/"
+
+MEASURES = ("import_ms", "startup_ms", "first_request_ms", "ready_ms")
+
+
+async def _serve_first_request(app) -> Dict[str, float]:
+    import httpx
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.get(FIRST_REQUEST_PATH)
+            response.raise_for_status()
+        answered = time.perf_counter()
+    return {"startup_ms": (ready - started) * 1000, "first_request_ms": (answered - ready) * 1000}
+
+
+def child():
+    """Una medición en este proceso (lo lanza measure() con un intérprete nuevo)"""
+    import asyncio
+
+    started = time.perf_counter()
+    from app.main import app
+    from app.lifecycle import startup_report
+    timings = {"import_ms": (time.perf_counter() - started) * 1000}
+
+    timings.update(asyncio.run(_serve_first_request(app)))
+    timings["ready_ms"] = timings["import_ms"] + timings["startup_ms"] + timings["first_request_ms"]
+    timings["phases_ms"] = startup_report.snapshot()["phases_ms"]
+    print(json.dumps(timings))
+
+
+def measure(directory: str, run: int) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(directory, f'startup-{run}.db')}",
+        "CACHE_BACKEND": "none",
+        "STORAGE_BACKEND": "memory",
+        "SOFT_DELETE_PURGE_INTERVAL": "0",
+    }
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_budget", "--child"],
+        env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"La ejecución {run} falló:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: List[dict]) -> dict:
+    summary = {measure: round(statistics.median(sample[measure] for sample in samples), 1) for measure in MEASURES}
+    phases = samples[0]["phases_ms"].keys()
+    summary["phases_ms"] = {phase: round(statistics.median(sample["phases_ms"].get(phase, 0) for sample in samples), 1) for phase in phases}
+    return summary
+
+
+def check(summary: dict, import_budget: float, ready_budget: float) -> List[str]:
+    failures = []
+    if summary["import_ms"] > import_budget:
+        failures.append(f"import {summary['import_ms']:.1f} ms > {import_budget:.0f} ms")
+    if summary["ready_ms"] > ready_budget:
+        failures.append(f"import + arranque + primera petición {summary['ready_ms']:.1f} ms > {ready_budget:.0f} ms")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Comprueba el tiempo de importación, arranque y primera petición")
+    parser.add_argument("--runs", type=int, default=3, help="Procesos nuevos medidos (se usa la mediana)")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, help="Máximo para importar app.main (ms)")
+    parser.add_argument("--ready-budget", type=float, default=READY_BUDGET_MS, help="Máximo hasta responder la primera petición (ms)")
+    parser.add_argument("--output", help="Guarda el resultado en JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.child:
+        child()
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        samples = [measure(directory, run) for run in range(args.runs)]
+    summary = summarize(samples)
+    failures = check(summary, args.import_budget, args.ready_budget)
+
+    print(f"import {summary['import_ms']:.1f} ms  arranque {summary['startup_ms']:.1f} ms  "
+          f"primera petición {summary['first_request_ms']:.1f} ms  total {summary['ready_ms']:.1f} ms")
+    print("fases: " + ", ".join(f"{phase} {ms:.1f} ms" for phase, ms in summary["phases_ms"].items()))
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "runs": args.runs,
+            "budgets_ms": {"import": args.import_budget, "ready": args.ready_budget},
+            "passed": not failures,
+            **summary,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+    if failures:
+        print("Fuera de presupuesto: " + "; ".join(failures))
+        sys.exit(1)
+    print("Dentro del presupuesto")
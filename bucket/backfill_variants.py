@@ -0,0 +1,133 @@
+"""
+Genera las variantes (miniatura y mediana) de las imágenes ya guardadas.
+
+    python -m bucket.backfill_variants cosmetics videogames --batch-size 50
+
+Recorre por id los registros sin image_thumb_url, lee el original (del almacenamiento
+configurado, de un URL o de una ruta local), genera las variantes en el pool de procesos y
+las guarda en el almacenamiento configurado (STORAGE_BACKEND). Como en las subidas, las
+variantes se nombran por el hash del original: dos imágenes con el mismo nombre de archivo
+(en otra carpeta u otro servidor) no se pisan.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiofiles
+import httpx
+from sqlalchemy import update
+from sqlmodel import select
+
+from bucket.image_variants import generate_variants, variant_content_type
+from bucket.storage import StorageBackend, get_storage, is_remote_url
+from bucket.upload_images import UPLOAD_MAX_CONCURRENCY, content_filename, variant_name
+
+# Nombre en la línea de comandos -> (módulo, modelo); la caché de respuestas ve las
+# escrituras por los triggers de cache_versions
+TABLES = {
+    "cosmetics": ("app.cosmetic_models", "CosmeticColab"),
+    "videogames": ("app.videogame_models", "VideogameColab"),
+    "deleted_cosmetics": ("app.cosmetic_models", "DeletedCosmeticColab"),
+    "deleted_videogames": ("app.videogame_models", "DeletedVideogameColab"),
+}
+
+
+def _resolve(table_name: str):
+    module_name, model_name = TABLES[table_name]
+    module = __import__(module_name, fromlist=[model_name])
+    return getattr(module, model_name)
+
+
+async def _load_original(client: httpx.AsyncClient, storage: StorageBackend, image_url: str) -> bytes:
+    path = storage.path_for_url(image_url)
+    if path is not None:
+        return await storage.get(path)
+    if is_remote_url(image_url):
+        response = await client.get(image_url)
+        response.raise_for_status()
+        return response.content
+    async with aiofiles.open(image_url, "rb") as f:
+        return await f.read()
+
+
+async def backfill_entry(client: httpx.AsyncClient, storage: StorageBackend, image_url: str) -> Optional[dict]:
+    """Variantes de una imagen como {"image_thumb_url", "image_medium_url"}; None si falla"""
+    try:
+        original = await _load_original(client, storage, image_url)
+        variants = await generate_variants(original)
+        if variants is None:
+            return None
+        filename = content_filename(hashlib.sha256(original).hexdigest(), os.path.basename(urlparse(image_url).path))
+        return {
+            f"image_{name}_url": await storage.put(
+                f"images/{variant_name(filename, name)}", content, variant_content_type()
+            )
+            for name, content in variants.items()
+        }
+    except Exception as e:
+        print(f"\nNo se pudo procesar {image_url}: {e}", file=sys.stderr)
+        return None
+
+
+async def backfill_table(table_name: str, batch_size: int = 50, limit: Optional[int] = None) -> int:
+    """Genera las variantes que faltan en una tabla; devuelve cuántos registros se actualizaron"""
+    from database.connection_db import async_session
+
+    model = _resolve(table_name)
+    storage = get_storage()
+    updated = 0
+    after = 0
+    slots = asyncio.Semaphore(UPLOAD_MAX_CONCURRENCY)
+
+    async def limited(client, image_url):
+        async with slots:
+            return await backfill_entry(client, storage, image_url)
+
+    async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+        while limit is None or updated < limit:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(model.id, model.image_url)
+                    .where(model.image_thumb_url.is_(None), model.id > after)
+                    .order_by(model.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                after = rows[-1].id
+
+                variants = await asyncio.gather(*[limited(client, row.image_url) for row in rows])
+                values = [{"id": row.id, **urls} for row, urls in zip(rows, variants) if urls]
+                if values:
+                    await session.execute(update(model), values)
+                    await session.commit()
+                    updated += len(values)
+            print(f"\r{table_name}: {updated} registros con variantes", end="", file=sys.stderr, flush=True)
+
+    print(file=sys.stderr)
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera miniaturas y variantes medianas de las imágenes existentes")
+    parser.add_argument("tables", nargs="*", choices=sorted(TABLES), default=["cosmetics", "videogames"])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=None, help="máximo de registros por tabla")
+    args = parser.parse_args(argv)
+
+    async def run():
+        for table_name in args.tables:
+            updated = await backfill_table(table_name, args.batch_size, args.limit)
+            print(f"{table_name}: {updated} registros actualizados")
+        await get_storage().aclose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
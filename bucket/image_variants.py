@@ -0,0 +1,74 @@
+"""
+Variantes redimensionadas de las imágenes de colaboración (miniatura y mediana).
+
+Pillow trabaja de forma síncrona y usa CPU, así que las variantes se generan en un pool de
+procesos; el event loop solo espera el resultado.
+"""
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Union
+
+# Nombre de la variante -> ancho máximo en píxeles
+VARIANTS = {"thumb": 320, "medium": 800}
+
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "webp").lower()
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def variant_extension() -> str:
+    return "jpg" if IMAGE_VARIANT_FORMAT == "jpeg" else IMAGE_VARIANT_FORMAT
+
+
+def variant_content_type() -> str:
+    return CONTENT_TYPES[IMAGE_VARIANT_FORMAT]
+
+
+def make_variants(source: Union[bytes, str]) -> Dict[str, bytes]:
+    """Genera las variantes a partir de los bytes o la ruta de la imagen original (en un proceso del pool)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as original:
+        image = ImageOps.exif_transpose(original)
+        if IMAGE_VARIANT_FORMAT == "jpeg" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if IMAGE_VARIANT_FORMAT == "webp" and "A" in image.getbands() else "RGB")
+
+        variants = {}
+        for name, width in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((width, width * 4))
+            buffer = io.BytesIO()
+            resized.save(buffer, IMAGE_VARIANT_FORMAT.upper(), quality=IMAGE_VARIANT_QUALITY, optimize=True)
+            variants[name] = buffer.getvalue()
+        return variants
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    """Termina los procesos de variantes (si se llegaron a crear) al apagar la aplicación"""
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def generate_variants(source: Union[bytes, str]) -> Optional[Dict[str, bytes]]:
+    """Genera las variantes sin bloquear el event loop; None si la imagen no se puede procesar"""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_executor(), make_variants, source)
+    except Exception:
+        # Un formato que Pillow no reconoce no impide guardar el original
+        return None
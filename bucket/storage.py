@@ -0,0 +1,271 @@
+"""
+Almacenamiento de imágenes intercambiable.
+
+STORAGE_BACKEND elige la implementación:
+    supabase  Supabase Storage por su API HTTP (por defecto)
+    local     carpeta local (STORAGE_LOCAL_ROOT, servida en STORAGE_LOCAL_URL)
+    memory    diccionario en memoria, para pruebas y benchmarks sin red
+
+El cliente se crea la primera vez que se usa, no al importar el módulo.
+
+put() acepta bytes o un archivo binario con seek (p. ej. el temporal de una subida): el archivo
+se envía por bloques, sin cargarlo entero en memoria.
+"""
+import asyncio
+import os
+import random
+from typing import AsyncIterator, BinaryIO, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import aiofiles
+import httpx
+from dotenv import load_dotenv
+
+dotenv_path = os.path.join(os.path.dirname(__file__), '..', 'app', '.env')
+
+# Escritura local y envío de archivos por bloques
+LOCAL_WRITE_CHUNK = 256 * 1024
+
+# Contenido de un objeto: bytes o un archivo binario que se lee desde el principio
+Content = Union[bytes, BinaryIO]
+
+
+def content_size(content: Content) -> int:
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return len(content)
+    return content.seek(0, os.SEEK_END)
+
+
+async def iter_content(content: Content, chunk_size: int = LOCAL_WRITE_CHUNK) -> AsyncIterator[bytes]:
+    """Bloques del contenido; un archivo se relee desde el principio en cada llamada (reintentos)"""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        view = memoryview(content)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+        return
+    await asyncio.to_thread(content.seek, 0)
+    while True:
+        chunk = await asyncio.to_thread(content.read, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class StorageError(Exception):
+    """El almacenamiento rechazó la operación o no respondió tras los reintentos"""
+
+
+class StorageBackend:
+    """Interfaz común: las rutas son relativas al bucket o carpeta, p. ej. 'images/abc.png'"""
+
+    async def put(self, path: str, content: Content, content_type: str) -> str:
+        """Guarda (o reemplaza) el objeto y devuelve su URL público"""
+        raise NotImplementedError
+
+    async def get(self, path: str) -> bytes:
+        raise NotImplementedError
+
+    def public_url(self, path: str) -> str:
+        raise NotImplementedError
+
+    def path_for_url(self, url: str) -> Optional[str]:
+        """Ruta del objeto si el URL pertenece a este almacenamiento, si no None"""
+        raise NotImplementedError
+
+    async def aclose(self):
+        pass
+
+
+class SupabaseStorage(StorageBackend):
+    """Supabase Storage con un cliente httpx asíncrono compartido y reintentos con backoff exponencial"""
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            url: str,
+            key: str,
+            bucket: str,
+            max_connections: int = 10,
+            retries: int = 3,
+            backoff: float = 0.5,
+            timeout: float = 30.0
+    ):
+        self.url = url.rstrip("/")
+        self.key = key
+        self.bucket = bucket
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.url}/storage/v1",
+                headers={"Authorization": f"Bearer {self.key}", "apikey": self.key},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=self.timeout,
+            )
+        return self._client
+
+    async def _request(self, method: str, path: str, content: Optional[Content] = None, **kwargs) -> httpx.Response:
+        """Petición con reintentos ante errores de red, 429 y 5xx"""
+        for attempt in range(self.retries + 1):
+            try:
+                if content is not None:
+                    # Un flujo nuevo por intento: un archivo se vuelve a leer desde el principio
+                    kwargs["content"] = content if isinstance(content, bytes) else iter_content(content)
+                response = await self.client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise StorageError(f"Supabase Storage no respondió: {e}") from e
+            else:
+                if response.status_code not in self.RETRY_STATUS or attempt == self.retries:
+                    if response.is_error:
+                        raise StorageError(f"Supabase Storage respondió {response.status_code}: {response.text}")
+                    return response
+            await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    async def put(self, path: str, content: Content, content_type: str) -> str:
+        await self._request(
+            "POST", f"/object/{self.bucket}/{path}",
+            content=content,
+            # Con Content-Length el archivo se envía por bloques sin codificación chunked
+            headers={"content-type": content_type, "content-length": str(content_size(content)), "x-upsert": "true"},
+        )
+        return self.public_url(path)
+
+    async def get(self, path: str) -> bytes:
+        response = await self._request("GET", f"/object/public/{self.bucket}/{path}")
+        return response.content
+
+    def public_url(self, path: str) -> str:
+        return f"{self.url}/storage/v1/object/public/{self.bucket}/{path}"
+
+    def path_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.url}/storage/v1/object/public/{self.bucket}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalStorage(StorageBackend):
+    """Carpeta local; los archivos se escriben por bloques"""
+
+    def __init__(self, root: str = "uploads", base_url: str = "/uploads"):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def _file_path(self, path: str) -> str:
+        full_path = os.path.abspath(os.path.join(self.root, path))
+        if not full_path.startswith(os.path.abspath(self.root) + os.sep):
+            raise StorageError(f"Ruta fuera del almacenamiento: {path}")
+        return full_path
+
+    async def put(self, path: str, content: Content, content_type: str) -> str:
+        file_path = self._file_path(path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        partial_path = f"{file_path}.part"
+        async with aiofiles.open(partial_path, "wb") as f:
+            async for chunk in iter_content(content):
+                await f.write(chunk)
+        # Los lectores nunca ven un archivo a medias
+        os.replace(partial_path, file_path)
+        return self.public_url(path)
+
+    async def get(self, path: str) -> bytes:
+        async with aiofiles.open(self._file_path(path), "rb") as f:
+            return await f.read()
+
+    def public_url(self, path: str) -> str:
+        return f"{self.base_url}/{path}"
+
+    def path_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+class MemoryStorage(StorageBackend):
+    """Objetos en un diccionario del proceso"""
+
+    def __init__(self):
+        self.objects: Dict[str, tuple] = {}
+
+    async def put(self, path: str, content: Content, content_type: str) -> str:
+        self.objects[path] = (b"".join([bytes(chunk) async for chunk in iter_content(content)]), content_type)
+        return self.public_url(path)
+
+    async def get(self, path: str) -> bytes:
+        if path not in self.objects:
+            raise StorageError(f"No existe el objeto {path}")
+        return self.objects[path][0]
+
+    def public_url(self, path: str) -> str:
+        return f"memory://{path}"
+
+    def path_for_url(self, url: str) -> Optional[str]:
+        return url[len("memory://"):] if url.startswith("memory://") else None
+
+
+def local_storage_config() -> Tuple[str, str]:
+    """(STORAGE_LOCAL_ROOT, STORAGE_LOCAL_URL) del entorno o de app/.env: la carpeta y la URL en la que se sirve"""
+    load_dotenv(dotenv_path)
+    return os.getenv("STORAGE_LOCAL_ROOT", "uploads"), os.getenv("STORAGE_LOCAL_URL", "/uploads")
+
+
+def storage_from_env() -> StorageBackend:
+    """Crea el almacenamiento configurado en el entorno (o en app/.env)"""
+    load_dotenv(dotenv_path)
+    kind = os.getenv("STORAGE_BACKEND", "supabase").lower()
+    if kind == "local":
+        return LocalStorage(*local_storage_config())
+    if kind == "memory":
+        return MemoryStorage()
+    if kind != "supabase":
+        raise ValueError(f"STORAGE_BACKEND desconocido: {kind}")
+    return SupabaseStorage(
+        os.getenv("NEXT_PUBLIC_SUPABASE_URL"),
+        os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY"),
+        os.getenv("SUPABASE_BUCKET"),
+        max_connections=int(os.getenv("STORAGE_MAX_CONNECTIONS", "10")),
+        retries=int(os.getenv("STORAGE_RETRIES", "3")),
+        backoff=float(os.getenv("STORAGE_BACKOFF", "0.5")),
+    )
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Almacenamiento compartido del proceso, creado al primer uso"""
+    global _storage
+    if _storage is None:
+        _storage = storage_from_env()
+    return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]):
+    """Reemplaza el almacenamiento compartido (p. ej. MemoryStorage en benchmarks)"""
+    global _storage
+    _storage = storage
+
+
+async def close_storage():
+    """Cierra el almacenamiento compartido (clientes HTTP) al apagar la aplicación"""
+    global _storage
+    storage, _storage = _storage, None
+    if storage is not None:
+        await storage.aclose()
+
+
+def is_remote_url(url: str) -> bool:
+    return urlparse(url).scheme in ("http", "https")
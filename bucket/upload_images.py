@@ -1,40 +1,208 @@
+import asyncio
+import hashlib
 import os
-import uuid
-from fastapi import UploadFile
-from dotenv import load_dotenv
-import aiofiles
-from supabase import create_client
+from typing import AsyncIterator, Dict, Optional, Union
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
 import unicodedata
 import re
+from app.image_operations import ImageBlobOperations
+from app.metrics import track_upload
+from bucket.image_variants import generate_variants, variant_content_type, variant_extension
+from bucket.storage import Content, StorageBackend, StorageError, content_size, get_storage
 
-# Cargar variables de entorno
-dotenv_path = os.path.join(os.path.dirname(__file__), '..', 'app', '.env')
-load_dotenv(dotenv_path)
+# Límites de subida
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+# Cuerpo completo de un formulario con imagen: la imagen más los demás campos del formulario
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(UPLOAD_MAX_BYTES + 1024 * 1024)))
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "4"))
 
-# Configuración de Supabase
-SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-SUPABASE_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET")
+# Subidas simultáneas por proceso (las demás esperan turno)
+_upload_slots = asyncio.Semaphore(UPLOAD_MAX_CONCURRENCY)
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-async def upload_file(file: UploadFile, filename: str) -> str:
+class UploadTooLarge(Exception):
+    """La imagen supera UPLOAD_MAX_BYTES"""
+
+
+async def iter_chunks(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> AsyncIterator[bytes]:
+    """Lee el archivo por bloques y corta en cuanto supera el tamaño máximo"""
+    total = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"La imagen supera el tamaño máximo de {max_bytes / (1024 * 1024):g} MB")
+        yield chunk
+
+
+class RequestTooLarge(HTTPException):
+    """El cuerpo de la petición supera UPLOAD_MAX_REQUEST_BYTES"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(413, f"La petición supera el tamaño máximo de {max_bytes / (1024 * 1024):g} MB")
+
+
+class UploadBodyLimitMiddleware:
     """
-    Sube un archivo a Supabase Storage y devuelve su URL público.
+    Middleware ASGI: limita el cuerpo de los formularios multipart antes de que Starlette lo
+    guarde (en memoria o en un temporal). Un Content-Length mayor que max_bytes se rechaza con
+    413 sin leer nada; sin Content-Length (chunked), se cuentan los bytes recibidos y se corta
+    en cuanto se pasa del límite.
     """
-    content = await file.read()
-    file_path = f"images/{filename}"  # Carpeta lógica en el bucket
-
-    # Subir a Supabase
-    supabase.storage.from_(SUPABASE_BUCKET).upload(
-        file_path,
-        content,
-        {"content-type": file.content_type}
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        headers = Headers(scope=scope) if scope["type"] == "http" else None
+        if headers is None or not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            declared = int(headers.get("content-length", "0"))
+        except ValueError:
+            declared = 0
+        if declared > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise RequestTooLarge(self.max_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestTooLarge:
+            # Normalmente lo responde FastAPI (es una HTTPException); esto cubre una lectura fuera de las rutas
+            if started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        error = RequestTooLarge(self.max_bytes)
+        await JSONResponse({"detail": error.detail}, status_code=error.status_code)(scope, receive, send)
+
+
+def variant_name(filename: str, variant: str) -> str:
+    """
+    'abc.png' -> 'abc_png_thumb.webp': se conserva la extensión del original para que
+    'abc.png' y 'abc.jpg' no compartan (ni se pisen) las variantes
+    """
+    stem, extension = os.path.splitext(filename)
+    suffix = f"_{extension[1:].lower()}" if extension else ""
+    return f"{stem}{suffix}_{variant}.{variant_extension()}"
+
+
+def content_filename(sha256: str, filename: str) -> str:
+    """Nombre direccionado por contenido: el hash y la extensión original"""
+    return f"{sha256}{os.path.splitext(filename)[1].lower()}"
+
+
+def _image_urls(original: str, variants: Optional[Dict[str, str]]) -> dict:
+    variants = variants or {}
+    return {
+        "image_url": original,
+        "image_thumb_url": variants.get("thumb"),
+        "image_medium_url": variants.get("medium"),
+    }
+
+
+def _blob_data(sha256: str, size: int, content_type: str, urls: dict) -> dict:
+    return {"sha256": sha256, "size": size, "content_type": content_type, **urls}
+
+
+async def _find_duplicate(session, sha256: str) -> Optional[dict]:
+    """URLs de una imagen idéntica ya guardada, o None"""
+    if session is None:
+        return None
+    blob = await ImageBlobOperations.get_blob(session, sha256)
+    if blob is None:
+        return None
+    return {**_image_urls(blob.image_url, {"thumb": blob.image_thumb_url, "medium": blob.image_medium_url}), "dedup": True}
+
+
+async def put_object(storage: StorageBackend, path: str, content: Content, content_type: str) -> str:
+    """Sube un objeto al almacenamiento midiendo bytes y duración (métricas de subida)"""
+    with track_upload(type(storage).__name__, content_size(content)):
+        return await storage.put(path, content, content_type)
+
+
+async def store_variants(storage: StorageBackend, filename: str, source: Union[bytes, str]) -> Optional[Dict[str, str]]:
+    """Genera las variantes (pool de procesos, desde los bytes o la ruta) y las guarda junto al original"""
+    variants = await generate_variants(source)
+    if variants is None:
+        return None
+    names = list(variants)
+    urls = await asyncio.gather(*[
+        put_object(storage, f"images/{variant_name(filename, name)}", variants[name], variant_content_type())
+        for name in names
+    ])
+    return dict(zip(names, urls))
+
+
+def _read_all(file) -> bytes:
+    file.seek(0)
+    return file.read()
+
+
+async def store_image(file: UploadFile, filename: str, storage: StorageBackend, session=None) -> dict:
+    """
+    Guarda un archivo y sus variantes en el almacenamiento y devuelve sus URLs.
+    Si el mismo contenido ya se guardó, reutiliza sus URLs sin volver a subirlo.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    # Starlette ya guardó la parte del formulario (SpooledTemporaryFile: en memoria y, si es
+    # grande, en disco) dentro de UPLOAD_MAX_REQUEST_BYTES. Aquí se recorre por bloques para el
+    # hash y el límite por imagen, sin otra copia
+    await file.seek(0)
+    async for chunk in iter_chunks(file):
+        digest.update(chunk)
+        size += len(chunk)
+    sha256 = digest.hexdigest()
+    duplicate = await _find_duplicate(session, sha256)
+    if duplicate is not None:
+        return duplicate
+
+    filename = content_filename(sha256, filename)
+
+    # Pillow decodifica la imagen entera en el proceso de variantes: se le pasan los bytes
+    # (como mucho UPLOAD_MAX_BYTES). El original se sube leyendo el archivo por bloques
+    source = await asyncio.to_thread(_read_all, file.file)
+
+    # El original se guarda mientras se generan las variantes; guardar de nuevo el mismo
+    # contenido reemplaza el objeto sin error
+    public_url, variant_urls = await asyncio.gather(
+        put_object(storage, f"images/{filename}", file.file, file.content_type),
+        store_variants(storage, filename, source),
     )
+    urls = _image_urls(public_url, variant_urls)
 
-    # Obtener URL pública
-    public_url = supabase.storage.from_(SUPABASE_BUCKET).get_public_url(file_path)
-    return public_url
+    if session is not None:
+        await ImageBlobOperations.register_blob(session, _blob_data(sha256, size, file.content_type, urls))
+    return {**urls, "dedup": False}
 
 
 def clean_filename(name: str) -> str:
@@ -42,25 +210,16 @@ def clean_filename(name: str) -> str:
     name = re.sub(r"[^\w\-_.]", "_", name)
     return name
 
-async def save_file(file: UploadFile, to_supabase: bool = True):
-    if not file.content_type.startswith("image/"):
-        return {"error": "Solo se permiten imágenes"}
-    filename = f"{uuid.uuid4().hex}_{clean_filename(file.filename)}"
-    if to_supabase:
-        return await upload_file(file, filename)
-    else:
-        return await save_to_local(file, filename)
-
-
-async def save_to_local(file: UploadFile, filename: str):
+async def save_file(file: UploadFile, session=None, storage: Optional[StorageBackend] = None):
     """
-    Guarda el archivo en una carpeta local llamada 'uploads'.
+    Guarda la imagen y sus variantes en el almacenamiento configurado (STORAGE_BACKEND);
+    devuelve {"image_url", "image_thumb_url", "image_medium_url", "dedup"} o {"error": ...}.
+    Con una sesión, las imágenes repetidas se reutilizan (dedup=True).
     """
-    os.makedirs("uploads", exist_ok=True)
-    path = os.path.join("uploads", filename)
-
-    async with aiofiles.open(path, "wb") as f:
-        content = await file.read()
-        await f.write(content)
-
-    return {"filename": filename, "local_path": path}
+    if not file.content_type.startswith("image/"):
+        return {"error": "Solo se permiten imágenes"}
+    try:
+        async with _upload_slots:
+            return await store_image(file, clean_filename(file.filename), storage or get_storage(), session)
+    except (UploadTooLarge, StorageError) as e:
+        return {"error": str(e)}
@@ -1,17 +1,27 @@
+import logging
 import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
+from database.migrations import lock_schema, run_migrations
 
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', 'app', '.env')
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
+def database_url() -> str:
+    """DATABASE_URL, o la URL de Postgres armada con POSTGRESQL_ADDON_* (leídas de app/.env si faltan)"""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
     from dotenv import load_dotenv
     load_dotenv(dotenv_path)
-    DATABASE_URL = (
+    return (
         f"postgresql+asyncpg://{os.getenv('POSTGRESQL_ADDON_USER')}:"
         f"{os.getenv('POSTGRESQL_ADDON_PASSWORD')}@"
         f"{os.getenv('POSTGRESQL_ADDON_HOST')}:"
@@ -19,13 +29,218 @@ if not DATABASE_URL:
         f"{os.getenv('POSTGRESQL_ADDON_DB')}"
     )
 
-engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=True)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+slow_query_logger = logging.getLogger("database.slow_query")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def engine_options(database_url: str):
+    """
+    URL y opciones del engine leídas del entorno:
+    DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+    y DB_STATEMENT_CACHE_SIZE (caché de sentencias preparadas de asyncpg; 0 detrás de PgBouncer).
+    """
+    url = make_url(database_url)
+    options = {"echo": _env_bool("DB_ECHO", False)}
+
+    # SQLite (pruebas locales) conserva el pool por defecto de SQLAlchemy
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+        )
+
+    if url.get_driver_name() == "asyncpg":
+        cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+        # Caché de asyncpg y caché de sentencias preparadas del dialecto de SQLAlchemy
+        options["connect_args"] = {"statement_cache_size": cache_size}
+        url = url.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+
+    return url, options
+
+
+def install_slow_query_logger(engine: AsyncEngine, threshold_ms: float, sample_rate: float = 1.0):
+    """Registra las consultas más lentas que threshold_ms; solo se mide una fracción sample_rate"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter() if random.random() < sample_rate else None
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= threshold_ms:
+            slow_query_logger.warning("Consulta lenta (%.1f ms): %s", elapsed_ms, statement)
+
+
+class Database:
+    """
+    Engines (primario y réplica de lectura opcional) y fábricas de sesiones del proceso.
+    Se crean con el primer uso, no al importar: importar la aplicación no lee .env ni prepara
+    pools, y el lifespan decide cuándo conectar (warmup) y cuándo cerrar (dispose).
+
+    La aplicación engancha lo suyo (p. ej. las métricas de consultas) con add_engine_hook:
+    este módulo no depende de app/.
+    """
+
+    def __init__(self):
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._sessions: Optional[sessionmaker] = None
+        self._read_sessions: Optional[sessionmaker] = None
+        self._engine_hooks: List[Callable[[AsyncEngine, str], None]] = []
+
+    def add_engine_hook(self, hook: Callable[[AsyncEngine, str], None]):
+        """
+        Llama a hook(engine, nombre) con cada engine ('primary', 'replica'): los que ya existen
+        y los que se creen después (también tras dispose). Registrar dos veces el mismo hook no
+        hace nada.
+        """
+        if hook in self._engine_hooks:
+            return
+        self._engine_hooks.append(hook)
+        for name, engine in self._engines.items():
+            hook(engine, name)
+
+    def _configure(self):
+        url, options = engine_options(database_url())
+        engines = {"primary": create_async_engine(url, **options)}
+        # Réplica de lectura opcional (mismas opciones de pool); sin ella las lecturas usan el primario
+        replica_url = os.getenv("DATABASE_REPLICA_URL")
+        if replica_url:
+            url, options = engine_options(replica_url)
+            engines["replica"] = create_async_engine(url, **options)
+
+        for name, engine in engines.items():
+            # DB_SLOW_QUERY_MS=0 (por defecto) desactiva el registro de consultas lentas
+            if float(os.getenv("DB_SLOW_QUERY_MS", "0")) > 0:
+                install_slow_query_logger(
+                    engine,
+                    float(os.getenv("DB_SLOW_QUERY_MS")),
+                    float(os.getenv("DB_SLOW_QUERY_SAMPLE", "1.0")),
+                )
+            for hook in self._engine_hooks:
+                hook(engine, name)
+
+        self._engines = engines
+        self._sessions = sessionmaker(engines["primary"], class_=AsyncSession, expire_on_commit=False)
+        self._read_sessions = sessionmaker(engines.get("replica", engines["primary"]), class_=AsyncSession, expire_on_commit=False)
+
+    @property
+    def engines(self) -> Dict[str, AsyncEngine]:
+        if not self._engines:
+            self._configure()
+        return self._engines
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self.engines["primary"]
+
+    @property
+    def replica_engine(self) -> Optional[AsyncEngine]:
+        return self.engines.get("replica")
+
+    def session(self) -> AsyncSession:
+        if self._sessions is None:
+            self._configure()
+        return self._sessions()
+
+    def read_session(self) -> AsyncSession:
+        if self._read_sessions is None:
+            self._configure()
+        return self._read_sessions()
+
+    async def warmup(self, connections: int = 1) -> int:
+        """Abre 'connections' conexiones por engine y las deja en el pool; devuelve cuántas abrió"""
+        opened = 0
+        for engine in self.engines.values():
+            conns = []
+            try:
+                for _ in range(connections):
+                    conn = await engine.connect()
+                    conns.append(conn)
+                    await conn.execute(text("SELECT 1"))
+                    opened += 1
+            finally:
+                for conn in conns:
+                    await conn.close()
+        return opened
+
+    async def dispose(self):
+        """Cierra los pools; el siguiente uso vuelve a crear los engines"""
+        engines, self._engines = self._engines, {}
+        self._sessions = self._read_sessions = None
+        for engine in engines.values():
+            await engine.dispose()
+
+
+database = Database()
+
+
+def get_engine() -> AsyncEngine:
+    return database.engine
+
+
+def async_session() -> AsyncSession:
+    """Nueva sesión del primario"""
+    return database.session()
+
+
+def async_read_session() -> AsyncSession:
+    """Nueva sesión de la réplica de lectura (del primario si no hay réplica)"""
+    return database.read_session()
 
 async def init_db():
-    async with engine.begin() as conn:
+    """Crea las tablas que faltan y aplica las migraciones pendientes (en el primario)"""
+    async with database.engine.begin() as conn:
+        # Varios workers pueden arrancar a la vez: uno crea el esquema y los demás esperan
+        await lock_schema(conn)
         await conn.run_sync(SQLModel.metadata.create_all)
+        await run_migrations(conn)
 
-async def get_session():
+async def get_write_session():
+    """Sesión del primario: escrituras y lecturas que tienen que ver el último dato"""
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+# Nombre anterior, para los scripts y las rutas que escriben
+get_session = get_write_session
+
+async def engine_health(engine: AsyncEngine) -> dict:
+    """Estado del pool (conexiones en uso y libres) y latencia de un SELECT 1"""
+    pool = engine.pool
+    health = {
+        "status": "ok",
+        "pool": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "idle": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+    }
+    started = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        health.update(status="error", error=str(e))
+    health["ping_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return health
+
+async def db_health() -> dict:
+    """Salud del primario y, si está configurada, de la réplica de lectura"""
+    health = await engine_health(database.engine)
+    if database.replica_engine is not None:
+        health["replica"] = await engine_health(database.replica_engine)
+        if health["replica"]["status"] != "ok":
+            health["status"] = "error"
+    return health
@@ -0,0 +1,315 @@
+"""
+Carga masiva de colaboraciones desde CSV.
+
+    python -m database.ingest cosmetics database/cosmetic_colab.csv --upsert --rejects rechazados.csv
+
+El CSV se lee por bloques, cada bloque se valida con los esquemas *Create en un pool de
+procesos y se carga con COPY (asyncpg copy_records_to_table). Con otros drivers se usa un
+INSERT por lotes (executemany). La conexión es la de database/connection_db.py.
+
+Si la base de datos rechaza un bloque (p. ej. un id repetido sin --upsert), el bloque se
+reintenta fila a fila: se cargan las filas válidas y las demás van al CSV de rechazados con el
+error de la base de datos, igual que las que no pasan la validación.
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Nombre de la tabla en la línea de comandos -> (módulo, modelo de tabla, esquema de validación)
+TABLES = {
+    "cosmetics": ("app.cosmetic_models", "CosmeticColab", "CosmeticColabCreate"),
+    "videogames": ("app.videogame_models", "VideogameColab", "VideogameColabCreate"),
+}
+
+
+@dataclass
+class IngestReport:
+    rows: int = 0
+    loaded: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _resolve(table_name: str):
+    module_name, model_name, schema_name = TABLES[table_name]
+    module = __import__(module_name, fromlist=[model_name, schema_name])
+    return getattr(module, model_name), getattr(module, schema_name)
+
+
+# Columnas que gestiona la aplicación y nunca vienen en el CSV
+MANAGED_COLUMNS = {"deleted_at"}
+
+
+def load_columns(model) -> List[str]:
+    """Columnas que se cargan (todas menos las calculadas por la base de datos y las gestionadas)"""
+    return [
+        column.name for column in model.__table__.columns
+        if column.computed is None and column.name not in MANAGED_COLUMNS
+    ]
+
+
+def read_chunks(csv_path: str, chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    """Lee el CSV en bloques de (número de línea, fila) sin cargar el archivo completo"""
+    with open(csv_path, newline='', encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+        rows = ((reader.line_num, row) for row in reader)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def validate_chunk(table_name: str, chunk: List[Tuple[int, dict]]):
+    """
+    Valida un bloque con el esquema *Create de la tabla (se ejecuta en un proceso del pool).
+    Devuelve (registros con ID, registros sin ID, rechazados) con los registros como pares
+    (número de línea, tupla en el orden de load_columns()).
+    """
+    model, schema = _resolve(table_name)
+    columns = load_columns(model)
+    with_id, without_id, rejected = [], [], []
+
+    for line_num, row in chunk:
+        try:
+            raw_id = (row.get("id") or "").strip()
+            entry_id = int(raw_id) if raw_id else None
+            # Las celdas vacías son valores nulos (así exporta /cosmetics/export?format=csv)
+            data = schema.model_validate({k: v for k, v in row.items() if k != "id" and v != ""}).model_dump()
+        except ValueError as e:
+            rejected.append((line_num, row, str(e).replace("\n", " ")))
+            continue
+
+        if entry_id is None:
+            without_id.append((line_num, tuple(data[column] for column in columns if column != "id")))
+        else:
+            data["id"] = entry_id
+            with_id.append((line_num, tuple(data[column] for column in columns)))
+
+    return with_id, without_id, rejected
+
+
+async def _copy_records(conn: AsyncConnection, table: str, columns: List[str], records: list, upsert: bool):
+    """Carga con COPY; con upsert pasa por una tabla temporal y INSERT ... ON CONFLICT"""
+    driver = (await conn.get_raw_connection()).driver_connection
+    if not upsert:
+        await driver.copy_records_to_table(table, records=records, columns=columns)
+        return
+
+    staging = f"_ingest_{table}"
+    await conn.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+        f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    await driver.copy_records_to_table(staging, records=records, columns=columns)
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+    await conn.execute(text(
+        f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}"
+    ))
+
+
+async def _insert_records(conn: AsyncConnection, model, columns: List[str], records: list, upsert: bool):
+    """Carga con un INSERT por lotes (executemany); alternativa a COPY"""
+    rows = [dict(zip(columns, record)) for record in records]
+    dialect = conn.dialect.name
+    if upsert and dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = dialect_insert(model.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={column: statement.excluded[column] for column in columns if column != "id"},
+        )
+    else:
+        statement = insert(model.__table__)
+    await conn.execute(statement, rows)
+
+
+async def load_records(conn: AsyncConnection, model, columns: List[str], records: list, upsert: bool):
+    """Carga un lote de tuplas, por COPY si el driver es asyncpg"""
+    if not records:
+        return
+    if conn.dialect.driver == "asyncpg":
+        await _copy_records(conn, model.__tablename__, columns, records, upsert)
+    else:
+        await _insert_records(conn, model, columns, records, upsert)
+
+
+async def _reset_id_sequence(conn: AsyncConnection, table: str):
+    """Tras cargar IDs explícitos, la secuencia de PostgreSQL debe continuar desde el máximo"""
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def _db_error(error: Exception) -> str:
+    """Mensaje del driver, en una línea (sin la sentencia ni los parámetros de SQLAlchemy)"""
+    return str(getattr(error, "orig", None) or error).replace("\n", " ")
+
+
+async def load_row_by_row(engine, model, columns: List[str], records: list, upsert: bool):
+    """
+    Carga (número de línea, tupla) de una en una, cada una en su SAVEPOINT; devuelve
+    (filas cargadas, [(número de línea, error)] de las que la base de datos rechazó)
+    """
+    loaded, failed = 0, []
+    async with engine.begin() as conn:
+        for line_num, record in records:
+            try:
+                async with conn.begin_nested():
+                    await _insert_records(conn, model, columns, [record], upsert)
+                loaded += 1
+            except DBAPIError as e:
+                failed.append((line_num, _db_error(e)))
+    return loaded, failed
+
+
+def _write_rejects(writer, rejected):
+    for line_num, row, error in rejected:
+        writer.writerow({"line": line_num, "error": error, **row})
+
+
+async def ingest_csv(
+        table_name: str,
+        csv_path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: Optional[int] = None,
+        upsert: bool = False,
+        rejects_path: Optional[str] = None,
+        progress: bool = True,
+) -> IngestReport:
+    """Valida y carga un CSV por bloques; devuelve el resumen de la carga"""
+    from database.connection_db import get_engine
+
+    engine = get_engine()
+
+    model, _ = _resolve(table_name)
+    table = model.__tablename__
+    columns = load_columns(model)
+    columns_without_id = [column for column in columns if column != "id"]
+    workers = os.cpu_count() if workers is None else workers
+    report = IngestReport()
+    started = time.perf_counter()
+
+    rejects_file = rejects_writer = None
+    if rejects_path:
+        with open(csv_path, newline='', encoding="utf-8") as csvfile:
+            header = next(csv.reader(csvfile), [])
+        rejects_file = open(rejects_path, "w", newline='', encoding="utf-8")
+        rejects_writer = csv.DictWriter(rejects_file, fieldnames=["line", "error", *header], extrasaction="ignore")
+        rejects_writer.writeheader()
+
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+    def submit(chunk):
+        if pool is None:
+            future = loop.create_future()
+            future.set_result(validate_chunk(table_name, chunk))
+            return future
+        return loop.run_in_executor(pool, validate_chunk, table_name, chunk)
+
+    try:
+        chunks = read_chunks(csv_path, chunk_size)
+        # Se validan por adelantado como máximo 'workers' bloques para mantener la memoria acotada
+        pending = [(chunk, submit(chunk)) for chunk in islice(chunks, max(workers, 1))]
+        while pending:
+            chunk, future = pending.pop(0)
+            with_id, without_id, rejected = await future
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                pending.append((next_chunk, submit(next_chunk)))
+
+            try:
+                async with engine.begin() as conn:
+                    await load_records(conn, model, columns, [record for _, record in with_id], upsert)
+                    await load_records(conn, model, columns_without_id, [record for _, record in without_id], False)
+                report.loaded += len(with_id) + len(without_id)
+            except Exception as e:
+                # La base rechazó el bloque completo: fila a fila se cargan las válidas y se reportan las demás
+                print(f"\nBloque rechazado por la base de datos ({_db_error(e)}); se reintenta fila a fila", file=sys.stderr)
+                rows = dict(chunk)
+                for records, columns_loaded, records_upsert in (
+                        (with_id, columns, upsert), (without_id, columns_without_id, False)):
+                    loaded, failed = await load_row_by_row(engine, model, columns_loaded, records, records_upsert)
+                    report.loaded += loaded
+                    rejected += [(line_num, rows[line_num], error) for line_num, error in failed]
+
+            report.rows += len(chunk)
+            report.rejected += len(rejected)
+            if rejects_writer is not None:
+                _write_rejects(rejects_writer, rejected)
+            report.seconds = time.perf_counter() - started
+            if progress:
+                print(
+                    f"\r{report.rows} filas leídas, {report.loaded} cargadas, "
+                    f"{report.rejected} rechazadas ({report.rows_per_second:,.0f} filas/s)",
+                    end="", file=sys.stderr, flush=True
+                )
+
+        async with engine.begin() as conn:
+            await _reset_id_sequence(conn, table)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if rejects_file is not None:
+            rejects_file.close()
+
+    report.seconds = time.perf_counter() - started
+    if progress:
+        print(file=sys.stderr)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga masiva de colaboraciones desde CSV")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("csv_path")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="procesos de validación (0 = sin pool)")
+    parser.add_argument("--upsert", action="store_true", help="actualiza las filas cuyo id ya existe")
+    parser.add_argument("--rejects", dest="rejects_path", help="CSV donde se guardan las filas rechazadas")
+    parser.add_argument("--init-db", action="store_true", help="crea las tablas y aplica migraciones antes de cargar")
+    args = parser.parse_args(argv)
+
+    async def run():
+        if args.init_db:
+            from database.connection_db import init_db
+            for table_name in TABLES:
+                _resolve(table_name)  # registra los modelos antes de create_all
+            import app.image_models  # noqa: F401
+            await init_db()
+        return await ingest_csv(
+            args.table, args.csv_path, args.chunk_size, args.workers, args.upsert, args.rejects_path
+        )
+
+    report = asyncio.run(run())
+    print(
+        f"{report.loaded} filas cargadas, {report.rejected} rechazadas en {report.seconds:.2f}s "
+        f"({report.rows_per_second:,.0f} filas/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# Tablas de colaboraciones (activas y eliminadas)
+COLLAB_TABLES = ("cosmeticcolab", "videogamecolab", "deleted_cosmetic", "deleted_videogame")
+
+# Tabla -> espacio de la caché de respuestas cuya versión sube con cada escritura en ella
+# (los nombres de app/tables.py)
+CACHE_VERSION_TABLES = {
+    "cosmeticcolab": "cosmetics",
+    "deleted_cosmetic": "cosmetics",
+    "videogamecolab": "videogames",
+    "deleted_videogame": "videogames",
+}
+CACHE_NAMESPACES = sorted(set(CACHE_VERSION_TABLES.values()))
+
+# Migraciones en orden. Cada una tiene un nombre único y las sentencias por dialecto;
+# si un dialecto no aparece, la migración solo se marca como aplicada (create_all ya
+# genera el esquema actual en bases nuevas).
+MIGRATIONS = [
+    (
+        "0001_trigram_search_indexes",
+        {
+            "postgresql": [
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                "CREATE INDEX IF NOT EXISTS ix_cosmeticcolab_marca_maquillaje_trgm "
+                "ON cosmeticcolab USING gin (marca_maquillaje gin_trgm_ops)",
+                "CREATE INDEX IF NOT EXISTS ix_cosmeticcolab_videojuego_trgm "
+                "ON cosmeticcolab USING gin (videojuego gin_trgm_ops)",
+                "CREATE INDEX IF NOT EXISTS ix_cosmeticcolab_tipo_colaboracion_trgm "
+                "ON cosmeticcolab USING gin (tipo_colaboracion gin_trgm_ops)",
+                "CREATE INDEX IF NOT EXISTS ix_videogamecolab_videojuego_trgm "
+                "ON videogamecolab USING gin (videojuego gin_trgm_ops)",
+                "CREATE INDEX IF NOT EXISTS ix_videogamecolab_marca_maquillaje_trgm "
+                "ON videogamecolab USING gin (marca_maquillaje gin_trgm_ops)",
+            ],
+        },
+    ),
+    (
+        # Los textos heredados que no son una fecha no abortan la migración: la fila completa se
+        # guarda en migration_rejects (para corregirla y volver a cargarla) y sale de la tabla,
+        # porque fecha_colaboracion es obligatoria
+        "0002_fecha_colaboracion_as_date",
+        {
+            "postgresql": [
+                "CREATE TABLE IF NOT EXISTS migration_rejects ("
+                "id BIGSERIAL PRIMARY KEY, "
+                "migration VARCHAR(100) NOT NULL, "
+                "table_name VARCHAR(100) NOT NULL, "
+                "row_data JSONB NOT NULL, "
+                "reason TEXT NOT NULL, "
+                "rejected_at TIMESTAMP WITH TIME ZONE DEFAULT now())",
+                "CREATE OR REPLACE FUNCTION migration_try_date(value text) RETURNS date AS $$ "
+                "BEGIN RETURN value::date; "
+                "EXCEPTION WHEN others THEN RETURN NULL; "
+                "END $$ LANGUAGE plpgsql",
+            ] + [
+                statement
+                for table in COLLAB_TABLES
+                for statement in (
+                    f"INSERT INTO migration_rejects (migration, table_name, row_data, reason) "
+                    f"SELECT '0002_fecha_colaboracion_as_date', '{table}', to_jsonb(t), "
+                    f"'fecha_colaboracion no es una fecha: ' || t.fecha_colaboracion::text "
+                    f"FROM {table} t WHERE migration_try_date(t.fecha_colaboracion::text) IS NULL",
+                    f"DELETE FROM {table} WHERE migration_try_date(fecha_colaboracion::text) IS NULL",
+                    f"ALTER TABLE {table} ALTER COLUMN fecha_colaboracion TYPE date "
+                    f"USING migration_try_date(fecha_colaboracion::text)",
+                )
+            ] + [
+                "DROP FUNCTION migration_try_date(text)",
+            ] + [
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_fecha_colaboracion ON {table} (fecha_colaboracion)"
+                for table in COLLAB_TABLES
+            ],
+        },
+    ),
+    (
+        # Igual que percent_as_integer (app/percent_column.py): un valor heredado sin el formato
+        # ^\d+%$ deja la columna en NULL en lugar de abortar la migración
+        "0003_incremento_ventas_pct",
+        {
+            "postgresql": [
+                "ALTER TABLE cosmeticcolab ADD COLUMN IF NOT EXISTS incremento_ventas_maquillaje_pct integer "
+                "GENERATED ALWAYS AS (CASE WHEN incremento_ventas_maquillaje ~ '^[0-9]+%$' "
+                "THEN CAST(REPLACE(incremento_ventas_maquillaje, '%', '') AS INTEGER) END) STORED",
+                "CREATE INDEX IF NOT EXISTS ix_cosmeticcolab_incremento_ventas_maquillaje_pct "
+                "ON cosmeticcolab (incremento_ventas_maquillaje_pct)",
+                "ALTER TABLE videogamecolab ADD COLUMN IF NOT EXISTS incremento_ventas_videojuego_pct integer "
+                "GENERATED ALWAYS AS (CASE WHEN incremento_ventas_videojuego ~ '^[0-9]+%$' "
+                "THEN CAST(REPLACE(incremento_ventas_videojuego, '%', '') AS INTEGER) END) STORED",
+                "CREATE INDEX IF NOT EXISTS ix_videogamecolab_incremento_ventas_videojuego_pct "
+                "ON videogamecolab (incremento_ventas_videojuego_pct)",
+            ],
+        },
+    ),
+    (
+        "0004_image_variant_urls",
+        {
+            "postgresql": [
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} VARCHAR(500)"
+                for table in COLLAB_TABLES
+                for column in ("image_thumb_url", "image_medium_url")
+            ],
+        },
+    ),
+    (
+        "0005_soft_delete",
+        {
+            "postgresql": [
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE"
+                for table in COLLAB_TABLES
+            ] + [
+                statement
+                for table in ("cosmeticcolab", "videogamecolab")
+                for statement in (
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_live_id ON {table} (id) WHERE deleted_at IS NULL",
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_live_fecha_colaboracion "
+                    f"ON {table} (fecha_colaboracion) WHERE deleted_at IS NULL",
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_deleted_at ON {table} (deleted_at) "
+                    f"WHERE deleted_at IS NOT NULL",
+                )
+            ],
+        },
+    ),
+    (
+        # Versión y última escritura de cada espacio de la caché (ETag / Last-Modified): las suben
+        # triggers, así cuentan las escrituras de cualquier worker, de los scripts (ingest, purga,
+        # backfill) y del SQL manual
+        "0006_cache_versions",
+        {
+            "postgresql": [
+                "CREATE TABLE IF NOT EXISTS cache_versions ("
+                "namespace VARCHAR(50) PRIMARY KEY, "
+                "version BIGINT NOT NULL DEFAULT 0, "
+                "modified_at BIGINT NOT NULL)",
+                "INSERT INTO cache_versions (namespace, modified_at) VALUES "
+                + ", ".join(f"('{namespace}', EXTRACT(EPOCH FROM now())::bigint)" for namespace in CACHE_NAMESPACES)
+                + " ON CONFLICT (namespace) DO NOTHING",
+                "CREATE OR REPLACE FUNCTION bump_cache_version() RETURNS trigger AS $$ "
+                "BEGIN "
+                "UPDATE cache_versions SET version = version + 1, "
+                "modified_at = EXTRACT(EPOCH FROM clock_timestamp())::bigint "
+                "WHERE namespace = TG_ARGV[0]; "
+                "RETURN NULL; "
+                "END $$ LANGUAGE plpgsql",
+            ] + [
+                statement
+                for table, namespace in CACHE_VERSION_TABLES.items()
+                for statement in (
+                    f"DROP TRIGGER IF EXISTS trg_{table}_cache_version ON {table}",
+                    # Una vez por sentencia: un COPY o un UPDATE masivo suben la versión una sola vez
+                    f"CREATE TRIGGER trg_{table}_cache_version "
+                    f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+                    f"FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version('{namespace}')",
+                )
+            ],
+            "sqlite": [
+                "CREATE TABLE IF NOT EXISTS cache_versions ("
+                "namespace VARCHAR(50) PRIMARY KEY, "
+                "version INTEGER NOT NULL DEFAULT 0, "
+                "modified_at INTEGER NOT NULL)",
+                "INSERT OR IGNORE INTO cache_versions (namespace, modified_at) VALUES "
+                + ", ".join(f"('{namespace}', CAST(strftime('%s', 'now') AS INTEGER))" for namespace in CACHE_NAMESPACES),
+            ] + [
+                # SQLite solo tiene triggers por fila
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_cache_version_{event.lower()} AFTER {event} ON {table} "
+                f"BEGIN UPDATE cache_versions SET version = version + 1, "
+                f"modified_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE namespace = '{namespace}'; END"
+                for table, namespace in CACHE_VERSION_TABLES.items()
+                for event in ("INSERT", "UPDATE", "DELETE")
+            ],
+        },
+    ),
+]
+
+
+# Clave del bloqueo consultivo de Postgres que serializa la creación del esquema entre procesos
+SCHEMA_LOCK_KEY = 74_210_001
+
+
+async def lock_schema(conn: AsyncConnection):
+    """
+    Bloquea la creación del esquema hasta el final de la transacción: con varios workers
+    arrancando a la vez, solo uno crea tablas y aplica migraciones; los demás esperan y después
+    ven el esquema ya aplicado. SQLite ya serializa las escrituras.
+    """
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+
+async def _report_rejects(conn: AsyncConnection, name: str):
+    """Avisa de las filas que la migración no pudo convertir y dejó en migration_rejects"""
+    if conn.dialect.name != "postgresql":
+        return
+    if (await conn.execute(text("SELECT to_regclass('migration_rejects')"))).scalar() is None:
+        return
+    result = await conn.execute(
+        text("SELECT table_name, count(*) FROM migration_rejects WHERE migration = :name GROUP BY table_name"),
+        {"name": name},
+    )
+    for table, count in result.all():
+        logger.warning(
+            "Migración %s: %d filas de %s no se pudieron convertir; están en migration_rejects", name, count, table
+        )
+
+
+async def run_migrations(conn: AsyncConnection):
+    """
+    Aplica las migraciones pendientes y las registra en schema_migrations.
+    Se ejecuta en la transacción de init_db, después de lock_schema.
+    """
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "name VARCHAR(100) PRIMARY KEY, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    result = await conn.execute(text("SELECT name FROM schema_migrations"))
+    applied = set(result.scalars().all())
+
+    for name, statements in MIGRATIONS:
+        if name in applied:
+            continue
+        for statement in statements.get(conn.dialect.name, []):
+            await conn.execute(text(statement))
+        await _report_rejects(conn, name)
+        await conn.execute(
+            text("INSERT INTO schema_migrations (name) VALUES (:name) ON CONFLICT (name) DO NOTHING"), {"name": name}
+        )
+
+
+if __name__ == "__main__":
+    # Registrar los modelos antes de crear las tablas
+    import app.cosmetic_models  # noqa: F401
+    import app.videogame_models  # noqa: F401
+    import app.image_models  # noqa: F401
+    from database.connection_db import init_db
+
+    asyncio.run(init_db())
+    print("Esquema y migraciones aplicados.")
@@ -0,0 +1,62 @@
+"""
+Mueve al archivo (tablas deleted_*) los registros eliminados hace más de SOFT_DELETE_RETENTION_DAYS.
+
+    python -m database.purge_deleted --retention-days 30 --batch-size 500
+
+La aplicación también la ejecuta en segundo plano cada SOFT_DELETE_PURGE_INTERVAL segundos
+(ver el lifespan de app/main.py). Cada lote es una transacción propia, así que la purga de
+muchos registros no bloquea las tablas durante mucho tiempo.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict
+
+from app.soft_delete import PURGE_BATCH_SIZE, PURGE_INTERVAL, SOFT_DELETE_RETENTION_DAYS, purge_cutoff
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_once(
+        retention_days: float = SOFT_DELETE_RETENTION_DAYS,
+        batch_size: int = PURGE_BATCH_SIZE
+) -> Dict[str, int]:
+    """Una pasada sobre las dos tablas; devuelve cuántos registros se archivaron en cada una"""
+    from database.connection_db import async_session
+    from app.cosmetic_operations import CosmeticOperations
+    from app.videogame_operations import VideogameOperations
+
+    cutoff = purge_cutoff(retention_days)
+    async with async_session() as session:
+        return {
+            "cosmetics": await CosmeticOperations.purge_deleted_cosmetics(session, cutoff, batch_size),
+            "videogames": await VideogameOperations.purge_deleted_videogames(session, cutoff, batch_size),
+        }
+
+
+async def purge_loop(interval: float = PURGE_INTERVAL):
+    """Purga periódica en segundo plano; un error se registra y se reintenta en la siguiente vuelta"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            moved = await purge_once()
+        except Exception:
+            logger.exception("Falló la purga de registros eliminados")
+            continue
+        if any(moved.values()):
+            logger.info("Registros eliminados archivados: %s", moved)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archiva los registros eliminados hace más de N días")
+    parser.add_argument("--retention-days", type=float, default=SOFT_DELETE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    moved = asyncio.run(purge_once(args.retention_days, args.batch_size))
+    for table_name, count in moved.items():
+        print(f"{table_name}: {count} registros archivados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+// Definición de los campos para cada tipo
+const formFields = {
+    cosmetics: [
+        {name: "marca_maquillaje", label: "Marca de Maquillaje", type: "text", icon: "fas fa-lipstick", required: true},
+        {name: "videojuego", label: "Videojuego", type: "text", icon: "fas fa-gamepad", required: true},
+        {name: "fecha_colaboracion", label: "Fecha de Colaboración", type: "text", icon: "fas fa-calendar-alt", required: true, placeholder: "YYYY-MM-DD"},
+        {name: "tipo_colaboracion", label: "Tipo de Colaboración", type: "text", icon: "fas fa-handshake", required: true},
+        {name: "incremento_ventas_maquillaje", label: "Incremento de Ventas", type: "text", icon: "fas fa-chart-line", required: true, placeholder: "Ej: 20%"},
+        {name: "image_file", label: "Imagen de la Colaboración", type: "file", icon: "fas fa-image", required: true}
+    ],
+    videogames: [
+        {name: "videojuego", label: "Videojuego", type: "text", icon: "fas fa-gamepad", required: true},
+        {name: "marca_maquillaje", label: "Marca de Maquillaje", type: "text", icon: "fas fa-lipstick", required: true},
+        {name: "fecha_colaboracion", label: "Fecha de Colaboración", type: "text", icon: "fas fa-calendar-alt", required: true, placeholder: "YYYY-MM-DD"},
+        {name: "incremento_ventas_videojuego", label: "Incremento de Ventas", type: "text", icon: "fas fa-chart-line", required: true, placeholder: "Ej: 20%"},
+        {name: "image_file", label: "Imagen de la Colaboración", type: "file", icon: "fas fa-image", required: true}
+    ]
+};
+
+// Cargar el formulario según el tipo seleccionado
+function loadForm(type) {
+    const formContainer = document.getElementById('formContainer');
+    const fields = formFields[type];
+
+    let formHTML = `
+        <div class="card border-0 shadow-sm" style="background-color: #f3e9ff;">
+            <div class="card-header" style="background: linear-gradient(135deg, #d6afff 0%, #e2d1f9 100%);">
+                <h2 class="h5 mb-0 text-purple">
+                    <i class="${type === 'cosmetics' ? 'fas fa-lipstick' : 'fas fa-gamepad'} me-2"></i>
+                    ${type === 'cosmetics' ? 'Nueva Colaboración de Maquillaje' : 'Nueva Colaboración de Videojuego'}
+                </h2>
+            </div>
+            <div class="card-body">
+                <form id="createForm" class="row g-3" enctype="multipart/form-data">
+    `;
+
+    // Añadir campos al formulario
+    fields.forEach(field => {
+        formHTML += `
+            <div class="col-md-6">
+                <label for="${field.name}" class="form-label text-purple">
+                    <i class="${field.icon} me-1"></i>${field.label}:
+                </label>
+                <input type="${field.type}"
+                       id="${field.name}"
+                       name="${field.name}"
+                       class="form-control"
+                       style="border-color: #d6afff;"
+                       ${field.required ? 'required' : ''}
+                       ${field.placeholder ? `placeholder="${field.placeholder}"` : ''}>
+            </div>
+        `;
+    });
+
+    // Botón de submit
+    formHTML += `
+                    <div class="col-12 mt-4">
+                        <button type="submit" class="btn btn-purple w-100">
+                            <i class="fas fa-save me-2"></i>Crear Colaboración
+                        </button>
+                    </div>
+                </form>
+                <div id="formResult" class="mt-3"></div>
+            </div>
+        </div>
+    `;
+
+    formContainer.innerHTML = formHTML;
+
+    // Manejar el envío del formulario
+    document.getElementById('createForm').addEventListener('submit', async function(e) {
+        e.preventDefault();
+        const formData = new FormData(this);
+        const resultDiv = document.getElementById('formResult');
+
+        resultDiv.innerHTML = '<div class="text-center py-3"><div class="spinner-border text-purple" role="status"><span class="visually-hidden">Creando...</span></div><p class="mt-2 text-purple">Creando registro...</p></div>';
+
+        try {
+            const response = await fetch(`/${document.getElementById('collabType').value}/upload`, {
+                method: 'POST',
+                body: formData
+            });
+
+            if (!response.ok) {
+                throw new Error(await response.text());
+            }
+
+            const result = await response.json();
+            resultDiv.innerHTML = `
+                <div class="alert alert-success" style="background-color: #d4edda; border-color: #c3e6cb; color: #155724;">
+                    <i class="fas fa-check-circle me-2"></i>
+                    ¡Registro creado con éxito! ID: ${result.id}
+                </div>
+            `;
+            this.reset();
+        } catch (error) {
+            resultDiv.innerHTML = `
+                <div class="alert alert-danger">
+                    <i class="fas fa-exclamation-circle me-2"></i>
+                    Error: ${error.message}
+                </div>
+            `;
+        }
+    });
+}
+
+// Cargar el formulario inicial
+document.addEventListener('DOMContentLoaded', () => {
+    loadForm('cosmetics');
+});
+
+// Cambiar el formulario cuando cambia el tipo
+document.getElementById('collabType').addEventListener('change', function() {
+    loadForm(this.value);
+});
@@ -0,0 +1,124 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Buscar registro por ID
+    document.getElementById('searchForm').addEventListener('submit', async function(e) {
+        e.preventDefault();
+        const type = document.getElementById('type').value;
+        const id = document.getElementById('id').value;
+        const resultsDiv = document.getElementById('searchResults');
+
+        resultsDiv.innerHTML = `
+            <div class="text-center py-4">
+                <div class="spinner-border text-purple" role="status">
+                    <span class="visually-hidden">Buscando...</span>
+                </div>
+                <p class="mt-2 text-purple">Buscando registro...</p>
+            </div>`;
+
+        try {
+            const response = await fetch(`/${type}/${id}`);
+            if (!response.ok) {
+                throw new Error(await response.text());
+            }
+            const data = await response.json();
+            displayRecordPreview(data, type);
+        } catch (error) {
+            resultsDiv.innerHTML = `
+                <div class="alert alert-danger alert-dismissible fade show" role="alert">
+                    <i class="bi bi-exclamation-triangle-fill me-2"></i>
+                    Error: ${error.message || 'Registro no encontrado'}
+                    <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+                </div>`;
+        }
+    });
+
+    // Mostrar vista previa del registro
+    function displayRecordPreview(data, type) {
+        const previewDiv = document.getElementById('recordPreview');
+        const previewContent = document.getElementById('previewContent');
+
+        let html = '';
+        if (type === 'cosmetics') {
+            html = `
+                <div class="row">
+                    <div class="col-md-3 text-center">
+                        <img src="${data.image_url}" alt="${data.marca_maquillaje}" class="record-img mb-3">
+                    </div>
+                    <div class="col-md-9">
+                        <h4 class="text-purple">${data.marca_maquillaje} x ${data.videojuego}</h4>
+                        <ul class="list-unstyled">
+                            <li><strong>ID:</strong> ${data.id}</li>
+                            <li><strong>Fecha Colaboración:</strong> ${data.fecha_colaboracion}</li>
+                            <li><strong>Tipo Colaboración:</strong> <span class="badge bg-light-purple text-purple">${data.tipo_colaboracion}</span></li>
+                            <li><strong>Incremento Ventas:</strong> <span class="text-success fw-bold">+${data.incremento_ventas_maquillaje}</span></li>
+                        </ul>
+                    </div>
+                </div>`;
+        } else {
+            html = `
+                <div class="row">
+                    <div class="col-md-3 text-center">
+                        <img src="${data.image_url}" alt="${data.videojuego}" class="record-img mb-3">
+                    </div>
+                    <div class="col-md-9">
+                        <h4 class="text-purple">${data.videojuego} x ${data.marca_maquillaje}</h4>
+                        <ul class="list-unstyled">
+                            <li><strong>ID:</strong> ${data.id}</li>
+                            <li><strong>Fecha Colaboración:</strong> ${data.fecha_colaboracion}</li>
+                            <li><strong>Incremento Ventas:</strong> <span class="text-success fw-bold">+${data.incremento_ventas_videojuego}</span></li>
+                        </ul>
+                    </div>
+                </div>`;
+        }
+
+        previewContent.innerHTML = html;
+        document.getElementById('deleteType').value = type;
+        document.getElementById('deleteId').value = data.id;
+        previewDiv.classList.remove('d-none');
+        document.getElementById('searchResults').innerHTML = '';
+    }
+
+    // Cancelar eliminación
+    document.getElementById('cancelDelete').addEventListener('click', function() {
+        document.getElementById('recordPreview').classList.add('d-none');
+    });
+
+    // Enviar formulario de eliminación
+    document.getElementById('deleteForm').addEventListener('submit', async function(e) {
+        e.preventDefault();
+        const type = document.getElementById('deleteType').value;
+        const id = document.getElementById('deleteId').value;
+
+        try {
+            const response = await fetch(`/${type}/delete`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                },
+                body: `id=${id}`
+            });
+
+            if (!response.ok) {
+                throw new Error(await response.text());
+            }
+
+            const result = await response.json();
+            showAlert('success', result.message);
+            document.getElementById('recordPreview').classList.add('d-none');
+            document.getElementById('searchForm').reset();
+        } catch (error) {
+            showAlert('danger', error.message || 'Error al eliminar el registro');
+        }
+    });
+
+    // Mostrar alertas
+    function showAlert(type, message) {
+        const alertDiv = document.createElement('div');
+        alertDiv.className = `alert alert-${type} alert-dismissible fade show`;
+        alertDiv.innerHTML = `
+            <i class="bi ${type === 'success' ? 'bi-check-circle-fill' : 'bi-exclamation-triangle-fill'} me-2"></i>
+            ${message}
+            <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+        `;
+        document.getElementById('searchResults').appendChild(alertDiv);
+    }
+});
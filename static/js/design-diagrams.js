@@ -0,0 +1,22 @@
+document.addEventListener('DOMContentLoaded', function() {
+  const modal = document.getElementById('classDiagramModal');
+  const modalImg = document.getElementById('classDiagramModalImage');
+  const modalClose = document.getElementById('classDiagramModalClose');
+  // Todas las imágenes de diagramas en este bloque: selecciona por alt o atributo common si prefieres
+  document.querySelectorAll('section img[alt^="Diagrama de Clases"]').forEach(img => {
+    img.addEventListener('click', () => {
+      modalImg.src = img.src;
+      modal.style.display = 'flex';
+    });
+  });
+  modalClose.addEventListener('click', () => {
+    modal.style.display = 'none';
+    modalImg.src = '';
+  });
+  modal.addEventListener('click', (e) => {
+    if (e.target === modal) {
+      modal.style.display = 'none';
+      modalImg.src = '';
+    }
+  });
+});
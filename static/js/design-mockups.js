@@ -0,0 +1,17 @@
+document.addEventListener('DOMContentLoaded', function() {
+  const modal = document.getElementById('imageModal');
+  const modalImage = document.getElementById('modalImage');
+  const modalClose = document.getElementById('modalClose');
+  document.querySelectorAll('img.mockup-img').forEach(img => {
+    img.addEventListener('click', () => {
+      modalImage.src = img.src;
+      modal.style.display = 'flex';
+    });
+  });
+  modalClose.addEventListener('click', () => { modal.style.display = 'none'; modalImage.src = ''; });
+  modal.addEventListener('click', (e) => {
+    if (e.target === modal) {
+      modal.style.display = 'none'; modalImage.src = '';
+    }
+  });
+});
@@ -0,0 +1,19 @@
+function openModal(img) {
+    const modal = document.getElementById("imgModal");
+    const modalImg = document.getElementById("modalImage");
+    const captionText = document.getElementById("caption");
+    modal.style.display = "flex";  // aquí se activa flex
+    modalImg.src = img.src;
+    captionText.innerHTML = img.alt;
+}
+function closeModal() {
+    document.getElementById("imgModal").style.display = "none";
+}
+
+document.addEventListener("DOMContentLoaded", function () {
+    const images = document.querySelectorAll(".graphic-card img");
+    images.forEach(img => {
+        img.style.cursor = "pointer";
+        img.addEventListener("click", () => openModal(img));
+    });
+});
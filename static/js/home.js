@@ -0,0 +1,30 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Gallery Modal
+    var imageModal = document.getElementById('imageModal');
+    imageModal.addEventListener('show.bs.modal', function(event) {
+        var item = event.relatedTarget;
+        var imgSrc = item.getAttribute('data-bs-img');
+        var title = item.getAttribute('data-bs-title');
+        var date = item.getAttribute('data-bs-date');
+
+        var modalImage = imageModal.querySelector('#modalImage');
+        var modalTitle = imageModal.querySelector('#modalTitle');
+        var modalDate = imageModal.querySelector('#modalDate');
+
+        modalImage.src = imgSrc;
+        modalTitle.textContent = title;
+        modalDate.textContent = date;
+    });
+
+    // Gallery item hover animation
+    var galleryItems = document.querySelectorAll('.gallery-item');
+    galleryItems.forEach(function(item) {
+        item.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-8px)';
+        });
+
+        item.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+});
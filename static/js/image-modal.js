@@ -0,0 +1,28 @@
+document.addEventListener('DOMContentLoaded', function() {
+    var imageModal = document.getElementById('imageModal');
+    imageModal.addEventListener('show.bs.modal', function(event) {
+        var button = event.relatedTarget;
+        var imgSrc = button.getAttribute('data-bs-img');
+        var imgTitle = button.getAttribute('data-bs-title');
+
+        var modalTitle = imageModal.querySelector('.modal-title');
+        var modalImage = imageModal.querySelector('#modalImage');
+
+        modalTitle.textContent = imgTitle;
+        modalImage.src = imgSrc;
+        modalImage.alt = imgTitle;
+    });
+
+    // Efecto de zoom al pasar el mouse
+    var galleryImages = document.querySelectorAll('.gallery-img');
+    galleryImages.forEach(function(img) {
+        img.addEventListener('mouseenter', function() {
+            this.style.transform = 'scale(1.1)';
+            this.style.zIndex = '10';
+        });
+        img.addEventListener('mouseleave', function() {
+            this.style.transform = 'scale(1)';
+            this.style.zIndex = '1';
+        });
+    });
+});
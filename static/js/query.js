@@ -0,0 +1,167 @@
+// Campos disponibles para cada tipo
+const fields = {
+    cosmetics: [
+        {name: "marca_maquillaje", label: "Marca de maquillaje"},
+        {name: "videojuego", label: "Videojuego"},
+        {name: "fecha_colaboracion", label: "Fecha de colaboración"},
+        {name: "tipo_colaboracion", label: "Tipo de colaboración"},
+        {name: "incremento_ventas_maquillaje", label: "Incremento de ventas"},
+        {name: "image_url", label: "URL de imagen"}
+    ],
+    videogames: [
+        {name: "videojuego", label: "Videojuego"},
+        {name: "marca_maquillaje", label: "Marca de maquillaje"},
+        {name: "fecha_colaboracion", label: "Fecha de colaboración"},
+        {name: "incremento_ventas_videojuego", label: "Incremento de ventas"},
+        {name: "image_url", label: "URL de imagen"}
+    ]
+};
+
+// Actualizar campos disponibles cuando cambia el tipo
+document.getElementById('fieldType').addEventListener('change', function() {
+    const type = this.value;
+    const fieldSelect = document.getElementById('fieldName');
+    fieldSelect.innerHTML = '';
+
+    fields[type].forEach(field => {
+        const option = document.createElement('option');
+        option.value = field.name;
+        option.textContent = field.label;
+        fieldSelect.appendChild(option);
+    });
+});
+
+// Inicializar campos
+document.getElementById('fieldType').dispatchEvent(new Event('change'));
+
+// Manejar formulario de búsqueda por ID
+document.getElementById('idForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const type = document.getElementById('type').value;
+    const id = document.getElementById('id').value;
+    const resultsDiv = document.getElementById('idResults');
+
+    resultsDiv.innerHTML = '<div class="text-center py-3"><div class="spinner-border text-purple" role="status"><span class="visually-hidden">Buscando...</span></div><p class="mt-2 text-purple">Buscando...</p></div>';
+
+    try {
+        const response = await fetch(`/${type}/${id}`);
+        if (!response.ok) {
+            throw new Error(await response.text());
+        }
+        const data = await response.json();
+        displayResults([data], resultsDiv);
+    } catch (error) {
+        resultsDiv.innerHTML = `<div class="alert alert-danger">Error: ${error.message}</div>`;
+    }
+});
+
+// Manejar formulario de búsqueda por campo
+document.getElementById('fieldForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const type = document.getElementById('fieldType').value;
+    const field = document.getElementById('fieldName').value;
+    const value = document.getElementById('fieldValue').value;
+    const resultsDiv = document.getElementById('fieldResults');
+
+    resultsDiv.innerHTML = '<div class="text-center py-3"><div class="spinner-border text-purple" role="status"><span class="visually-hidden">Buscando...</span></div><p class="mt-2 text-purple">Buscando...</p></div>';
+
+    try {
+        const response = await fetch(`/${type}/search_by_field?field=${field}&value=${value}`);
+        if (!response.ok) {
+            throw new Error(await response.text());
+        }
+        const data = await response.json();
+        displayResults(data, resultsDiv);
+    } catch (error) {
+        resultsDiv.innerHTML = `<div class="alert alert-danger">Error: ${error.message}</div>`;
+    }
+});
+
+// Manejar formulario de búsqueda por marca
+document.getElementById('brandForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const brand = document.getElementById('brandName').value;
+    const resultsDiv = document.getElementById('brandResults');
+
+    resultsDiv.innerHTML = '<div class="text-center py-3"><div class="spinner-border text-purple" role="status"><span class="visually-hidden">Buscando...</span></div><p class="mt-2 text-purple">Buscando...</p></div>';
+
+    try {
+        const response = await fetch(`/cosmetics/search_by_brand?marca_maquillaje=${brand}`);
+        if (!response.ok) {
+            throw new Error(await response.text());
+        }
+        const data = await response.json();
+        displayResults(data, resultsDiv);
+    } catch (error) {
+        resultsDiv.innerHTML = `<div class="alert alert-danger">Error: ${error.message}</div>`;
+    }
+});
+
+// Manejar formulario de búsqueda por nombre de videojuego
+document.getElementById('gameForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+    const game = document.getElementById('gameName').value;
+    const resultsDiv = document.getElementById('gameResults');
+
+    resultsDiv.innerHTML = '<div class="text-center py-3"><div class="spinner-border text-purple" role="status"><span class="visually-hidden">Buscando...</span></div><p class="mt-2 text-purple">Buscando...</p></div>';
+
+    try {
+        const response = await fetch(`/videogames/search_by_name?nombre_videojuego=${game}`);
+        if (!response.ok) {
+            throw new Error(await response.text());
+        }
+        const data = await response.json();
+        displayResults(data, resultsDiv);
+    } catch (error) {
+        resultsDiv.innerHTML = `<div class="alert alert-danger">Error: ${error.message}</div>`;
+    }
+});
+
+// Función para mostrar los resultados
+function displayResults(records, container) {
+    if (!records || records.length === 0) {
+        container.innerHTML = '<div class="alert alert-info" style="background-color: #e2d1f9; border-color: #d6afff; color: #6a3093;"><i class="fas fa-info-circle me-2"></i>No se encontraron resultados.</div>';
+        return;
+    }
+
+    container.innerHTML = '';
+
+    records.forEach(record => {
+        const recordDiv = document.createElement('div');
+        recordDiv.className = 'record p-4';
+
+        let html = `<h3 class="h4 mb-3 text-purple"><i class="fas fa-id-badge me-2"></i>ID: ${record.id}</h3><div class="row">`;
+
+        // Agregar campos dinámicamente
+        for (const [key, value] of Object.entries(record)) {
+            if (key === 'id') continue;
+
+            if (key === 'image_url' && value) {
+                html += `
+                    <div class="col-12">
+                        <div class="mb-3">
+                            <p class="fw-bold mb-1 text-purple"><i class="fas fa-image me-2"></i>Imagen:</p>
+                            <img src="${value}" class="img-fluid rounded" alt="Imagen de colaboración">
+                        </div>
+                    </div>
+                `;
+            } else {
+                const formattedKey = key.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase());
+                const icon = key.includes('maquillaje') ? 'fas fa-lipstick' :
+                            key.includes('videojuego') ? 'fas fa-gamepad' :
+                            key.includes('fecha') ? 'fas fa-calendar-alt' :
+                            key.includes('ventas') ? 'fas fa-chart-line' : 'fas fa-info-circle';
+
+                html += `
+                    <div class="col-md-6 mb-2">
+                        <p class="mb-0"><span class="fw-bold text-purple"><i class="${icon} me-2"></i>${formattedKey}:</span> ${value || 'N/A'}</p>
+                    </div>
+                `;
+            }
+        }
+
+        html += '</div>';
+        recordDiv.innerHTML = html;
+        container.appendChild(recordDiv);
+    });
+}
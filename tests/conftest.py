@@ -0,0 +1,39 @@
+import asyncio
+import os
+
+import pytest
+
+# La configuración se lee al importar la aplicación: pruebas sin Supabase, sin Redis y sin purga
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("SOFT_DELETE_PURGE_INTERVAL", "0")
+os.environ.setdefault("DB_WARMUP_CONNECTIONS", "0")
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    """Cada prueba usa una base nueva (versiones desde 0): las respuestas guardadas no se comparten"""
+    from app.cache import MemoryBackend, response_cache
+
+    response_cache.backend = MemoryBackend()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def empty_search_indexes():
+    """Los índices de n-gramas en memoria son de la base de cada prueba: se descartan al terminar"""
+    from app.search_index import search_indexes
+
+    yield
+    search_indexes.clear()
+
+
+@pytest.fixture
+def sqlite_database(tmp_path, monkeypatch):
+    """Base SQLite temporal como DATABASE_URL; los engines se cierran al terminar"""
+    from database.connection_db import database
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    yield url
+    asyncio.run(database.dispose())
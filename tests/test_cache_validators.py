@@ -0,0 +1,50 @@
+"""
+ETag y Last-Modified salen de cache_versions, que suben los triggers: una escritura hecha fuera
+de este proceso (otro worker, un script, SQL manual) también cambia los validadores.
+"""
+import asyncio
+from email.utils import parsedate_to_datetime
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.main import app
+
+
+async def _out_of_band_write(url: str):
+    # Otro engine, como otro worker o un script: esta aplicación no se entera de la escritura
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO cosmeticcolab (marca_maquillaje, videojuego, fecha_colaboracion, tipo_colaboracion, "
+            "incremento_ventas_maquillaje, image_url) VALUES "
+            "('Marca Externa', 'Juego', '2024-05-01', 'tipo', '5%', 'https://example.com/a.png')"
+        ))
+    await engine.dispose()
+
+
+async def _validators_follow_external_writes(url: str):
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/cosmetics/by_date")
+            etag = first.headers["etag"]
+            last_modified = parsedate_to_datetime(first.headers["last-modified"])
+            assert (await client.get("/cosmetics/by_date", headers={"If-None-Match": etag})).status_code == 304
+
+            await _out_of_band_write(url)
+
+            fresh = await client.get("/cosmetics/by_date", headers={"If-None-Match": etag})
+            assert fresh.status_code == 200
+            assert fresh.headers["etag"] != etag
+            assert parsedate_to_datetime(fresh.headers["last-modified"]) >= last_modified
+            assert "Marca Externa" in fresh.text
+
+            # Tras la escritura la respuesta guardada con la versión anterior ya no se usa
+            assert fresh.headers["x-cache"] == "MISS"
+            assert (await client.get("/cosmetics/by_date", headers={"If-None-Match": fresh.headers["etag"]})).status_code == 304
+
+
+def test_validators_follow_external_writes(sqlite_database):
+    asyncio.run(_validators_follow_external_writes(sqlite_database))
@@ -0,0 +1,67 @@
+"""
+Lectura después de escritura con dos bases SQLite: primario y réplica (la réplica no recibe las
+escrituras, así que cualquier lectura que llegue a ella no ve la fila nueva).
+"""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel
+
+from app.main import app
+from database.connection_db import database
+
+COSMETIC = {
+    "marca_maquillaje": "Marca Réplica",
+    "videojuego": "Juego",
+    "fecha_colaboracion": "2024-01-01",
+    "tipo_colaboracion": "tipo",
+    "incremento_ventas_maquillaje": "10%",
+    "image_url": "https://example.com/a.png",
+}
+
+
+@pytest.fixture
+def two_databases(sqlite_database, tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_REPLICA_URL", f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+
+
+async def _read_after_write():
+    async with app.router.lifespan_context(app):
+        async with database.replica_engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        replica_queries = []
+        event.listen(database.replica_engine.sync_engine, "before_cursor_execute",
+                     lambda *args: replica_queries.append(args[2]))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as writer, \
+                httpx.AsyncClient(transport=transport, base_url="http://test") as other:
+            created = await writer.post("/cosmetics", json=COSMETIC)
+            assert created.status_code == 200
+            assert "read_primary_until=" in created.headers["set-cookie"]
+
+            # Otro cliente lee de la réplica (no tiene la fila) y esa respuesta no se guarda
+            stale = await other.get("/cosmetics")
+            assert stale.status_code == 200
+            assert COSMETIC["marca_maquillaje"] not in stale.text
+            assert replica_queries
+
+            # Dentro de la ventana, quien escribió lee del primario y no recibe la página de la réplica
+            replica_queries.clear()
+            fresh = await writer.get("/cosmetics")
+            assert fresh.headers["x-cache"] == "MISS"
+            assert COSMETIC["marca_maquillaje"] in fresh.text
+            by_id = await writer.get(f"/cosmetics/{created.json()['id']}")
+            assert by_id.status_code == 200
+            assert replica_queries == []
+
+            # Sin cookie, la cabecera X-Read-Primary también lleva al primario
+            assert (await other.get(f"/cosmetics/{created.json()['id']}", headers={"X-Read-Primary": "1"})).status_code == 200
+            assert replica_queries == []
+
+
+def test_read_after_write_goes_to_primary(two_databases):
+    asyncio.run(_read_after_write())
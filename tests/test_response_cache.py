@@ -0,0 +1,146 @@
+"""
+Caché de respuestas: backends (memoria con LRU y TTL, Redis sobre FakeRedis), estadísticas de
+aciertos y fallos, e invalidación por espacio a través de las versiones de cache_versions.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app import cache as cache_module
+from app.cache import FakeRedis, MemoryBackend, RedisBackend, ResponseCache
+from app.main import app
+
+
+class Clock:
+    """time.monotonic controlable"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_memory_backend_evicts_least_recently_used():
+    async def scenario():
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        # Leer "a" la deja como la más reciente: la siguiente en salir es "b"
+        assert await backend.get("a") == b"1"
+        await backend.set("c", b"3", ttl=60)
+
+        assert len(backend) == 2
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+        assert await backend.get("c") == b"3"
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend_expires_entries(clock):
+    async def scenario():
+        backend = MemoryBackend()
+        await backend.set("a", b"1", ttl=10)
+        clock.now += 9
+        assert await backend.get("a") == b"1"
+        clock.now += 2
+        assert await backend.get("a") is None
+        assert len(backend) == 0
+
+    asyncio.run(scenario())
+
+
+def test_fake_redis_stores_bytes_and_expires(clock):
+    async def scenario():
+        client = FakeRedis()
+        await client.set("counter", 3)
+        await client.set("text", "hola", ex=5)
+        assert await client.get("counter") == b"3"
+        assert await client.get("text") == b"hola"
+
+        clock.now += 6
+        assert await client.get("text") is None
+        # Sin ex la clave no expira
+        assert await client.get("counter") == b"3"
+        assert await client.get("missing") is None
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_round_trip(clock):
+    async def scenario():
+        backend = RedisBackend(FakeRedis())
+        await backend.set("key", b"value", ttl=30)
+        assert await backend.get("key") == b"value"
+        clock.now += 31
+        assert await backend.get("key") is None
+
+    asyncio.run(scenario())
+
+
+def test_stats_count_hits_misses_and_stores():
+    async def scenario():
+        cache = ResponseCache(RedisBackend(FakeRedis()))
+        headers = [(b"content-type", b"application/json")]
+
+        assert await cache.get("k") is None
+        await cache.set("k", headers, b"[1, 2]")
+        assert await cache.get("k") == (headers, b"[1, 2]")
+        assert await cache.get("k") == (headers, b"[1, 2]")
+
+        snapshot = cache.snapshot()
+        assert (snapshot["hits"], snapshot["misses"], snapshot["stores"]) == (2, 1, 1)
+        assert snapshot["hit_ratio"] == pytest.approx(2 / 3)
+        assert snapshot["backend"] == "RedisBackend"
+
+    asyncio.run(scenario())
+
+
+def test_key_changes_with_versions_and_ignores_query_order():
+    cache = ResponseCache(MemoryBackend())
+
+    key = cache.key_for("/cosmetics", b"limit=5&after=3", "cosmetics=1")
+    assert key == cache.key_for("/cosmetics", b"after=3&limit=5", "cosmetics=1")
+    assert key != cache.key_for("/cosmetics", b"after=3&limit=5", "cosmetics=2")
+
+
+COSMETIC = {
+    "marca_maquillaje": "Marca Caché",
+    "videojuego": "Juego",
+    "fecha_colaboracion": "2024-01-01",
+    "tipo_colaboracion": "tipo",
+    "incremento_ventas_maquillaje": "10%",
+    "image_url": "https://example.com/a.png",
+}
+
+
+async def _writes_invalidate_their_namespace():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for path in ("/cosmetics/by_date", "/videogames/deleted"):
+                assert (await client.get(path)).headers["x-cache"] == "MISS"
+                assert (await client.get(path)).headers["x-cache"] == "HIT"
+
+            assert (await client.post("/cosmetics", json=COSMETIC)).status_code == 200
+
+            # Sube la versión de "cosmetics" (trigger): sus rutas vuelven a consultar la base
+            fresh = await client.get("/cosmetics/by_date")
+            assert fresh.headers["x-cache"] == "MISS"
+            assert COSMETIC["marca_maquillaje"] in fresh.text
+            assert (await client.get("/cosmetics/by_date")).headers["x-cache"] == "HIT"
+            # "videogames" no cambió
+            assert (await client.get("/videogames/deleted")).headers["x-cache"] == "HIT"
+
+
+def test_writes_invalidate_only_their_namespace(sqlite_database):
+    asyncio.run(_writes_invalidate_their_namespace())
@@ -0,0 +1,107 @@
+"""
+Índice de n-gramas en memoria (búsquedas sin PostgreSQL): contains() equivale a ILIKE, search()
+ordena por similitud y los índices ya construidos siguen a las altas, cambios y bajas.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.cosmetic_models import CosmeticColab
+from app.cosmetic_operations import CosmeticOperations
+from app.search_index import NGramIndex, search_indexes
+from app.search_operations import SearchOperations
+from database.connection_db import async_session, init_db
+
+
+@pytest.fixture
+def index():
+    index = NGramIndex()
+    index.add(1, "Maybelline")
+    index.add(2, "Máybelline New York")
+    index.add(3, "L'Oréal Paris")
+    index.add(4, "NYX")
+    return index
+
+
+def test_contains_ignores_case_and_accents(index):
+    assert index.contains("MAYBELLINE") == {1, 2}
+    assert index.contains("oreal") == {3}
+    assert index.contains("maybellinex") == set()
+
+
+def test_contains_shorter_than_a_gram_scans_values(index):
+    assert index.contains("ny") == {4}
+    assert index.contains("is") == {3}
+
+
+def test_add_reindexes_and_remove_forgets(index):
+    index.add(1, "Rare Beauty")
+    index.remove(3)
+
+    assert index.contains("maybelline") == {2}
+    assert index.contains("rare") == {1}
+    assert index.contains("paris") == set()
+
+
+def test_search_ranks_substring_matches_first(index):
+    results = index.search("maybeline", limit=10)
+
+    assert [doc_id for doc_id, _ in results] == [1, 2]
+    assert all(0.3 <= score < 1.0 for _, score in results)
+
+    exact = index.search("new york", limit=10)
+    assert exact == [(2, 1.0)]
+
+
+def test_search_respects_limit_and_threshold(index):
+    assert len(index.search("maybelline", limit=1)) == 1
+    assert index.search("zzzz", limit=10) == []
+
+
+def _cosmetic(marca: str) -> dict:
+    return {
+        "marca_maquillaje": marca,
+        "videojuego": "Juego",
+        "fecha_colaboracion": date(2024, 1, 1),
+        "tipo_colaboracion": "tipo",
+        "incremento_ventas_maquillaje": "5%",
+        "image_url": "https://example.com/a.png",
+    }
+
+
+async def _found(session, query: str) -> set:
+    return {result.id for result in await SearchOperations.search_all(session, query, 10)}
+
+
+async def _index_follows_writes():
+    import app.main  # noqa: F401  (registra todos los modelos antes de crear las tablas)
+
+    await init_db()
+    async with async_session() as session:
+        first = await CosmeticOperations.create_cosmetic(session, _cosmetic("Glossier"))
+        # La primera búsqueda construye el índice; desde ahí lo actualizan las operaciones
+        assert await _found(session, "glossier") == {first.id}
+
+        second = await CosmeticOperations.create_cosmetic(session, _cosmetic("Glossier Play"))
+        assert await _found(session, "glossier") == {first.id, second.id}
+
+        await CosmeticOperations.update_cosmetic(session, first.id, {"marca_maquillaje": "Fenty Beauty"})
+        assert await _found(session, "glossier") == {second.id}
+        assert await _found(session, "fenty") == {first.id}
+
+        await CosmeticOperations.delete_cosmetic(session, second.id)
+        assert await _found(session, "glossier") == set()
+        index = await search_indexes.get(session, CosmeticColab, "marca_maquillaje")
+        assert index.contains("glossier") == set()
+
+        await CosmeticOperations.restore_cosmetic(session, second.id)
+        assert await _found(session, "glossier") == {second.id}
+
+        await CosmeticOperations.update_cosmetics_batch(session, [{"id": second.id, "marca_maquillaje": "Rare Beauty"}])
+        assert await _found(session, "glossier") == set()
+        assert await _found(session, "rare") == {second.id}
+
+
+def test_index_follows_create_update_delete(sqlite_database):
+    asyncio.run(_index_follows_writes())
@@ -0,0 +1,13 @@
+"""
+Presupuesto de arranque: importar app.main, ejecutar el lifespan (todas sus fases) y responder
+la primera petición en un proceso nuevo debe caber en STARTUP_BUDGET_IMPORT_MS y
+STARTUP_BUDGET_READY_MS (los mismos límites que python -m benchmarks.startup_budget).
+"""
+from benchmarks.startup_budget import IMPORT_BUDGET_MS, READY_BUDGET_MS, check, measure, summarize
+
+
+def test_startup_within_budget(tmp_path):
+    summary = summarize([measure(str(tmp_path), 0)])
+
+    assert {"schema", "templates"} <= set(summary["phases_ms"])
+    assert not check(summary, IMPORT_BUDGET_MS, READY_BUDGET_MS), summary